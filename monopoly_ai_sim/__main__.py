@@ -1,9 +1,56 @@
 import sys
 import os.path
+import argparse
+import logging
 
 base_path = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
 sys.path.append(base_path)
 
-from monopoly_ai_sim.simulator import Simulator
+# Only import what the requested mode needs, workers and short runs start faster
 if __name__ == '__main__':
-    Simulator().run()
+    parser = argparse.ArgumentParser(prog="monopoly_ai_sim", description="Simulate monopoly games between AI players")
+    parser.add_argument("--games", type=int, help="number of games to simulate")
+    parser.add_argument("--players", type=int, help="number of players in each game")
+    parser.add_argument("--stats", action="store_true", help="collect and report per-square statistics")
+    parser.add_argument("--checkpoint-dir", help="run seeded shards, checkpointed to this directory")
+    parser.add_argument("--shard-size", type=int, help="games per checkpointed shard")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the first game of a checkpointed run")
+    parser.add_argument("--serve", metavar="HOST:PORT",
+                        help="coordinate a checkpointed run, handing shards to workers connecting here")
+    parser.add_argument("--local-workers", type=int, help="run a checkpointed run with this many worker processes")
+    parser.add_argument("--worker", metavar="HOST:PORT", help="run shards for the coordinator at this address")
+    parser.add_argument("--metrics-port", type=int, help="serve Prometheus metrics on this local port while running")
+    parser.add_argument("--summary-interval", type=float, default=10.0,
+                        help="seconds between progress summaries, 0 disables them")
+    parser.add_argument("--results", metavar="PATH", help="also write every game to this results database")
+    parser.add_argument("--check-invariants", type=int, default=0, metavar="TURNS",
+                        help="validate the game state every this many turns")
+    args = parser.parse_args()
+    logging.basicConfig(stream=sys.stdout, level=logging.INFO)
+
+    if args.worker:
+        from monopoly_ai_sim.distributed import Worker
+        host, _, port = args.worker.rpartition(":")
+        Worker(host, int(port)).run()
+        sys.exit()
+
+    from monopoly_ai_sim.simulator import Simulator
+    simulator = Simulator()
+    if args.games:
+        simulator.NUM_RUNS = args.games
+    if args.players:
+        simulator.DEFAULT_PLAYER_COUNT = args.players
+    if args.shard_size:
+        simulator.SHARD_SIZE = args.shard_size
+    simulator.COLLECT_STATS = args.stats
+    simulator.METRICS_PORT = args.metrics_port
+    simulator.SUMMARY_INTERVAL = args.summary_interval
+    simulator.RESULTS_PATH = args.results
+    simulator.CHECK_INVARIANTS = args.check_invariants
+    if args.checkpoint_dir and (args.serve or args.local_workers):
+        host, _, port = (args.serve or "127.0.0.1:0").rpartition(":")
+        simulator.run_distributed(args.checkpoint_dir, args.seed, host, int(port), args.local_workers)
+    elif args.checkpoint_dir:
+        simulator.run_sharded(args.checkpoint_dir, args.seed)
+    else:
+        simulator.run()
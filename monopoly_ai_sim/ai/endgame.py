@@ -0,0 +1,497 @@
+# Endgame search for two player games
+#
+# Once only two players are left and every property has an owner, ownership can't change until one of them
+# goes bankrupt, and the decisions that are left are narrow: how far to build, whether to mortgage or sell
+# houses first when short of cash, and whether to pay out of jail. EndgameSolver runs a depth-limited
+# expectimax over dice outcomes on a compact state of that reduced game, one ply per turn, memoized on a
+# canonical key written from the point of view of the player to move (so values are negamax: the value of a
+# state for its mover is minus the value of the following state for the other player).
+#
+# The reduced game follows play_turn with a few simplifications: one move per turn (doubles don't roll
+# again), Chance and Community Chest only move the token, utilities charge rent on the average dice total,
+# and only the player to move builds, on a single group per turn. Leaves at the depth limit are scored from
+# net worth and expected rent income. check_against_rollouts compares the search with Monte Carlo play outs
+# of the real game from the same position.
+import copy
+import math
+
+from monopoly_ai_sim.ai.greedy import GreedyMonopolyPlayer
+from monopoly_ai_sim.board import RentIdx
+from monopoly_ai_sim.evaluator import DIE_FACES, MonopolyEvaluator, get_dice_distribution
+from monopoly_ai_sim.monopoly import JailState
+
+# Compact state: (position, opponent position, cash, opponent cash, jail state, opponent jail state, properties)
+# properties holds one int per property in board order: owner << 4 | rent_idx << 1 | mortgaged, where the
+# owner is 0 for the player to move and 1 for the opponent
+OWNER_BIT = 16
+MORTGAGED_BIT = 1
+# Leaves are scored tanh((net worth difference + LEAF_HORIZON * income difference) / LEAF_SCALE), the income
+# being the expected rent per opponent turn. Both were fitted by least squares against the result (1 win,
+# -1 loss, 0 draw) of two player greedy games, from their endgame positions every 5 rounds: seeds 0-999 to
+# fit, on a grid of 5 turns and 250, then seeds 1000-1499 held out, with a mean squared error of 0.25 there
+LEAF_HORIZON = 25
+LEAF_SCALE = 1000.0
+# The memo is dropped when it grows past this many states
+MAX_CACHE_SIZE = 2000000
+
+
+def get_rent_idx(entry):
+    return (entry >> 1) & 7
+
+
+class EndgameSolver:
+    def __init__(self, game, depth=2):
+        self.depth = depth
+        # The evaluator keeps the game, only the tables computed from it are kept so that the solver, which
+        # players keep between games, never holds on to a game
+        evaluator = MonopolyEvaluator(game)
+        self.num_positions = len(game.board_positions)
+        self.go_income = game.GO_INCOME
+        self.position_jail = game.POSITION_JAIL
+        self.escape_jail_cost = game.ESCAPE_JAIL_COST
+        # Jail state of a player who served every jail turn and pays to leave at the start of the next one
+        self.jail_served = game.JAIL_TURNS
+        self.luxury_tax = game.LUXURY_TAX
+        self.income_tax_option = game.INCOME_TAX_OPTION
+        self.initial_house_count = game.INITIAL_HOUSE_COUNT
+        self.initial_hotel_count = game.INITIAL_HOTEL_COUNT
+        self.tax_positions = {p.position: p.name for p in game.board_positions.values()
+                              if p.name in ("Luxury Tax", "Income Tax")}
+
+        self.properties = [p for _, p in sorted(game.board_positions.items()) if p.is_property]
+        self.property_idx = {p.position: idx for idx, p in enumerate(self.properties)}
+        # Groups that can be built on, as property indices in board order
+        self.groups = []
+        for group_properties in game.group_id_to_position.values():
+            if group_properties[0].is_property and not group_properties[0].is_railroad and \
+                    not group_properties[0].is_utility:
+                self.groups.append(sorted(self.property_idx[p.position] for p in group_properties))
+        self.rents = [[int(round(evaluator.get_rent(p, rent_idx))) for rent_idx in range(RentIdx.MAX + 1)]
+                      for p in self.properties]
+        self.expected_rents = [[evaluator.get_expected_rent_at(p, rent_idx) for rent_idx in range(RentIdx.MAX + 1)]
+                               for p in self.properties]
+        self.moves = [self._get_moves_from(evaluator, position) for position in range(self.num_positions)]
+        # Doubles leave jail and move by their total
+        doubles_probability = 1.0 / (len(DIE_FACES) * len(DIE_FACES))
+        self.jail_escapes = [(move, probability * doubles_probability) for face in DIE_FACES
+                             for move, probability in self._get_landings(evaluator, self.position_jail, 2 * face)]
+        self.stay_in_jail_probability = 1.0 - len(DIE_FACES) * doubles_probability
+        self.cache = {}
+
+    """
+        Returns the landings of a move of dice_total from position, as ((destination, passed go, sent to jail,
+        pays rent), probability of the landing given the dice total)
+    """
+    def _get_landings(self, evaluator, position, dice_total):
+        landing = (position + dice_total) % self.num_positions
+        landings = []
+        for destination, probability, pays_rent in evaluator._resolve_landing(landing, 1.0):
+            sent_to_jail = destination == self.position_jail and not pays_rent
+            # Cards moving forward past go pay it, "Go back 3 spaces" doesn't
+            passed_go = landing < position or \
+                (destination < landing and not sent_to_jail and landing - destination != 3)
+            landings.append(((destination, passed_go, sent_to_jail, pays_rent), probability))
+        return landings
+
+    def _get_moves_from(self, evaluator, position):
+        moves = {}
+        for dice_total, dice_probability in get_dice_distribution().items():
+            for move, probability in self._get_landings(evaluator, position, dice_total):
+                moves[move] = moves.get(move, 0.0) + dice_probability * probability
+        return list(moves.items())
+
+    """
+        Returns the compact state of game seen from player, or None when the position isn't an endgame
+        the solver handles: exactly two players left and every property owned
+    """
+    def get_state(self, game, player):
+        active_players = game.live_players
+        if len(active_players) != 2 or player not in active_players:
+            return None
+        opponent = active_players[0] if active_players[1] is player else active_players[1]
+        properties = []
+        for board_position in self.properties:
+            # Players keep their solver between games, only the board's layout comes from the solver's game
+            board_position = game.board_positions[board_position.position]
+            if board_position.owner == player.seat:
+                owner = 0
+            elif board_position.owner == opponent.seat:
+                owner = OWNER_BIT
+            else:
+                return None
+            properties.append(owner | board_position.rent_idx << 1 | int(board_position.is_mortgaged))
+        return (player.position, opponent.position, player.cash, opponent.cash, int(player.jail_state),
+                int(opponent.jail_state), tuple(properties))
+
+    # The same state seen from the other player
+    @staticmethod
+    def swap(state):
+        position, opponent_position, cash, opponent_cash, jail, opponent_jail, properties = state
+        return (opponent_position, position, opponent_cash, cash, opponent_jail, jail,
+                tuple(entry ^ OWNER_BIT for entry in properties))
+
+    def get_value(self, state, depth=None):
+        if depth is None:
+            depth = self.depth
+        if depth <= 0:
+            return self.get_leaf_value(state)
+        key = (state, depth)
+        value = self.cache.get(key)
+        if value is None:
+            value = self._get_turn_value(state, depth)
+            if len(self.cache) >= MAX_CACHE_SIZE:
+                self.cache = {}
+            self.cache[key] = value
+        return value
+
+    # Chance of winning for the player to move, draws counting as half a win
+    def get_win_probability(self, state, depth=None):
+        return (self.get_value(state, depth) + 1.0) / 2.0
+
+    def get_leaf_value(self, state):
+        score = 0.0
+        for owner, cash in ((0, state[2]), (OWNER_BIT, state[3])):
+            worth = cash + self.get_property_value(state[6], owner)
+            income = sum(self.expected_rents[idx][get_rent_idx(entry)] for idx, entry in enumerate(state[6])
+                         if entry & OWNER_BIT == owner and not entry & MORTGAGED_BIT)
+            sign = 1.0 if owner == 0 else -1.0
+            score += sign * (worth + LEAF_HORIZON * income)
+        return math.tanh(score / LEAF_SCALE)
+
+    # Same valuation as MonopolyPlayer.get_property_value
+    def get_property_value(self, properties, owner=0):
+        value = 0
+        for idx, entry in enumerate(properties):
+            if entry & OWNER_BIT != owner:
+                continue
+            rent_idx = get_rent_idx(entry)
+            board_position = self.properties[idx]
+            if board_position.house_cost and rent_idx >= RentIdx.HOUSE_1:
+                value += int(board_position.house_cost / 2) * (rent_idx - 1)
+            if not entry & MORTGAGED_BIT:
+                value += board_position.mortgage_value
+        return value
+
+    def _get_turn_value(self, state, depth):
+        jail = state[4]
+        if jail >= self.jail_served:
+            state = self.get_released_state(state)
+            if state is None:
+                return -1.0
+        elif jail != JailState.NOT_IN_JAIL:
+            return max(self.get_jail_values(state, depth))
+        return self._get_roll_value(state, depth)
+
+    """
+        Returns the value of rolling for doubles and, if the player can afford it, of paying to leave jail
+    """
+    def get_jail_values(self, state, depth=None):
+        if depth is None:
+            depth = self.depth
+        values = []
+        position, opponent_position, cash, opponent_cash, jail, opponent_jail, properties = state
+        stayed = (position, opponent_position, cash, opponent_cash, jail + 1, opponent_jail, properties)
+        value = self.stay_in_jail_probability * -self.get_value(self.swap(stayed), depth - 1)
+        free = (position, opponent_position, cash, opponent_cash, JailState.NOT_IN_JAIL, opponent_jail, properties)
+        for move, probability in self.jail_escapes:
+            value += probability * self._get_move_value(free, move, depth)
+        values.append(value)
+        if cash >= self.escape_jail_cost:
+            paid = (position, opponent_position, cash - self.escape_jail_cost, opponent_cash,
+                    JailState.NOT_IN_JAIL, opponent_jail, properties)
+            values.append(self._get_roll_value(paid, depth))
+        return values
+
+    # State of a player who served every jail turn after paying the fine to leave, None if it goes bankrupt
+    def get_released_state(self, state):
+        position, opponent_position, cash, opponent_cash, jail, opponent_jail, properties = state
+        if cash < self.escape_jail_cost:
+            raised = self.raise_cash(cash, properties, self.escape_jail_cost, True)
+            if raised is None:
+                return None
+            cash, properties = raised
+        return (position, opponent_position, cash - self.escape_jail_cost, opponent_cash, JailState.NOT_IN_JAIL,
+                opponent_jail, properties)
+
+    def _get_roll_value(self, state, depth):
+        return sum(probability * self._get_move_value(state, move, depth) for move, probability in self.moves[state[0]])
+
+    def _get_move_value(self, state, move, depth):
+        landed_states = self.get_landed_states(state, move)
+        if not landed_states:
+            return -1.0
+        return max(self.get_end_of_turn_value(landed_state, depth) for landed_state in landed_states)
+
+    # Value of a state where the player to move has landed and paid, after its best building plan
+    def get_end_of_turn_value(self, state, depth=None):
+        if depth is None:
+            depth = self.depth
+        return max(-self.get_value(self.swap(built_state), depth - 1) for _, built_state in self.get_build_plans(state))
+
+    """
+        Returns the states the player can be in after making the move, one per way of raising the cash
+        owed, or an empty list if the player goes bankrupt
+    """
+    def get_landed_states(self, state, move):
+        destination, passed_go, sent_to_jail, pays_rent = move
+        _, opponent_position, cash, opponent_cash, jail, opponent_jail, properties = state
+        if passed_go:
+            cash += self.go_income
+        if sent_to_jail:
+            return [(self.position_jail, opponent_position, cash, opponent_cash, JailState.JAIL_TURN_1,
+                     opponent_jail, properties)]
+
+        owed = 0
+        paid_to_opponent = False
+        if destination in self.tax_positions:
+            if self.tax_positions[destination] == "Luxury Tax":
+                owed = self.luxury_tax
+            else:
+                assets = cash + self.get_property_value(properties)
+                owed = min(self.income_tax_option, int(math.ceil(assets * .10)))
+        elif pays_rent and destination in self.property_idx:
+            entry = properties[self.property_idx[destination]]
+            if entry & OWNER_BIT and not entry & MORTGAGED_BIT:
+                owed = self.rents[self.property_idx[destination]][get_rent_idx(entry)]
+                paid_to_opponent = True
+
+        if owed <= cash:
+            landed_states = [(cash, properties)]
+        else:
+            landed_states = set(self.raise_cash(cash, properties, owed, mortgage_first)
+                                for mortgage_first in (True, False))
+            landed_states.discard(None)
+        if paid_to_opponent:
+            opponent_cash += owed
+        return [(destination, opponent_position, landed_cash - owed, opponent_cash, jail, opponent_jail,
+                 landed_properties) for landed_cash, landed_properties in landed_states]
+
+    """
+        Mortgages undeveloped properties and sells houses, evenly from the most developed property, until
+        cash covers owed. Returns the new (cash, properties), or None if everything isn't enough.
+    """
+    def raise_cash(self, cash, properties, owed, mortgage_first):
+        properties = list(properties)
+        for step in ((self._mortgage, self._sell_houses, self._mortgage) if mortgage_first else
+                     (self._sell_houses, self._mortgage)):
+            cash = step(cash, properties, owed)
+            if cash >= owed:
+                return cash, tuple(properties)
+        return None
+
+    def _mortgage(self, cash, properties, owed):
+        for idx, entry in enumerate(properties):
+            if cash >= owed:
+                break
+            if entry & OWNER_BIT == 0 and not entry & MORTGAGED_BIT and get_rent_idx(entry) < RentIdx.HOUSE_1:
+                properties[idx] = entry | MORTGAGED_BIT
+                cash += self.properties[idx].mortgage_value
+        return cash
+
+    def _sell_houses(self, cash, properties, owed):
+        while cash < owed:
+            developed = [idx for idx, entry in enumerate(properties)
+                         if entry & OWNER_BIT == 0 and get_rent_idx(entry) >= RentIdx.HOUSE_1]
+            if not developed:
+                break
+            idx = max(developed, key=lambda developed_idx: (get_rent_idx(properties[developed_idx]), developed_idx))
+            properties[idx] -= 1 << 1
+            cash += int(self.properties[idx].house_cost / 2)
+        return cash
+
+    """
+        Returns the (positions built on in order, state afterwards) of every building plan of the player to
+        move, starting with building nothing. A plan builds evenly on one group, up to each full level of
+        the group and up to as many houses as the cash and the bank allow.
+    """
+    def get_build_plans(self, state):
+        plans = [((), state)]
+        position, opponent_position, cash, opponent_cash, jail, opponent_jail, properties = state
+        houses_left, hotels_left = self.get_buildings_left(properties)
+        for group in self.groups:
+            entries = [properties[idx] for idx in group]
+            if any(entry & (OWNER_BIT | MORTGAGED_BIT) for entry in entries) or \
+                    min(get_rent_idx(entry) for entry in entries) < RentIdx.GROUP_COMPLETE_NO_HOUSES:
+                continue
+            house_cost = self.properties[group[0]].house_cost
+            built = list(properties)
+            built_on = []
+            group_cash, group_houses, group_hotels = cash, houses_left, hotels_left
+            while group_cash >= house_cost:
+                idx = min(group, key=lambda group_idx: (get_rent_idx(built[group_idx]), group_idx))
+                rent_idx = get_rent_idx(built[idx])
+                if rent_idx == RentIdx.HOTEL:
+                    break
+                if rent_idx == RentIdx.HOTEL - 1:
+                    if group_hotels < 1:
+                        break
+                    group_hotels -= 1
+                    group_houses += RentIdx.HOUSE_TO_HOTEL - 1
+                elif group_houses < 1:
+                    break
+                else:
+                    group_houses -= 1
+                built[idx] += 1 << 1
+                group_cash -= house_cost
+                built_on.append(self.properties[idx].position)
+                if len(built_on) % len(group) == 0 or group_cash < house_cost:
+                    plans.append((tuple(built_on), (position, opponent_position, group_cash, opponent_cash, jail,
+                                                    opponent_jail, tuple(built))))
+        return plans
+
+    def get_buildings_left(self, properties):
+        houses_left, hotels_left = self.initial_house_count, self.initial_hotel_count
+        for idx, entry in enumerate(properties):
+            rent_idx = get_rent_idx(entry)
+            if not self.properties[idx].house_cost or rent_idx < RentIdx.HOUSE_1:
+                continue
+            if rent_idx == RentIdx.HOTEL:
+                hotels_left -= 1
+            else:
+                houses_left -= rent_idx - 1
+        return houses_left, hotels_left
+
+    """
+        Rough number of nodes a search of depth plies from state visits, used to decide whether searching
+        is affordable
+    """
+    def estimate_nodes(self, state, depth=None):
+        if depth is None:
+            depth = self.depth
+        nodes = 1
+        total = 0
+        for ply in range(depth):
+            seen_state = state if ply % 2 == 0 else self.swap(state)
+            nodes *= len(self.moves[seen_state[0]]) * len(self.get_build_plans(seen_state))
+            total += nodes
+        return total
+
+    # Building plan with the best value, as the positions to build on in order
+    def get_best_build_plan(self, state):
+        return max(self.get_build_plans(state),
+                   key=lambda plan: -self.get_value(self.swap(plan[1]), self.depth - 1))[0]
+
+
+"""
+    Plays greedily until the game is down to an endgame the solver handles, then searches for the
+    building, cash raising and jail decisions whenever the search is small enough
+"""
+class EndgamePlayer(GreedyMonopolyPlayer):
+    SEARCH_DEPTH = 2
+    NODE_BUDGET = 50000
+
+    def __init__(self, player_id):
+        super().__init__(player_id)
+        # Only depends on the board, kept between games
+        self.solver = None
+
+    def reset(self):
+        super().reset()
+        self.build_plan = None
+        self.mortgage_first = False
+
+    # Returns the compact state if searching it is affordable, None otherwise
+    def get_search_state(self, game):
+        if self.solver is None or self.solver.depth != self.SEARCH_DEPTH:
+            self.solver = EndgameSolver(game, self.SEARCH_DEPTH)
+        state = self.solver.get_state(game, self)
+        if state is None or self.solver.estimate_nodes(state) > self.NODE_BUDGET:
+            return None
+        return state
+
+    def pay_to_escape_jail(self, game):
+        state = self.get_search_state(game)
+        if state is None:
+            return super().pay_to_escape_jail(game)
+        values = self.solver.get_jail_values(state)
+        return len(values) > 1 and values[1] > values[0]
+
+    def purchase_houses(self, game):
+        state = self.get_search_state(game)
+        if state is not None:
+            self.build_plan = list(self.solver.get_best_build_plan(state))
+        super().purchase_houses(game)
+        self.build_plan = None
+
+    def get_house_to_purchase(self, house_building_options):
+        if self.build_plan is None:
+            return super().get_house_to_purchase(house_building_options)
+        if self.build_plan:
+            position = self.build_plan.pop(0)
+            for option in house_building_options:
+                if option.position == position:
+                    return option
+        return None
+
+    def give_cash_to(self, game, owed_player=None, cash_owed=0):
+        if cash_owed > self.cash:
+            self.mortgage_first = False
+            state = self.get_search_state(game)
+            if state is not None:
+                values = {}
+                for mortgage_first in (True, False):
+                    raised = self.solver.raise_cash(self.cash, state[6], cash_owed, mortgage_first)
+                    if raised is not None:
+                        values[mortgage_first] = self.solver.get_end_of_turn_value(
+                            state[:2] + (raised[0] - cash_owed,) + state[3:6] + (raised[1],))
+                if values:
+                    self.mortgage_first = max(values, key=values.get)
+        return super().give_cash_to(game, owed_player, cash_owed)
+
+    def get_properties_for_sell_or_mortgage(self, money_needed):
+        if self.mortgage_first:
+            mortgage_property_list = []
+            money_from_mortgages = 0
+            for monopoly_property in self.owned_properties:
+                if not monopoly_property.is_mortgaged and monopoly_property.rent_idx < RentIdx.HOUSE_1:
+                    money_from_mortgages += monopoly_property.mortgage_value
+                    mortgage_property_list.append(monopoly_property)
+                    if money_from_mortgages >= money_needed:
+                        return {}, mortgage_property_list
+        return super().get_properties_for_sell_or_mortgage(money_needed)
+
+
+"""
+    Plays the game on from its current position until somebody wins or max_rounds rounds have been played,
+    first_player moving first. Returns the winner, None for a draw.
+"""
+def play_out(game, first_player, max_rounds=500):
+    seat = game.players.index(first_player)
+    order = game.players[seat:] + game.players[:seat]
+    for _ in range(max_rounds):
+        for player in order:
+            game.play_turn(player)
+        game.round_count += 1
+        winner = game.get_winner()
+        if winner:
+            return winner
+    return None
+
+
+"""
+    Compares the solver's chance of winning for player in the game's current position with the share
+    of num_games Monte Carlo play outs of the real game it wins (draws count as half), player moving first.
+    Returns (solver estimate, play out estimate, standard error of the play out estimate).
+"""
+def check_against_rollouts(game, player, num_games=1000, depth=2, seed=0):
+    solver = EndgameSolver(game, depth)
+    state = solver.get_state(game, player)
+    if state is None:
+        raise ValueError("The game is not a two player endgame with every property owned")
+    estimate = solver.get_win_probability(state)
+
+    seat = game.players.index(player)
+    scores = []
+    for game_idx in range(num_games):
+        rollout = copy.deepcopy(game)
+        rollout.stats = None
+        rollout.reseed(str(seed) + ":rollout:" + str(game_idx))
+        winner = play_out(rollout, rollout.players[seat])
+        if winner is None:
+            scores.append(0.5)
+        else:
+            scores.append(1.0 if winner.seat == seat else 0.0)
+
+    mean = sum(scores) / num_games
+    variance = sum((score - mean) ** 2 for score in scores) / max(num_games - 1, 1)
+    return estimate, mean, math.sqrt(variance / num_games)
@@ -1,12 +1,31 @@
 from monopoly_ai_sim.board import MonopolyBoardPosition
 from monopoly_ai_sim.player import MonopolyPlayer
+from monopoly_ai_sim.trade import TradeOffer, get_mortgage_interest, get_trade_candidates, get_trade_value
 
 
 class GreedyMonopolyPlayer(MonopolyPlayer):
     def __init__(self, player_id):
         super().__init__(player_id)
+        # Most paid above a house's or hotel's price for it in a shortage auction
         self.DEFAULT_HOUSE_VALUE = 100
         self.DEFAULT_HOTEL_VALUE = 100
+        # Cash to keep in hand after buying a property or un-mortgaging one
+        self.PURCHASE_CASH_RESERVE = 0
+        self.UNMORTGAGE_CASH_RESERVE = 0
+        # Cash to keep in hand after building a house or hotel
+        self.BUILD_CASH_RESERVE = 0
+        # Offer this many times the price of the properties that complete a group, keeping TRADE_CASH_RESERVE
+        self.TRADE_PREMIUM = 1.5
+        self.TRADE_CASH_RESERVE = 100
+        # Offer this many times the price of the properties that keep another player from completing a group
+        self.TRADE_BLOCK_PREMIUM = 1.0
+        # Only help another player complete a group for this many times what is given away
+        self.TRADE_ACCEPT_RATIO = 1.5
+        self.JAIL_CARD_VALUE = 50
+
+    def reset(self):
+        super().reset()
+        self.trade_offers_made = set()  # (responder seat, positions), every trade is only offered once
 
     def use_get_out_jail_free(self, game):
         return True
@@ -47,37 +66,80 @@ class GreedyMonopolyPlayer(MonopolyPlayer):
         # No way to sell to reach the money needed, return empty lists
         return {}, []
 
-    # NOTE: Current version won't offer trades for simplicity
-    # it assumes all trades are disadvantageous
-    # implement later
-    def attempt_trade(self):
-        return
+    """
+        Offers to buy the properties completing one of our groups. When the other player is missing properties
+        of ours to complete one of its own groups we offer a swap instead, evened out with cash.
+        Without a group to complete, offers to buy the properties keeping another player from completing one.
+    """
+    def attempt_trade(self, game):
+        # Completing candidates first, the sort keeps the board order within each kind
+        for candidate in sorted(get_trade_candidates(game, self), key=lambda candidate: not candidate.completes):
+            responder = candidate.responder
+            key = (responder.seat, tuple(board_position.position for board_position in candidate.properties))
+            if key in self.trade_offers_made:
+                continue
+            value = sum(get_trade_value(board_position) for board_position in candidate.properties)
+            interest = sum(get_mortgage_interest(board_position) for board_position in candidate.properties)
+            properties_given = []
+            if candidate.completes:
+                group_id = candidate.properties[0].property_group
+                for counter_candidate in get_trade_candidates(game, responder, blocking=False):
+                    if counter_candidate.responder is self and \
+                            counter_candidate.properties[0].property_group != group_id:
+                        properties_given = counter_candidate.properties
+                        break
+            if properties_given:
+                cash = value - sum(get_trade_value(board_position) for board_position in properties_given)
+            elif candidate.completes:
+                cash = int(value * self.TRADE_PREMIUM)
+            else:
+                cash = int(value * self.TRADE_BLOCK_PREMIUM)
+            if self.cash - max(cash, 0) - interest < self.TRADE_CASH_RESERVE:
+                continue
+            self.trade_offers_made.add(key)
+            return TradeOffer(self, responder, properties_given, candidate.properties, cash)
+        return None
 
-    # NOTE: Current version won't accept for simplicity
-    # it assumes all trades are disadvantageous
-    def evaluate_trade(self):
-        return
+    """
+        Accepts trades worth at least what we give, and TRADE_ACCEPT_RATIO times that when only the other
+        player completes a group
+    """
+    def evaluate_trade(self, game, offer):
+        received = offer.cash + self.JAIL_CARD_VALUE * len(offer.jail_cards_given) + \
+            sum(get_trade_value(board_position) - get_mortgage_interest(board_position)
+                for board_position in offer.properties_given)
+        given = self.JAIL_CARD_VALUE * len(offer.jail_cards_received) + \
+            sum(get_trade_value(board_position) for board_position in offer.properties_received)
+        if offer.completes_group_for(game, offer.proposer) and not offer.completes_group_for(game, self):
+            return received >= given * self.TRADE_ACCEPT_RATIO
+        return received >= given
 
     """
          If we have enough cash create an offer equal to the cost of the property
          Otherwise, offer all the cash at hand if it is less than the property
+         Houses and hotels in a shortage get their price plus a fixed premium, out of the cash we can spend
+         on building, and no offer if that doesn't cover the price
     """
     def handle_auction_turn(self, auction):
         if type(auction.auction_item) is MonopolyBoardPosition:
             return min(auction.auction_item.cost_to_buy, self.cash)
         elif auction.auction_item.name == "House":
-            return self.DEFAULT_HOUSE_VALUE
+            premium = self.DEFAULT_HOUSE_VALUE
         elif auction.auction_item.name == "Hotel":
-            return self.DEFAULT_HOTEL_VALUE
+            premium = self.DEFAULT_HOTEL_VALUE
         else:
             raise ValueError("Auction item is not a board position, house, or hotel")
-        return 0
+        price = auction.auction_item.get_minimum_offer(self)
+        available_cash = self.cash - self.BUILD_CASH_RESERVE
+        if available_cash < price:
+            return 0
+        return min(price + premium, available_cash)
 
     """
         Only purchase property we can afford now without any selling or mortgaging
     """
     def should_purchase_property(self, game, current_position):
-        return self.cash >= current_position.cost_to_buy
+        return self.cash - current_position.cost_to_buy >= self.PURCHASE_CASH_RESERVE
 
     """
         Just chooses a house we can afford
@@ -86,7 +148,7 @@ class GreedyMonopolyPlayer(MonopolyPlayer):
         if not house_building_options:
             return None
         for houseOption in house_building_options:
-            if houseOption.house_cost <= self.cash:
+            if houseOption.house_cost <= self.cash - self.BUILD_CASH_RESERVE:
                 return houseOption
         return None
 
@@ -98,7 +160,7 @@ class GreedyMonopolyPlayer(MonopolyPlayer):
         properties_to_unmortgage = []
         for mortgaged_property in [owned_property for owned_property in self.owned_properties if owned_property.is_mortgaged]:
             unmortgage_cost = int(mortgaged_property.mortgage_value * 1.1)
-            if available_cash >= unmortgage_cost:
+            if available_cash - unmortgage_cost >= self.UNMORTGAGE_CASH_RESERVE:
                 available_cash -= unmortgage_cost
                 properties_to_unmortgage.append(mortgaged_property)
         return properties_to_unmortgage
@@ -1,15 +1,22 @@
 from monopoly_ai_sim.board import RentIdx
-from random import shuffle
+import random
 
 
 class MonopolyAuctionItem:
-    def __init__(self, name, item=None):
+    def __init__(self, name, item=None, candidates=None):
         self.name = name
         self.item = item
+        # Houses and hotels: the position each bidder would build on, by seat
+        self.candidates = candidates or {}
+
+    # Bidding on a house or hotel starts at the printed house cost of the position the bidder would build on
+    def get_minimum_offer(self, player):
+        candidate = self.candidates.get(player.seat)
+        return candidate.house_cost if candidate else 0
 
 
 class MonopolyAuction:
-    def __init__(self, auction_item, players):
+    def __init__(self, auction_item, players, rng=random):
         self.auction_item = auction_item
         # You aren't allowed to auction an item with houses on it
         # Make sure that the item doesn't have any
@@ -19,19 +26,28 @@ class MonopolyAuction:
                 only properties without any buildings are allowed to be auctioned")
         self.last_offer = 0
         self.current_winner = None
-        self.players = players[:]  # Create a copy of the players in the game
+        self.players = players  # Only read, the game's live players can be passed as they are
+        self.rng = rng
+
+    def get_minimum_offer(self, player):
+        if type(self.auction_item) is MonopolyAuctionItem:
+            return self.auction_item.get_minimum_offer(player)
+        return 0
 
-    # Randomly create a play order
+    # Bidding starts with a random player each time and goes around the table from there
     def get_auction_winner(self):
-        shuffle(self.players)   # Choose a random auction order each time!
+        if not self.players:
+            return None
+        first = self.rng.randrange(len(self.players))
+        bidding_order = self.players[first:] + self.players[:first]
         offer_updated = True
         while offer_updated:
             offer_updated = False
-            for player in self.players:
+            for player in bidding_order:
                 offer = player.handle_auction_turn(self)
-                # Register the offer if it is better than the previous offer,
+                # Register the offer if it is better than the previous offer, not below the item's price,
                 # and if the player can afford to pay it!
-                if self.last_offer < offer < player.get_asset_value():
+                if self.last_offer < offer < player.get_asset_value() and offer >= self.get_minimum_offer(player):
                     offer_updated = True
                     self.current_winner = player
                     self.last_offer = offer
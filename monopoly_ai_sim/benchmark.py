@@ -0,0 +1,104 @@
+# Engine benchmarks
+#
+#   python -m monopoly_ai_sim.benchmark stats [num_games]
+#   python -m monopoly_ai_sim.benchmark players [num_games] [max_players]
+#   python -m monopoly_ai_sim.benchmark memory [num_games] [player_count]
+import gc
+import resource
+import sys
+import time
+
+from monopoly_ai_sim.ai.greedy import GreedyMonopolyPlayer
+from monopoly_ai_sim.monopoly import MonopolyGame
+from monopoly_ai_sim.stats import GameStatistics
+
+
+def time_game(seed, player_count=2, stats=None):
+    start = time.perf_counter()
+    game = MonopolyGame([GreedyMonopolyPlayer(seat) for seat in range(player_count)], seed)
+    game.stats = stats
+    game.do_simulation()
+    return time.perf_counter() - start
+
+
+# Statistics collection has to stay cheap enough to leave on for large sweeps
+# Seeded games replay identically, so every game is timed with and without statistics back to back
+def bench_stats_overhead(num_games=500):
+    stats = GameStatistics()
+    baseline = with_stats = 0.0
+    for seed in range(num_games):
+        baseline += time_game(seed)
+        with_stats += time_game(seed, stats=stats)
+    print("%d games: %.3fs without statistics, %.3fs with statistics, %.1f%% overhead" % (
+        num_games, baseline, with_stats, 100.0 * (with_stats - baseline) / baseline))
+
+
+# Per-turn cost should stay flat as tables grow, a turn must not pay for every other player at the table
+def bench_player_count(num_games=200, max_players=8):
+    for player_count in range(2, max_players + 1):
+        elapsed = 0.0
+        turns = rounds = 0
+        for seed in range(num_games):
+            game = MonopolyGame([GreedyMonopolyPlayer(seat) for seat in range(player_count)], seed)
+            start = time.perf_counter()
+            game.do_simulation()
+            elapsed += time.perf_counter() - start
+            turns += game.turn_count
+            rounds += game.round_count
+        print("%d players: %d games in %.3fs, %.0f rounds per game, %.1fus per player turn" % (
+            player_count, num_games, elapsed, float(rounds) / num_games, 1e6 * elapsed / turns))
+
+
+# Finished games hold no reference cycles, so they are freed as soon as they are dropped and the cyclic
+# collector has next to nothing to do. Every game here is a new one, the worst case for memory, and memory
+# should stay flat with gen-2 collections rare however many games are played.
+def bench_memory(num_games=20000, player_count=2):
+    pauses = [0, 0.0, 0.0]  # gen-2 pauses, total and longest pause in seconds
+    started = []
+
+    def on_collection(phase, info):
+        if phase == "start":
+            started.append(time.perf_counter())
+        elif started:
+            pause = time.perf_counter() - started.pop()
+            pauses[1] += pause
+            pauses[2] = max(pauses[2], pause)
+            if info["generation"] == 2:
+                pauses[0] += 1
+
+    gc.collect()
+    gc.freeze()
+    collections_before = [generation["collections"] for generation in gc.get_stats()]
+    gc.callbacks.append(on_collection)
+    report_every = max(num_games // 10, 1)
+    start = time.perf_counter()
+    try:
+        for seed in range(num_games):
+            game = MonopolyGame([GreedyMonopolyPlayer(seat) for seat in range(player_count)], seed)
+            game.do_simulation()
+            if (seed + 1) % report_every == 0:
+                collections = [generation["collections"] - before
+                               for generation, before in zip(gc.get_stats(), collections_before)]
+                print("%d games in %.1fs: max RSS %.1fMB, %d tracked objects, collections %s" % (
+                    seed + 1, time.perf_counter() - start,
+                    resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0, len(gc.get_objects()),
+                    "/".join(str(count) for count in collections)))
+    finally:
+        gc.callbacks.remove(on_collection)
+        gc.unfreeze()
+    print("%d gen-2 collections, %.3fs in the collector, longest pause %.2fms" % (
+        pauses[0], pauses[1], 1e3 * pauses[2]))
+
+
+BENCHMARKS = {
+    "stats": bench_stats_overhead,
+    "players": bench_player_count,
+    "memory": bench_memory,
+}
+
+
+if __name__ == '__main__':
+    if len(sys.argv) < 2 or sys.argv[1] not in BENCHMARKS:
+        print("usage: python -m monopoly_ai_sim.benchmark {" + ",".join(BENCHMARKS) + "} [num_games]")
+        sys.exit(1)
+    BENCHMARKS[sys.argv[1]](*[int(arg) for arg in sys.argv[2:]])
@@ -17,7 +17,7 @@ class MonopolyBoardPosition():
     def __init__(self, csv_row):
         if len(csv_row) != 19:
             raise ValueError("Invalid CSV used to create board position")
-        self.owner = None
+        self.owner = None  # Seat of the owning player, None while the bank holds it
         self.is_mortgaged = False
         self.position = int(csv_row[0])
         self.name = csv_row[1].strip()
@@ -39,6 +39,12 @@ class MonopolyBoardPosition():
         self.fine = int(csv_row[18])
         # TODO: Add this field to CSV self.precomputed_landing_chance
 
+    # Back to an unowned, undeveloped property
+    def reset(self):
+        self.owner = None
+        self.is_mortgaged = False
+        self.rent_idx = RentIdx.DEFAULT
+
     def __str__(self):
         if self.is_mortgaged:
             return "[M][rent_idx" + str(self.rent_idx.value) + "]" + self.name
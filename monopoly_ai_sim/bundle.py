@@ -0,0 +1,95 @@
+# Compiled board and card bundles
+#
+# Parsing the CSVs for every game is slow and depends on the working directory, so the board and both decks
+# are compiled into a single bundle that ships inside the package and is loaded with one read. The rows are
+# stored as JSON lists of ints and strings after a magic and version header, so loading a bundle somebody
+# else compiled can't run any code. Board variants compile the same way:
+#
+#   python -m monopoly_ai_sim.bundle board.csv chance.csv community_chest.csv -o variant.bundle
+#
+# Regenerate standard.bundle whenever one of the packaged CSVs changes.
+import csv
+import json
+import os
+import pkgutil
+
+BUNDLE_MAGIC = b"MONOPOLY_BUNDLE"
+BUNDLE_VERSION = 2
+BUNDLE_SECTIONS = ("board", "chance", "community_chest")
+STANDARD_BUNDLE = "standard.bundle"
+
+# Every loaded bundle is kept, games only need the parsed rows
+_bundle_cache = {}
+
+
+def _read_csv_rows(path, skip_header):
+    with open(path, 'r') as f:
+        reader = csv.reader(f)
+        if skip_header:
+            next(reader, None)
+        return [row for row in reader if row]
+
+
+# Convert every numeric field up front, MonopolyBoardPosition and MonopolyCard accept both
+def _convert_row(row, text_fields):
+    return tuple(field.strip() if idx in text_fields else int(field) for idx, field in enumerate(row))
+
+
+def compile_bundle(board_csv, chance_csv, community_chest_csv):
+    rules = {
+        "board": [_convert_row(row, (1,)) for row in _read_csv_rows(board_csv, True)],
+        "chance": [_convert_row(row, (1, 2)) for row in _read_csv_rows(chance_csv, False)],
+        "community_chest": [_convert_row(row, (1, 2)) for row in _read_csv_rows(community_chest_csv, False)],
+    }
+    return BUNDLE_MAGIC + bytes([BUNDLE_VERSION]) + json.dumps(rules, separators=(",", ":")).encode("utf-8")
+
+
+def parse_bundle(data):
+    if not data.startswith(BUNDLE_MAGIC) or len(data) <= len(BUNDLE_MAGIC):
+        raise ValueError("Invalid rules bundle")
+    if data[len(BUNDLE_MAGIC)] != BUNDLE_VERSION:
+        raise ValueError("Rules bundle version " + str(data[len(BUNDLE_MAGIC)]) + " is not supported, recompile it")
+    try:
+        rules = json.loads(data[len(BUNDLE_MAGIC) + 1:].decode("utf-8"))
+    except ValueError:
+        raise ValueError("Invalid rules bundle")
+    if not isinstance(rules, dict) or set(rules) != set(BUNDLE_SECTIONS):
+        raise ValueError("Invalid rules bundle")
+    for section in BUNDLE_SECTIONS:
+        if not isinstance(rules[section], list):
+            raise ValueError("Invalid " + section + " section in the rules bundle")
+        for row in rules[section]:
+            if not isinstance(row, list) or not all(type(field) in (int, str) for field in row):
+                raise ValueError("Invalid row in the " + section + " section of the rules bundle")
+    return rules
+
+
+"""
+    Returns the rules for the bundle at path, or the standard bundle shipped with the package
+"""
+def load_bundle(path=None):
+    if path not in _bundle_cache:
+        if path is None:
+            data = pkgutil.get_data("monopoly_ai_sim", STANDARD_BUNDLE)
+        else:
+            with open(path, 'rb') as f:
+                data = f.read()
+        _bundle_cache[path] = parse_bundle(data)
+    return _bundle_cache[path]
+
+
+def main():
+    import argparse
+    package_path = os.path.dirname(os.path.abspath(__file__))
+    parser = argparse.ArgumentParser(prog="monopoly_ai_sim.bundle", description="Compile a rules bundle from CSVs")
+    parser.add_argument("board_csv", nargs="?", default=os.path.join(package_path, "game_data.csv"))
+    parser.add_argument("chance_csv", nargs="?", default=os.path.join(package_path, "chance.csv"))
+    parser.add_argument("community_chest_csv", nargs="?", default=os.path.join(package_path, "community_chest.csv"))
+    parser.add_argument("-o", "--output", default=os.path.join(package_path, STANDARD_BUNDLE))
+    args = parser.parse_args()
+    with open(args.output, 'wb') as f:
+        f.write(compile_bundle(args.board_csv, args.chance_csv, args.community_chest_csv))
+
+
+if __name__ == '__main__':
+    main()
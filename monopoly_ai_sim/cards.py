@@ -1,65 +1,85 @@
-from random import shuffle
+import random
 import logging
 
 logger = logging.getLogger('monopoly_ai_simulator')
 
 
 class MonopolyDeck:
-    def __init__(self, cards=[]):
-        self.cards = cards
+    def __init__(self, cards=None):
+        # Never share a default list, every deck needs its own cards
+        self.cards = cards if cards is not None else []
+        # The cards in the order they were loaded, used to reset the deck between games
+        self.initial_cards = self.cards[:]
+        # Cards that went from the top to the bottom of the deck since it was shuffled
+        self.rotations = 0
 
     # Only shuffle once!
-    def shuffle(self):
-        shuffle(self.cards)
+    def shuffle(self, rng=random):
+        rng.shuffle(self.cards)
+        self.rotations = 0
+
+    # Shuffles the cards that haven't come up since the deck was shuffled, the order of the others is known
+    def shuffle_unseen(self, rng=random):
+        unseen = len(self.cards) - self.rotations
+        if unseen > 1:
+            unseen_cards = self.cards[:unseen]
+            rng.shuffle(unseen_cards)
+            self.cards[:unseen] = unseen_cards
+
+    # Put every card back in its initial order and state, then shuffle
+    def reset(self, rng=random):
+        self.cards[:] = self.initial_cards
+        for card in self.cards:
+            card.drawn = card.initially_drawn
+        self.shuffle(rng)
 
     # Draws a card, performs its action
-    def draw_and_perform(self, player):
+    def draw_and_perform(self, game, player):
         if not player or not self.cards:
             return
         card = self.cards[0]
         while card.drawn:
             self.cards = self.cards[1:] + [self.cards[0]]
+            self.rotations += 1
             card = self.cards[0]
-        card.perform_action_on_player(player)
+        card.perform_action_on_player(game, player)
         self.cards = self.cards[1:] + [self.cards[0]]
+        self.rotations += 1
         return card
 
 
 class MonopolyCard():
-    def __init__(self, csv_row, game):
+    # Cards don't keep the game, it's passed to perform_action_on_player so that a game is never part of a
+    # reference cycle and is freed as soon as it's dropped
+    def __init__(self, csv_row):
         self.id = int(csv_row[0])
         self.type = csv_row[1]
         self.description = csv_row[2]
         self.flag = int(csv_row[3])
         self.amount = int(csv_row[4])
         self.drawn = bool(int(csv_row[5]))
-        self.game = game
+        self.initially_drawn = self.drawn
 
-    def perform_action_on_player(self, player):
+    def perform_action_on_player(self, game, player):
         logger.debug("Player " + str(player.id) + " draws " + self.description)
         if self.type == "set_spot":
-            if self.flag < 0:
-                player.position = (player.position + self.flag) % len(self.game.board_positions)
-            elif self.flag == 0:  # Used to go to jail and not collect anything
-                player.position = self.amount
-            elif self.amount < player.position:
-                player.cash += self.game.GO_INCOME
-                player.position = self.amount
-            else:
-                player.position = self.amount
+            # Going back, going to jail (flag 0) and advancing are all in the movement table
+            game.move_player(player, game.movement.card_moves[(self.flag, self.amount)][player.position])
         elif self.type == "cash_change":
             if self.amount < 0:
-                player.give_cash_to(self.game, None, self.amount)
+                game.collect_fine(player, -self.amount)
             else:
                 player.cash += self.amount
         elif self.type == "house_tax":
-            player.cash -= player.get_num_houses() * self.flag
+            repairs = player.get_num_houses() * self.flag
+            if repairs:
+                game.collect_fine(player, repairs)
         elif self.type == "out_of_jail":
             self.drawn = 1
             player.get_out_of_jail_free.append(self)
         elif self.type == "nearest_utility":
-            self.game.send_to_nearest_utility(player)
+            game.send_to_nearest_utility(player)
         elif self.type == "nearest_railroad":
-            self.game.send_to_nearest_railroad(player)
+            game.send_to_nearest_railroad(player)
         else:
             raise ValueError("Invalid card type drawn: " + self.type)
\ No newline at end of file
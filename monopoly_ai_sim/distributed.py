@@ -0,0 +1,273 @@
+# Coordinator/worker mode for sharded experiments
+#
+# The coordinator owns a ShardedExperiment and hands its pending shards out over TCP. Workers on any host
+# connect, ask for a shard, run it and stream the aggregates back; the coordinator checkpoints each result
+# exactly like a local run would, including writing game records to the results store, so the store only ever
+# has the coordinator as its writer. Messages are JSON objects, one per line:
+#
+#   worker -> coordinator: {"type": "request"}
+#                          {"type": "heartbeat", "index": i}
+#                          {"type": "result", "index": i, "aggregates": {...}, "seconds": t}
+#   coordinator -> worker: {"type": "shard", "index": i, "first_seed": s, "num_games": n, ...}
+#                          {"type": "wait", "seconds": t}
+#                          {"type": "done"}
+#
+# A shard is leased to the worker running it. The lease is released when the worker's connection drops or
+# when no heartbeat has been seen for lease_timeout seconds, and the shard goes back to the queue.
+import gc
+import json
+import logging
+import socket
+import socketserver
+import threading
+import time
+from collections import deque
+
+from monopoly_ai_sim.shards import run_shard
+
+logger = logging.getLogger('monopoly_ai_simulator')
+
+
+def send_message(wfile, message):
+    wfile.write((json.dumps(message) + "\n").encode())
+    wfile.flush()
+
+
+def receive_message(rfile):
+    line = rfile.readline()
+    if not line:
+        return None
+    return json.loads(line.decode())
+
+
+def get_worker_name(worker_id):
+    return ":".join(str(part) for part in worker_id)
+
+
+class _CoordinatorServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+class _WorkerConnectionHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        coordinator = self.server.coordinator
+        worker_id = self.client_address
+        try:
+            while True:
+                message = receive_message(self.rfile)
+                if message is None:
+                    break
+                if message["type"] == "request":
+                    send_message(self.wfile, coordinator.lease_shard(worker_id))
+                elif message["type"] == "heartbeat":
+                    coordinator.renew_lease(worker_id, message["index"])
+                elif message["type"] == "result":
+                    coordinator.complete_shard(worker_id, message["index"], message["aggregates"],
+                                               message.get("seconds", 0.0))
+                else:
+                    raise ValueError("Invalid message from worker: " + str(message))
+        # KeyError when a message is missing one of its fields
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning("Lost worker " + str(worker_id) + ": " + str(e))
+        finally:
+            coordinator.release_leases(worker_id)
+
+
+class Coordinator:
+    # metrics - optional RunMetrics, every worker connection updates its own slot as results come in
+    def __init__(self, experiment, host="127.0.0.1", port=0, lease_timeout=60.0, poll_interval=0.5, metrics=None):
+        self.experiment = experiment
+        self.metrics = metrics
+        self.lease_timeout = lease_timeout
+        self.poll_interval = poll_interval
+        self.shards = {shard.index: shard for shard in experiment.get_shards()}
+        self.pending = deque()
+        self.leases = {}  # shard index -> (worker id, lease deadline)
+        self.lock = threading.Lock()
+        # Shard results are checkpointed, and written to the results store, one at a time
+        self.record_lock = threading.Lock()
+        self.server = _CoordinatorServer((host, port), _WorkerConnectionHandler, bind_and_activate=False)
+        self.server.coordinator = self
+
+    # The port actually bound, useful when the coordinator was created with port 0
+    @property
+    def address(self):
+        return self.server.server_address
+
+    def lease_shard(self, worker_id):
+        with self.lock:
+            while self.pending:
+                shard = self.pending.popleft()
+                if shard.index in self.leases or self.experiment.is_complete(shard):
+                    continue
+                self.leases[shard.index] = (worker_id, time.monotonic() + self.lease_timeout)
+                if self.metrics is not None:
+                    # Starts the worker's slot, its utilization counts from its first lease
+                    self.metrics.get_worker(get_worker_name(worker_id))
+                return {
+                    "type": "shard",
+                    "index": shard.index,
+                    "first_seed": shard.first_seed,
+                    "num_games": shard.num_games,
+                    "player_count": self.experiment.player_count,
+                    "player_class": self.experiment.player_class_path,
+                    "collect_stats": self.experiment.collect_stats,
+                    "collect_results": self.experiment.collect_results,
+                    "check_invariants": self.experiment.check_invariants,
+                }
+            if self.leases:
+                # Everything is handed out, but a lease may still come back
+                return {"type": "wait", "seconds": self.poll_interval}
+            return {"type": "done"}
+
+    def renew_lease(self, worker_id, index):
+        with self.lock:
+            if index in self.leases and self.leases[index][0] == worker_id:
+                self.leases[index] = (worker_id, time.monotonic() + self.lease_timeout)
+
+    """
+        Checkpoints a shard's result. The checkpoint is written under record_lock rather than lock, so a slow
+        disk holds up other results but never the leases and heartbeats of the workers still running
+    """
+    def complete_shard(self, worker_id, index, aggregates, seconds=0.0):
+        if not isinstance(index, int) or index not in self.shards:
+            raise ValueError("Result for unknown shard " + str(index))
+        shard = self.shards[index]
+        with self.record_lock:
+            # Shards are deterministic, a late result from a reassigned shard is just as good
+            recorded = not self.experiment.is_complete(shard)
+            if recorded:
+                self.experiment.record_shard(shard, aggregates)
+        with self.lock:
+            if recorded:
+                logger.debug(str(shard) + " completed by worker " + str(worker_id))
+                if self.metrics is not None:
+                    self.metrics.get_worker(get_worker_name(worker_id)).record_aggregates(aggregates, seconds)
+            self.leases.pop(index, None)
+
+    def release_leases(self, worker_id):
+        with self.lock:
+            for index, (lease_worker_id, _) in list(self.leases.items()):
+                if lease_worker_id == worker_id:
+                    logger.info("Reassigning " + str(self.shards[index]) + " from worker " + str(worker_id))
+                    del self.leases[index]
+                    self.pending.appendleft(self.shards[index])
+
+    def expire_leases(self):
+        now = time.monotonic()
+        with self.lock:
+            for index, (worker_id, deadline) in list(self.leases.items()):
+                if deadline < now:
+                    logger.info("Lease on " + str(self.shards[index]) + " expired for worker " + str(worker_id))
+                    del self.leases[index]
+                    self.pending.appendleft(self.shards[index])
+
+    def is_done(self):
+        with self.lock:
+            return not self.leases and all(self.experiment.is_complete(shard) for shard in self.pending)
+
+    def start(self):
+        self.experiment.prepare()
+        self.pending.extend(self.experiment.get_pending_shards())
+        if self.metrics is not None:
+            self.metrics.completed_games = self.experiment.get_completed_games()
+        self.server.server_bind()
+        self.server.server_activate()
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        logger.info("Coordinator listening on " + str(self.address) + " with " + str(len(self.pending)) +
+                    " shards to run")
+
+    # Blocks until every shard has been completed and returns the merged aggregates
+    def wait(self):
+        try:
+            while not self.is_done():
+                time.sleep(self.poll_interval)
+                self.expire_leases()
+        finally:
+            self.server.shutdown()
+            self.server.server_close()
+            self.experiment.close()
+        return self.experiment.merge()
+
+    def run(self):
+        self.start()
+        return self.wait()
+
+
+class Worker:
+    def __init__(self, host, port, heartbeat_interval=5.0):
+        self.host = host
+        self.port = port
+        self.heartbeat_interval = heartbeat_interval
+        self.write_lock = threading.Lock()
+
+    def send(self, wfile, message):
+        with self.write_lock:
+            send_message(wfile, message)
+
+    def heartbeat(self, wfile, index, stopped):
+        while not stopped.wait(self.heartbeat_interval):
+            try:
+                self.send(wfile, {"type": "heartbeat", "index": index})
+            except OSError:
+                return
+
+    # Runs shards until the coordinator is done, returns the number of shards run
+    def run(self):
+        # Everything loaded so far lives as long as the worker, the collector doesn't need to look at it again
+        gc.freeze()
+        num_shards = 0
+        with socket.create_connection((self.host, self.port)) as connection, \
+                connection.makefile('rb') as rfile, connection.makefile('wb') as wfile:
+            while True:
+                self.send(wfile, {"type": "request"})
+                message = receive_message(rfile)
+                if message is None or message["type"] == "done":
+                    break
+                if message["type"] == "wait":
+                    time.sleep(message["seconds"])
+                    continue
+
+                start = time.perf_counter()
+                stopped = threading.Event()
+                heartbeat_thread = threading.Thread(target=self.heartbeat,
+                                                    args=(wfile, message["index"], stopped), daemon=True)
+                heartbeat_thread.start()
+                try:
+                    aggregates = run_shard(message["first_seed"], message["num_games"],
+                                           message["player_count"], message["player_class"],
+                                           message["collect_stats"], message.get("collect_results", False),
+                                           message.get("check_invariants", 0))
+                finally:
+                    stopped.set()
+                    heartbeat_thread.join()
+                self.send(wfile, {"type": "result", "index": message["index"], "aggregates": aggregates,
+                                  "seconds": time.perf_counter() - start})
+                num_shards += 1
+        return num_shards
+
+
+def run_worker(host, port):
+    Worker(host, port).run()
+
+
+"""
+    Runs the experiment with a coordinator and num_workers worker processes on this machine
+"""
+def run_local(experiment, num_workers, lease_timeout=60.0, metrics=None):
+    import multiprocessing
+    coordinator = Coordinator(experiment, lease_timeout=lease_timeout, metrics=metrics)
+    coordinator.start()
+    host, port = coordinator.address
+    workers = [multiprocessing.Process(target=run_worker, args=(host, port), daemon=True)
+               for _ in range(num_workers)]
+    for worker in workers:
+        worker.start()
+    try:
+        return coordinator.wait()
+    finally:
+        for worker in workers:
+            worker.join(timeout=5)
+            if worker.is_alive():
+                worker.terminate()
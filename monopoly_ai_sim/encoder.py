@@ -0,0 +1,82 @@
+# Fixed-layout feature encoding of a game, seen from one player's seat
+#
+# encode() writes into a caller-provided 1-D float array and encode_batch() into the rows of a 2-D array,
+# nothing is allocated per call. Players are ordered relative to the observing seat: slot 0 is the observer,
+# slot k the player k seats after it, slots past the number of players stay zero. Properties are the
+# purchasable positions in board order (28 on the standard board).
+#
+# Layout version 1, P = MAX_PLAYERS, N = number of properties, B = number of board positions:
+#
+#   section           size        value
+#   ownership         N * (P+1)   one-hot per property: [unowned, owned by slot 0, ..., owned by slot P-1]
+#   development       N           rent_idx / RentIdx.MAX
+#   mortgaged         N           1.0 if mortgaged
+#   cash              P           cash / STARTING_CASH
+#   position          P * B       one-hot board position per slot
+#   jail              P           jail turns served / 3, 0.0 when not in jail
+#   bankrupt          P           1.0 if bankrupt
+#   jail cards        P           Get Out of Jail Free cards held
+#   bank buildings    2           houses left / INITIAL_HOUSE_COUNT, hotels left / INITIAL_HOTEL_COUNT
+#
+# Bump ENCODER_VERSION whenever the layout changes, models trained on one version can't read another.
+from monopoly_ai_sim.board import RentIdx
+from monopoly_ai_sim.monopoly import JailState
+
+ENCODER_VERSION = 1
+MAX_PLAYERS = 8
+
+
+class ObservationEncoder:
+    def __init__(self, game):
+        self.num_positions = len(game.board_positions)
+        self.property_positions = [position for position, board_position in sorted(game.board_positions.items())
+                                   if board_position.is_property]
+        num_properties = len(self.property_positions)
+        # Section offsets
+        self.ownership_offset = 0
+        self.development_offset = self.ownership_offset + num_properties * (MAX_PLAYERS + 1)
+        self.mortgaged_offset = self.development_offset + num_properties
+        self.cash_offset = self.mortgaged_offset + num_properties
+        self.position_offset = self.cash_offset + MAX_PLAYERS
+        self.jail_offset = self.position_offset + MAX_PLAYERS * self.num_positions
+        self.bankrupt_offset = self.jail_offset + MAX_PLAYERS
+        self.jail_cards_offset = self.bankrupt_offset + MAX_PLAYERS
+        self.bank_offset = self.jail_cards_offset + MAX_PLAYERS
+        self.size = self.bank_offset + 2
+
+    def encode(self, game, seat, out):
+        if len(game.players) > MAX_PLAYERS:
+            raise ValueError("Games with more than " + str(MAX_PLAYERS) + " players can't be encoded")
+        out.fill(0.0)
+        player_count = len(game.players)
+
+        for idx, position in enumerate(self.property_positions):
+            board_position = game.board_positions[position]
+            if board_position.owner is None:
+                out[self.ownership_offset + idx * (MAX_PLAYERS + 1)] = 1.0
+            else:
+                slot = (board_position.owner - seat) % player_count
+                out[self.ownership_offset + idx * (MAX_PLAYERS + 1) + 1 + slot] = 1.0
+            out[self.development_offset + idx] = board_position.rent_idx / RentIdx.MAX
+            if board_position.is_mortgaged:
+                out[self.mortgaged_offset + idx] = 1.0
+
+        for player in game.players:
+            slot = (player.seat - seat) % player_count
+            out[self.cash_offset + slot] = player.cash / game.STARTING_CASH
+            out[self.position_offset + slot * self.num_positions + player.position] = 1.0
+            if player.jail_state != JailState.NOT_IN_JAIL:
+                out[self.jail_offset + slot] = (player.jail_state - JailState.NOT_IN_JAIL) / 3.0
+            if player.is_bankrupt:
+                out[self.bankrupt_offset + slot] = 1.0
+            out[self.jail_cards_offset + slot] = len(player.get_out_of_jail_free)
+
+        out[self.bank_offset] = game.house_count / game.INITIAL_HOUSE_COUNT
+        out[self.bank_offset + 1] = game.hotel_count / game.INITIAL_HOTEL_COUNT
+        return out
+
+    # Fills row i of out with games[i] seen from seats[i]
+    def encode_batch(self, games, seats, out):
+        for idx, game in enumerate(games):
+            self.encode(game, seats[idx], out[idx])
+        return out
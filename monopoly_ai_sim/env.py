@@ -0,0 +1,305 @@
+# Vectorized reset()/step() environment over MonopolyGame, for training learned players
+#
+# The engine asks players for decisions from deep inside play_turn, so every game runs on its own thread and
+# hands each decision of the agent's seat over to step(): the game thread blocks until step() brings the
+# action back. Decisions exposed to the agent, and what the action means for each of them:
+#
+#   PURCHASE   buy the property the agent landed on          0 = decline (it gets auctioned), otherwise buy
+#   JAIL_CARD  use a Get Out of Jail Free card               0 = keep it, otherwise use it
+#   JAIL_PAY   pay the fine to leave jail                    0 = roll instead, otherwise pay
+#   BUILD      build one house                               0 = stop building, 1 + position = build there
+#   AUCTION    bid in an auction                             a = bid a / AUCTION_BID_LEVELS of the list price
+#                                                            (a house's or hotel's house cost in a shortage)
+#
+# Everything else (selling, mortgaging, unmortgaging) is played by GreedyMonopolyPlayer. Observations,
+# rewards, dones and pending decisions come back in preallocated NumPy arrays that are filled in place.
+# Finished games are reset automatically: the step that ends a game returns its reward with done set, and
+# the observation of the next game's first decision.
+#
+# Requires numpy (pip install MonopolyAiSim[ml]).
+import threading
+from enum import IntEnum
+
+import numpy as np
+
+from monopoly_ai_sim.ai.greedy import GreedyMonopolyPlayer
+from monopoly_ai_sim.board import MonopolyBoardPosition
+from monopoly_ai_sim.encoder import ObservationEncoder
+from monopoly_ai_sim.monopoly import MonopolyGame
+
+NUM_POSITIONS = 40
+NUM_ACTIONS = NUM_POSITIONS + 1
+AUCTION_BID_LEVELS = 20
+
+
+class Decision(IntEnum):
+    NONE = 0
+    PURCHASE = 1
+    JAIL_CARD = 2
+    JAIL_PAY = 3
+    BUILD = 4
+    AUCTION = 5
+
+
+NUM_DECISIONS = len(Decision)
+
+# Observations are the pending decision one-hot, a one-hot of the position the decision is about,
+# then the ObservationEncoder features of the game seen from the agent's seat
+ENCODING_OFFSET = NUM_DECISIONS + NUM_POSITIONS
+
+
+class _EnvClosed(Exception):
+    pass
+
+
+# Hands decisions from a game thread to the environment and actions back
+class _GameSlot:
+    def __init__(self, game, agent):
+        self.game = game
+        self.agent = agent
+        self.action_ready = threading.Semaphore(0)
+        self.decision_ready = threading.Semaphore(0)
+        self.decision = Decision.NONE
+        self.subject = None
+        self.action = 0
+        self.game_over = False
+        self.winner = None
+        self.closed = False
+        self.seed = None
+        self.episodes = 0
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    # Game thread side
+    def request(self, decision, subject):
+        self.decision = decision
+        self.subject = subject
+        self.decision_ready.release()
+        self.action_ready.acquire()
+        if self.closed:
+            raise _EnvClosed()
+        return self.action
+
+    def run(self):
+        while True:
+            self.action_ready.acquire()
+            if self.closed:
+                return
+            self.game.reset(self.seed)
+            try:
+                self.winner = self.game.do_simulation()
+            except _EnvClosed:
+                return
+            self.decision = Decision.NONE
+            self.subject = None
+            self.game_over = True
+            self.decision_ready.release()
+
+    # Environment side, both block until the agent's next decision or the end of the game
+    def start_game(self, seed):
+        self.seed = seed
+        self.game_over = False
+        self.episodes += 1
+        self.action_ready.release()
+        self.decision_ready.acquire()
+
+    def send_action(self, action):
+        self.action = action
+        self.action_ready.release()
+        self.decision_ready.acquire()
+
+    def close(self):
+        self.closed = True
+        self.action_ready.release()
+
+
+class EnvMonopolyPlayer(GreedyMonopolyPlayer):
+    def __init__(self, player_id):
+        super().__init__(player_id)
+        self.slot = None
+
+    def use_get_out_jail_free(self, game):
+        return self.slot.request(Decision.JAIL_CARD, None) != 0
+
+    def pay_to_escape_jail(self, game):
+        return self.slot.request(Decision.JAIL_PAY, None) != 0
+
+    def should_purchase_property(self, game, current_position):
+        return self.slot.request(Decision.PURCHASE, current_position) != 0
+
+    def get_house_to_purchase(self, house_building_options):
+        if not any(option.house_cost <= self.cash for option in house_building_options):
+            return None
+        action = self.slot.request(Decision.BUILD, None)
+        for option in house_building_options:
+            if option.position == action - 1:
+                return option
+        return None
+
+    def handle_auction_turn(self, auction):
+        if self.is_bankrupt:
+            return 0
+        action = self.slot.request(Decision.AUCTION, auction.auction_item)
+        if type(auction.auction_item) is MonopolyBoardPosition:
+            list_price = auction.auction_item.cost_to_buy
+        else:
+            list_price = auction.auction_item.get_minimum_offer(self)
+        return int(list_price * action / AUCTION_BID_LEVELS)
+
+
+class MonopolyVectorEnv:
+    """
+        num_envs games with the agent at agent_seat and opponent_class players in the other seats.
+        num_workers > 0 spreads the games over that many subprocesses, observations still come back in this
+        process' arrays through shared memory.
+    """
+    def __init__(self, num_envs, player_count=2, opponent_class=GreedyMonopolyPlayer, agent_seat=0, seed=0,
+                 num_workers=0, env_offset=0):
+        self.num_envs = num_envs
+        self.player_count = player_count
+        self.seed = seed
+        self.env_offset = env_offset
+        self.encoder = ObservationEncoder(MonopolyGame())
+        self.observation_size = ENCODING_OFFSET + self.encoder.size
+        self.observations, self.rewards, self.dones, self.decisions, self.actions = \
+            _allocate_buffers(num_envs, self.observation_size)
+        self.workers = []
+        self.slots = []
+        if num_workers:
+            self.workers = _start_workers(self, num_workers, opponent_class, agent_seat)
+            return
+
+        for _ in range(num_envs):
+            agent = EnvMonopolyPlayer(agent_seat)
+            players = [opponent_class(seat) for seat in range(player_count)]
+            players[agent_seat] = agent
+            slot = _GameSlot(MonopolyGame(players), agent)
+            agent.slot = slot
+            self.slots.append(slot)
+
+    def _get_seed(self, env_idx, slot):
+        return self.seed + (self.env_offset + env_idx) + slot.episodes * 1000003
+
+    def _write_observation(self, env_idx):
+        observation = self.observations[env_idx]
+        observation.fill(0.0)
+        slot = self.slots[env_idx]
+        self.decisions[env_idx] = slot.decision
+        if slot.game_over:
+            return
+        observation[slot.decision] = 1.0
+        if type(slot.subject) is MonopolyBoardPosition:
+            observation[NUM_DECISIONS + slot.subject.position] = 1.0
+        self.encoder.encode(slot.game, slot.agent.seat, observation[ENCODING_OFFSET:])
+
+    def _start_game(self, env_idx):
+        slot = self.slots[env_idx]
+        slot.start_game(self._get_seed(env_idx, slot))
+        # Skip games the agent never had to decide anything in
+        while slot.game_over:
+            slot.start_game(self._get_seed(env_idx, slot))
+
+    def reset(self):
+        if self.workers:
+            _command_workers(self.workers, "reset")
+            return self.observations
+        for env_idx in range(self.num_envs):
+            self._start_game(env_idx)
+            self._write_observation(env_idx)
+        self.rewards.fill(0.0)
+        self.dones.fill(False)
+        return self.observations
+
+    def step(self, actions):
+        if self.workers:
+            self.actions[:] = actions
+            _command_workers(self.workers, "step")
+            return self.observations, self.rewards, self.dones, self.decisions
+
+        for env_idx, slot in enumerate(self.slots):
+            slot.send_action(int(actions[env_idx]))
+            if slot.game_over:
+                if slot.winner is slot.agent:
+                    self.rewards[env_idx] = 1.0
+                elif slot.winner is None and not slot.agent.is_bankrupt:
+                    self.rewards[env_idx] = 0.0
+                else:
+                    self.rewards[env_idx] = -1.0
+                self.dones[env_idx] = True
+                self._start_game(env_idx)
+            else:
+                self.rewards[env_idx] = 0.0
+                self.dones[env_idx] = False
+            self._write_observation(env_idx)
+        return self.observations, self.rewards, self.dones, self.decisions
+
+    def close(self):
+        if self.workers:
+            _command_workers(self.workers, "close")
+            for process, _ in self.workers:
+                process.join()
+            self.workers = []
+        for slot in self.slots:
+            slot.close()
+        self.slots = []
+
+
+def _allocate_buffers(num_envs, observation_size, shared=None):
+    shapes = [((num_envs, observation_size), np.float32), ((num_envs,), np.float32), ((num_envs,), np.bool_),
+              ((num_envs,), np.int8), ((num_envs,), np.int64)]
+    if shared is None:
+        return [np.zeros(shape, dtype) for shape, dtype in shapes]
+    return [np.frombuffer(buffer, dtype).reshape(shape) for buffer, (shape, dtype) in zip(shared, shapes)]
+
+
+def _allocate_shared(num_envs, observation_size):
+    import multiprocessing
+    sizes = [num_envs * observation_size * 4, num_envs * 4, num_envs, num_envs, num_envs * 8]
+    return [multiprocessing.RawArray('b', size) for size in sizes]
+
+
+def _worker_buffers(shared, num_envs, observation_size, start, count):
+    buffers = _allocate_buffers(num_envs, observation_size, shared)
+    return [buffer[start:start + count] for buffer in buffers]
+
+
+def _run_worker(connection, shared, num_envs, start, count, player_count, opponent_class, agent_seat, seed):
+    env = MonopolyVectorEnv(count, player_count, opponent_class, agent_seat, seed, env_offset=start)
+    env.observations, env.rewards, env.dones, env.decisions, env.actions = \
+        _worker_buffers(shared, num_envs, env.observation_size, start, count)
+    while True:
+        command = connection.recv()
+        if command == "reset":
+            env.reset()
+        elif command == "step":
+            env.step(env.actions)
+        elif command == "close":
+            env.close()
+            connection.send(None)
+            return
+        connection.send(None)
+
+
+def _start_workers(env, num_workers, opponent_class, agent_seat):
+    import multiprocessing
+    shared = _allocate_shared(env.num_envs, env.observation_size)
+    env.observations, env.rewards, env.dones, env.decisions, env.actions = \
+        _allocate_buffers(env.num_envs, env.observation_size, shared)
+    workers = []
+    envs_per_worker = -(-env.num_envs // num_workers)
+    for start in range(0, env.num_envs, envs_per_worker):
+        count = min(envs_per_worker, env.num_envs - start)
+        parent_connection, child_connection = multiprocessing.Pipe()
+        process = multiprocessing.Process(target=_run_worker, daemon=True, args=(
+            child_connection, shared, env.num_envs, start, count, env.player_count, opponent_class, agent_seat,
+            env.seed))
+        process.start()
+        workers.append((process, parent_connection))
+    return workers
+
+
+def _command_workers(workers, command):
+    for _, connection in workers:
+        connection.send(command)
+    for _, connection in workers:
+        connection.recv()
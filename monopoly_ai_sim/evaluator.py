@@ -0,0 +1,216 @@
+# Values board positions for AI heuristics
+#
+# Landing probabilities come from the stationary distribution of a Markov chain over the board squares,
+# built from the same dice, card and "Go to Jail" rules that MonopolyGame.play_turn applies.
+# Rent values are read from the rents table of each MonopolyBoardPosition.
+from monopoly_ai_sim.board import RentIdx
+
+# MonopolyGame.roll_dice draws each die with randrange(1, 6)
+DIE_FACES = range(1, 6)
+NUM_STATIONARY_ITERATIONS = 200
+
+# Landing probabilities only depend on the board and the cards, share them between games
+_transition_cache = {}
+
+
+def get_dice_distribution():
+    dice_totals = {}
+    probability = 1.0 / (len(DIE_FACES) * len(DIE_FACES))
+    for d1 in DIE_FACES:
+        for d2 in DIE_FACES:
+            dice_totals[d1 + d2] = dice_totals.get(d1 + d2, 0) + probability
+    return dice_totals
+
+
+def get_doubles_probability():
+    return 1.0 / len(DIE_FACES)
+
+
+class MonopolyEvaluator:
+    def __init__(self, game):
+        self.game = game
+        self.num_positions = len(game.board_positions)
+        self.dice_totals = get_dice_distribution()
+        self.expected_dice_total = sum(total * p for total, p in self.dice_totals.items())
+        # Rolling doubles moves us again, the third double sends us to jail without moving
+        doubles_probability = get_doubles_probability()
+        self.moves_per_turn = 1 + doubles_probability + doubles_probability ** 2
+        self.transitions, self.landing_probabilities = self._get_landing_probabilities()
+        # (group_id, development configuration) -> expected rent per position in the group
+        self._group_rent_cache = {}
+
+    def _get_board_key(self):
+        board_key = tuple((p.position, p.name, p.is_chance, p.is_community_chest, p.is_railroad, p.is_utility)
+                          for p in self.game.board_positions.values())
+        chance_key = tuple(sorted((c.id, c.type, c.flag, c.amount) for c in self.game.chance_deck.cards))
+        community_chest_key = tuple(sorted((c.id, c.type, c.flag, c.amount)
+                                           for c in self.game.community_chest_deck.cards))
+        return board_key, chance_key, community_chest_key
+
+    def _get_landing_probabilities(self):
+        board_key = self._get_board_key()
+        if board_key not in _transition_cache:
+            transitions = [self._get_transitions_from(position) for position in range(self.num_positions)]
+            _transition_cache[board_key] = (transitions, self._get_rent_landings(transitions))
+        return _transition_cache[board_key]
+
+    def _get_nearest(self, position, is_target):
+        while not is_target(self.game.board_positions[position]):
+            position = (position + 1) % self.num_positions
+        return position
+
+    """
+        Returns a list of (final position, probability, pays_rent) for a token landing on position
+        pays_rent is False when the move came from a nearest utility/railroad card, play_turn does
+        not process the property in that case
+    """
+    def _resolve_landing(self, position, probability, depth=0):
+        board_position = self.game.board_positions[position]
+        if board_position.name == "Go to Jail":
+            return [(self.game.POSITION_JAIL, probability, False)]
+        if board_position.is_chance:
+            deck = self.game.chance_deck
+        elif board_position.is_community_chest:
+            deck = self.game.community_chest_deck
+        else:
+            return [(position, probability, True)]
+
+        outcomes = []
+        card_probability = probability / len(deck.cards)
+        for card in deck.cards:
+            if card.type == "set_spot":
+                if card.flag < 0:
+                    destination = (position + card.flag) % self.num_positions
+                else:
+                    destination = card.amount
+                # Cards moving onto another card square draw again, stop chains that never terminate
+                if depth < 2:
+                    outcomes += self._resolve_landing(destination, card_probability, depth + 1)
+                else:
+                    outcomes.append((destination, card_probability, False))
+            elif card.type == "nearest_utility":
+                outcomes.append((self._get_nearest(position, lambda p: p.is_utility), card_probability, False))
+            elif card.type == "nearest_railroad":
+                outcomes.append((self._get_nearest(position, lambda p: p.is_railroad), card_probability, False))
+            else:
+                outcomes.append((position, card_probability, True))
+        return outcomes
+
+    def _get_transitions_from(self, position):
+        transitions = {}
+        for dice_total, probability in self.dice_totals.items():
+            landing = (position + dice_total) % self.num_positions
+            for destination, destination_probability, pays_rent in self._resolve_landing(landing, probability):
+                key = (destination, pays_rent)
+                transitions[key] = transitions.get(key, 0) + destination_probability
+        return [(destination, probability, pays_rent) for (destination, pays_rent), probability in transitions.items()]
+
+    # Power iteration over the chain to find where tokens end their moves,
+    # then the chance of a single move landing on a position and paying rent there
+    def _get_rent_landings(self, transitions):
+        occupancy = [1.0 / self.num_positions] * self.num_positions
+        for _ in range(NUM_STATIONARY_ITERATIONS):
+            next_occupancy = [0.0] * self.num_positions
+            for position in range(self.num_positions):
+                for destination, probability, _ in transitions[position]:
+                    next_occupancy[destination] += occupancy[position] * probability
+            occupancy = next_occupancy
+
+        rent_landings = [0.0] * self.num_positions
+        for position in range(self.num_positions):
+            for destination, probability, pays_rent in transitions[position]:
+                if pays_rent:
+                    rent_landings[destination] += occupancy[position] * probability
+        return rent_landings
+
+    # Rent paid by a visitor landing on the position at the given rent index
+    def get_rent(self, board_position, rent_idx):
+        if board_position.is_utility:
+            return self.expected_dice_total * board_position.rents[rent_idx]
+        return board_position.rents[rent_idx]
+
+    # Expected rent collected from a single opponent turn
+    def get_expected_rent_at(self, board_position, rent_idx=None):
+        if rent_idx is None:
+            rent_idx = board_position.rent_idx
+        return self.landing_probabilities[board_position.position] * self.moves_per_turn * \
+            self.get_rent(board_position, rent_idx)
+
+    def get_group_expected_rents(self, group_id):
+        group_properties = self.game.group_id_to_position[group_id]
+        configuration = tuple((p.rent_idx, p.is_mortgaged, p.owner is None) for p in group_properties)
+        key = (group_id, configuration)
+        if key not in self._group_rent_cache:
+            expected_rents = []
+            for board_position, (rent_idx, is_mortgaged, is_unowned) in zip(group_properties, configuration):
+                if is_mortgaged or is_unowned:
+                    expected_rents.append(0.0)
+                else:
+                    expected_rents.append(self.get_expected_rent_at(board_position, rent_idx))
+            self._group_rent_cache[key] = expected_rents
+        return self._group_rent_cache[key]
+
+    """
+        Returns the expected rent each owned property earns per opponent turn in the current game state
+    """
+    def get_expected_rents(self):
+        expected_rents = {}
+        for group_id, group_properties in self.game.group_id_to_position.items():
+            if not group_properties[0].is_property:
+                continue
+            for board_position, expected_rent in zip(group_properties, self.get_group_expected_rents(group_id)):
+                if board_position.owner is not None:
+                    expected_rents[board_position.position] = expected_rent
+        return expected_rents
+
+    """
+        Returns the position the next house in the group goes on, and the increase in expected rent per
+        opponent turn it brings. Houses must be built evenly, the least developed property is chosen.
+    """
+    def get_next_house_value(self, group_id):
+        group_properties = self.game.group_id_to_position[group_id]
+        if group_properties[0].is_railroad or group_properties[0].is_utility:
+            return None, 0.0
+        owner = group_properties[0].owner
+        if owner is None or any(p.owner != owner or p.is_mortgaged for p in group_properties):
+            return None, 0.0
+        next_house_position = min(group_properties, key=lambda p: p.rent_idx)
+        if next_house_position.rent_idx < RentIdx.GROUP_COMPLETE_NO_HOUSES or \
+                next_house_position.rent_idx >= RentIdx.HOTEL:
+            return None, 0.0
+        current_rents = self.get_group_expected_rents(group_id)
+        next_rent = self.get_expected_rent_at(next_house_position, next_house_position.rent_idx + 1)
+        return next_house_position, next_rent - current_rents[group_properties.index(next_house_position)]
+
+    # Number of opponent turns until the cost is made back
+    @staticmethod
+    def get_payback_period(cost, income_per_turn, num_opponents=1):
+        if income_per_turn <= 0 or num_opponents <= 0:
+            return float("inf")
+        return cost / (income_per_turn * num_opponents)
+
+    def get_house_payback_period(self, group_id, num_opponents=1):
+        board_position, marginal_rent = self.get_next_house_value(group_id)
+        if board_position is None:
+            return float("inf")
+        return self.get_payback_period(board_position.house_cost, marginal_rent, num_opponents)
+
+    """
+        Payback period of buying an unowned property for the player, counting the rent increase
+        on the rest of the group the player already owns
+    """
+    def get_property_payback_period(self, board_position, player, num_opponents=1):
+        group_properties = self.game.group_id_to_position[board_position.property_group]
+        owned_count = sum(1 for p in group_properties if p.owner == player.seat) + 1
+        if board_position.is_railroad or board_position.is_utility:
+            rent_idx = RentIdx(owned_count - 1)
+            income = sum(self.get_expected_rent_at(p, rent_idx) for p in group_properties
+                         if p.owner == player.seat or p is board_position) - \
+                sum(self.get_expected_rent_at(p, RentIdx(owned_count - 2)) for p in group_properties
+                    if p.owner == player.seat)
+        elif owned_count == len(group_properties):
+            income = sum(self.get_expected_rent_at(p, RentIdx.GROUP_COMPLETE_NO_HOUSES) for p in group_properties) - \
+                sum(self.get_expected_rent_at(p, RentIdx.ONLY_DEED) for p in group_properties if p.owner == player.seat)
+        else:
+            income = self.get_expected_rent_at(board_position, RentIdx.ONLY_DEED)
+        return self.get_payback_period(board_position.cost_to_buy, income, num_opponents)
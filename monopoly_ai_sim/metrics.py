@@ -0,0 +1,227 @@
+# Live throughput and progress metrics of long runs
+#
+# Every worker (the simulator loop, a local shard runner, or a remote worker as seen by the coordinator) gets
+# its own WorkerCounters slot and is the only one writing to it. Games are counted in plain attributes and
+# published in batches by swapping in a new snapshot tuple, so readers never take a lock and never see a half
+# updated slot. RunMetrics adds the snapshots up into progress, rates and win rates, which MetricsMonitor
+# logs as a one line summary every few seconds and, optionally, serves as Prometheus text on a local port:
+#
+#   curl http://127.0.0.1:9100/metrics
+import logging
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+logger = logging.getLogger('monopoly_ai_simulator')
+
+# A worker publishes its counters every PUBLISH_BATCH games, or sooner once PUBLISH_INTERVAL seconds passed
+PUBLISH_BATCH = 64
+PUBLISH_INTERVAL = 1.0
+
+
+class WorkerCounters:
+    def __init__(self, name, player_count):
+        self.name = name
+        self.started = time.monotonic()
+        self.games = 0
+        self.draws = 0
+        self.turns = 0
+        self.wins = [0] * player_count
+        self.busy_seconds = 0.0
+        self.unpublished = 0
+        self.last_published = self.started
+        # What readers see: (games, draws, turns, wins per seat, busy seconds), replaced as a whole
+        self.snapshot = (0, 0, 0, tuple(self.wins), 0.0)
+
+    # winner_seat is None for a draw, turns counts the turns played by players still in the game
+    def record_game(self, winner_seat, turns, seconds):
+        self.games += 1
+        if winner_seat is None:
+            self.draws += 1
+        else:
+            self.wins[winner_seat] += 1
+        self.turns += turns
+        self.busy_seconds += seconds
+        self.unpublished += 1
+        if self.unpublished >= PUBLISH_BATCH or time.monotonic() - self.last_published >= PUBLISH_INTERVAL:
+            self.publish()
+
+    # Records a whole shard, aggregates as returned by shards.run_shard
+    def record_aggregates(self, aggregates, seconds):
+        self.games += aggregates["games"]
+        self.draws += aggregates["draws"]
+        self.turns += aggregates.get("turns", 0)
+        for seat, wins in enumerate(aggregates["wins"]):
+            self.wins[seat] += wins
+        self.busy_seconds += seconds
+        self.publish()
+
+    def publish(self):
+        self.snapshot = (self.games, self.draws, self.turns, tuple(self.wins), self.busy_seconds)
+        self.unpublished = 0
+        self.last_published = time.monotonic()
+
+    # Share of the time since the worker started spent playing games
+    def get_utilization(self, now=None):
+        elapsed = (now or time.monotonic()) - self.started
+        return min(self.snapshot[4] / elapsed, 1.0) if elapsed > 0 else 0.0
+
+
+class RunMetrics:
+    """
+        total_games - games in the whole run
+        completed_games - games already completed before this run started, like resumed checkpoints
+    """
+    def __init__(self, total_games, player_count, completed_games=0):
+        self.total_games = total_games
+        self.player_count = player_count
+        self.completed_games = completed_games
+        self.started = time.monotonic()
+        self.workers = {}  # name -> WorkerCounters
+
+    # Only the worker itself should write to the slot returned
+    def get_worker(self, name):
+        counters = self.workers.get(name)
+        if counters is None:
+            counters = WorkerCounters(name, self.player_count)
+            self.workers[name] = counters
+        return counters
+
+    # Returns (games, draws, turns, wins per seat) played in this run, from the published snapshots
+    def get_totals(self):
+        games = draws = turns = 0
+        wins = [0] * self.player_count
+        for counters in list(self.workers.values()):
+            worker_games, worker_draws, worker_turns, worker_wins, _ = counters.snapshot
+            games += worker_games
+            draws += worker_draws
+            turns += worker_turns
+            for seat, seat_wins in enumerate(worker_wins):
+                wins[seat] += seat_wins
+        return games, draws, turns, wins
+
+    def get_summary(self):
+        now = time.monotonic()
+        games, draws, turns, wins = self.get_totals()
+        elapsed = max(now - self.started, 1e-9)
+        completed = self.completed_games + games
+        remaining = max(self.total_games - completed, 0)
+        games_per_second = games / elapsed
+        workers = list(self.workers.values())
+        utilization = sum(counters.get_utilization(now) for counters in workers) / len(workers) if workers else 0.0
+        summary = "%d/%d games (%.1f%%), %.1f games/s, %.0f turns/s, %d workers %.0f%% busy" % (
+            completed, self.total_games, 100.0 * completed / max(self.total_games, 1), games_per_second,
+            turns / elapsed, len(workers), 100.0 * utilization)
+        if games:
+            summary += ", win rates " + " ".join("%.1f%%" % (100.0 * seat_wins / games) for seat_wins in wins) + \
+                       ", draws %.1f%%" % (100.0 * draws / games)
+        if remaining and games_per_second:
+            summary += ", %ds left" % (remaining / games_per_second)
+        return summary
+
+    def to_prometheus(self):
+        now = time.monotonic()
+        games, draws, turns, wins = self.get_totals()
+        elapsed = max(now - self.started, 1e-9)
+        completed = self.completed_games + games
+        lines = []
+
+        def add(name, metric_type, description, samples):
+            lines.append("# HELP " + name + " " + description)
+            lines.append("# TYPE " + name + " " + metric_type)
+            for labels, value in samples:
+                lines.append(name + labels + " " + repr(value))
+
+        add("monopoly_games_completed_total", "counter", "Games completed, including resumed checkpoints",
+            [("", completed)])
+        add("monopoly_games_remaining", "gauge", "Games left to play", [("", max(self.total_games - completed, 0))])
+        add("monopoly_games_per_second", "gauge", "Games completed per second in this run",
+            [("", games / elapsed)])
+        add("monopoly_turns_total", "counter", "Player turns played in this run", [("", turns)])
+        add("monopoly_turns_per_second", "gauge", "Player turns played per second in this run",
+            [("", turns / elapsed)])
+        add("monopoly_draws_total", "counter", "Games of this run that hit the turn limit", [("", draws)])
+        add("monopoly_wins_total", "counter", "Games of this run won per seat",
+            [('{seat="' + str(seat) + '"}', seat_wins) for seat, seat_wins in enumerate(wins)])
+        add("monopoly_win_rate", "gauge", "Share of the games of this run won per seat",
+            [('{seat="' + str(seat) + '"}', float(seat_wins) / games if games else 0.0)
+             for seat, seat_wins in enumerate(wins)])
+        workers = sorted(self.workers.values(), key=lambda counters: counters.name)
+        add("monopoly_worker_games_total", "counter", "Games completed per worker",
+            [('{worker="' + counters.name + '"}', counters.snapshot[0]) for counters in workers])
+        add("monopoly_worker_utilization", "gauge", "Share of the time each worker spends playing games",
+            [('{worker="' + counters.name + '"}', counters.get_utilization(now)) for counters in workers])
+        return "\n".join(lines) + "\n"
+
+
+class _MetricsRequestHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path not in ("/", "/metrics"):
+            self.send_error(404)
+            return
+        body = self.server.metrics.to_prometheus().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        logger.debug("Metrics request: " + format % args)
+
+
+class MetricsServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, metrics, host="127.0.0.1", port=0):
+        super().__init__((host, port), _MetricsRequestHandler)
+        self.metrics = metrics
+
+    # The port actually bound, useful when the server was created with port 0
+    @property
+    def address(self):
+        return self.server_address
+
+
+"""
+    Logs a summary of the metrics every summary_interval seconds, and serves them on port if given,
+    while the with block runs
+"""
+class MetricsMonitor:
+    def __init__(self, metrics, port=None, summary_interval=10.0, host="127.0.0.1"):
+        self.metrics = metrics
+        self.summary_interval = summary_interval
+        self.server = MetricsServer(metrics, host, port) if port is not None else None
+        self.stopped = threading.Event()
+        self.threads = []
+
+    def report(self):
+        while not self.stopped.wait(self.summary_interval):
+            logger.info("Progress: " + self.metrics.get_summary())
+
+    def start(self):
+        if self.server is not None:
+            self.threads.append(threading.Thread(target=self.server.serve_forever, daemon=True))
+            logger.info("Serving metrics on http://" + self.server.address[0] + ":" + str(self.server.address[1]) +
+                        "/metrics")
+        if self.summary_interval:
+            self.threads.append(threading.Thread(target=self.report, daemon=True))
+        for thread in self.threads:
+            thread.start()
+
+    def stop(self):
+        self.stopped.set()
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+        for thread in self.threads:
+            thread.join()
+        self.threads = []
+        logger.info("Finished: " + self.metrics.get_summary())
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
@@ -1,13 +1,15 @@
 # This is a simulator for monopoly
 import logging
-import csv
 from enum import IntEnum
 from math import ceil
-from random import randrange, shuffle
+from random import Random
 
 from monopoly_ai_sim.board import MonopolyBoardPosition, RentIdx
 from monopoly_ai_sim.cards import MonopolyDeck, MonopolyCard
-from monopoly_ai_sim.auction import MonopolyAuction
+from monopoly_ai_sim.auction import MonopolyAuction, MonopolyAuctionItem
+from monopoly_ai_sim.bundle import load_bundle
+from monopoly_ai_sim.movement import MovementTable
+from monopoly_ai_sim.rules import STANDARD_RULES
 
 logger = logging.getLogger('monopoly_ai_simulator')
 
@@ -19,117 +21,230 @@ class JailState(IntEnum):
 
 
 class MonopolyGame():
-    def __init__(self, players=None):
+    # bundle_path - compiled rules bundle for a board variant, the standard board is used by default
+    # rules - HouseRules to play with, the standard rules by default
+    def __init__(self, players=None, seed=None, bundle_path=None, rules=None):
 
         # Monopoly Game constants
-        self.STARTING_CASH = 1500
-        self.GO_INCOME = 200
-        self.DOUBLES_TO_JAIL = 3
-        self.LUXURY_TAX = 100
-        self.INCOME_TAX_OPTION = 200
+        self.rules = rules if rules is not None else STANDARD_RULES
+        self.STARTING_CASH = self.rules.starting_cash
+        self.GO_INCOME = self.rules.go_income
+        self.DOUBLES_TO_JAIL = self.rules.doubles_to_jail
+        self.JAIL_TURNS = self.rules.jail_turns
+        self.LUXURY_TAX = self.rules.luxury_tax
+        self.INCOME_TAX_OPTION = self.rules.income_tax_option
         self.POSITION_GO = 0
         self.POSITION_JAIL = 10
-        self.ESCAPE_JAIL_COST = 50
-        self.INITIAL_HOUSE_COUNT = 32
-        self.INITIAL_HOTEL_COUNT = 12
-
-        # Board positions and cards are populated by CSV
-        self.house_count = self.INITIAL_HOUSE_COUNT
-        self.hotel_count = self.INITIAL_HOTEL_COUNT
+        self.ESCAPE_JAIL_COST = self.rules.escape_jail_cost
+        self.INITIAL_HOUSE_COUNT = self.rules.house_count
+        self.INITIAL_HOTEL_COUNT = self.rules.hotel_count
+        self.MAX_ROUNDS = 500  # Games still going after this many rounds are draws
+        self.TRADES_PER_TURN = self.rules.trades_per_turn
+        # Taxes and fines waiting on Free Parking, only used with the free_parking_jackpot rule
+        self.jackpot = 0
+        # (seat, group id) -> round a player first completed a property group in, for the results store
+        self.group_completions = {}
+        # Street groups fully owned and split between two players, {group id: group}, the only groups with trades
+        self.split_groups = {}
+
+        # Board positions and cards are populated by the rules bundle
         self.board_positions = {}
         self.group_id_to_position = {}
         self.chance_deck = MonopolyDeck()
         self.community_chest_deck = MonopolyDeck()
         self.players = players
+        # All randomness in a game comes from these streams so that a seed replays the same game. They are
+        # kept apart (and dice are per seat) so that games with different players, replayed from the same
+        # seed, still see the same dice, cards and auction/build orders
+        self.seed = None
+        self.dice_random = []
+        self.deck_random = Random()
+        self.order_random = Random()
+        # Optional GameStatistics collector, None when statistics are not wanted
+        self.stats = None
+        # Optional InvariantChecker validating the state between turns
+        self.invariants = None
 
         # Populate the board positional data
-        with open('monopoly_ai_sim/game_data.csv', 'r') as f:
-            reader = csv.reader(f)
-            next(reader, None)  # Skip the header
-            for row in reader:
-                board_position = MonopolyBoardPosition(row)
-                if board_position.position in self.board_positions:
-                    logger.debug("Error parsing CSV file, multiple entries map to the same position")
-                self.board_positions[board_position.position] = board_position
-                if board_position.property_group not in self.group_id_to_position:
-                    self.group_id_to_position[board_position.property_group] = [board_position]
-                else:
-                    self.group_id_to_position[board_position.property_group].append(board_position)
+        rules = load_bundle(bundle_path)
+        for row in rules["board"]:
+            board_position = MonopolyBoardPosition(row)
+            if board_position.position in self.board_positions:
+                logger.debug("Error parsing rules bundle, multiple entries map to the same position")
+            self.board_positions[board_position.position] = board_position
+            if board_position.property_group not in self.group_id_to_position:
+                self.group_id_to_position[board_position.property_group] = [board_position]
+            else:
+                self.group_id_to_position[board_position.property_group].append(board_position)
 
         # Populate the chance cards
-        with open('monopoly_ai_sim/chance.csv', 'r') as f:
-            reader = csv.reader(f)
-            for row in reader:
-                chance_card = MonopolyCard(row, self)
-                self.chance_deck.cards.append(chance_card)
-        self.chance_deck.shuffle()
-        # Populate the chance cards
-        with open('monopoly_ai_sim/community_chest.csv', 'r') as f:
-            reader = csv.reader(f)
-            for row in reader:
-                community_chest_card = MonopolyCard(row, self)
-                self.community_chest_deck.cards.append(community_chest_card)
-        self.community_chest_deck.shuffle()
+        for row in rules["chance"]:
+            self.chance_deck.cards.append(MonopolyCard(row))
+        self.chance_deck.initial_cards = self.chance_deck.cards[:]
+        # Populate the community chest cards
+        for row in rules["community_chest"]:
+            self.community_chest_deck.cards.append(MonopolyCard(row))
+        self.community_chest_deck.initial_cards = self.community_chest_deck.cards[:]
+        # Bounds on what players can want to build at once, for ruling out housing shortages cheaply
+        house_costs = [board_position.house_cost for board_position in self.board_positions.values()
+                       if board_position.is_property and board_position.house_cost]
+        self.street_count = len(house_costs)
+        self.cheapest_house_cost = min(house_costs) if house_costs else 0
+        self.movement = MovementTable(self.board_positions,
+                                      self.chance_deck.cards + self.community_chest_deck.cards)
+
+        self.resolve_rules()
+        self.reset(seed)
+
+    """
+        Resolves the house rules once: every square gets its landing handler, and fines and auctions get the
+        implementation of the variant in play, so variants are never checked while playing.
+        Handlers are the class' functions, called with the game, so the game doesn't reference itself.
+    """
+    def resolve_rules(self):
+        game_class = type(self)
+        if self.rules.free_parking_jackpot:
+            self.fine_handler = game_class.pay_fine_to_jackpot
+        else:
+            self.fine_handler = game_class.pay_fine_to_bank
+        if self.rules.auctions:
+            self.auction_handler = game_class.run_property_auction
+        else:
+            self.auction_handler = game_class.skip_property_auction
+        if self.rules.trades_per_turn:
+            self.trade_handler = game_class.negotiate_trades
+        else:
+            self.trade_handler = game_class.skip_trades
+
+        # Landing handlers take (game, player, board position, dice) and return True when the player was
+        # moved and the new square has to be processed
+        self.square_handlers = [game_class.land_on_plain_square] * len(self.board_positions)
+        for position, board_position in self.board_positions.items():
+            if board_position.is_chance:
+                handler = game_class.land_on_chance
+            elif board_position.is_community_chest:
+                handler = game_class.land_on_community_chest
+            elif board_position.name == "Go to Jail":
+                handler = game_class.land_on_go_to_jail
+            elif board_position.name == "Luxury Tax":
+                handler = game_class.land_on_luxury_tax
+            elif board_position.name == "Income Tax":
+                handler = game_class.land_on_income_tax
+            elif board_position.name == "Free Parking" and self.rules.free_parking_jackpot:
+                handler = game_class.land_on_free_parking_jackpot
+            elif position == self.POSITION_GO and self.rules.double_go_on_exact_landing:
+                handler = game_class.land_on_go_exactly
+            elif board_position.is_property:
+                handler = game_class.process_property
+            else:
+                continue
+            self.square_handlers[position] = handler
+
+    """
+        Restores the starting state in place so the game and its players can be reused for the next game.
+        A game reset with a seed plays exactly like a new game created with that seed.
+    """
+    def reset(self, seed=None):
+        self.seed = seed
+        self.deck_random.seed(None if seed is None else str(seed) + ":deck")
+        self.order_random.seed(None if seed is None else str(seed) + ":order")
+        self.round_count = 0
+        # Turns played by players still in the game, bankrupt players don't take turns
+        self.turn_count = 0
+        self.jackpot = 0
+        self.group_completions = {}
+        self.split_groups = {}
+        self.house_count = self.INITIAL_HOUSE_COUNT
+        self.hotel_count = self.INITIAL_HOTEL_COUNT
+        for board_position in self.board_positions.values():
+            board_position.reset()
+        self.chance_deck.reset(self.deck_random)
+        self.community_chest_deck.reset(self.deck_random)
+        if self.players:
+            for seat, player in enumerate(self.players):
+                player.reset()
+                player.seat = seat
+        self.reset_live_players()
+
+    """
+        Players still in the game are kept in seat order, and the build/unmortgage pass after every roll only
+        visits improving_seats: players with a mortgaged property or a group that can still be built on.
+        Seats are rechecked when marked dirty, so the pass costs nothing for the players it can't help.
+    """
+    def reset_live_players(self):
+        self.live_players = list(self.players) if self.players else []
+        self.dirty_seats = set(range(len(self.live_players)))
+        self.improving_seats = set()
+
+    # The player's buildings, mortgages or properties changed
+    def mark_dirty(self, player):
+        self.dirty_seats.add(player.seat)
+
+    def remove_live_player(self, player):
+        if player in self.live_players:
+            self.live_players.remove(player)
+        self.dirty_seats.discard(player.seat)
+        self.improving_seats.discard(player.seat)
 
     # If exists returns the winner of the game
     def get_winner(self):
-        if not self.players:
-            return None
-        winner = None
-        for player in self.players:
-            if not player.is_bankrupt:
-                if winner:
-                    return None
-                else:
-                    winner = player
-        return winner
+        if len(self.live_players) == 1:
+            return self.live_players[0]
+        return None
 
     # Player starts at go and gets 1500 to start as per rules
     # IDEA: We should see how changing starting value of this game will affect the outcome
     def init_player(self, player):
         player.cash = self.STARTING_CASH
         player.position = self.POSITION_GO
-        player.otherPlayers = [p for p in self.players if (player is not p)]
 
     def play_jail(self, player):
         logger.debug("Player " + str(player.id) + " plays turn " + str(player.jail_state) + " of jail")
 
-        if player.jail_state > JailState.JAIL_TURN_3:
+        # Served every jail turn without rolling doubles, the player pays the fine to leave and rolls as usual
+        if player.jail_state >= self.JAIL_TURNS:
+            logger.debug("Player " + str(player.id) + " served " + str(self.JAIL_TURNS) + " turns and pays to leave jail")
             player.jail_state = JailState.NOT_IN_JAIL
+            self.collect_fine(player, self.ESCAPE_JAIL_COST)
             return
 
+        # Escaping with a card or by paying leaves jail right away, the player then rolls as usual
         if len(player.get_out_of_jail_free) > 0 and player.use_get_out_jail_free(self):
             logger.debug("Player " + str(player.id) + " uses get out of jail free card to escape jail")
             card = player.get_out_of_jail_free.pop()
             card.drawn = False
             player.jail_state = JailState.NOT_IN_JAIL
+            return
         # NOTE: For now assume you cant manage properties in jail
         # This is not Shawshank Redemption
         if player.cash >= self.ESCAPE_JAIL_COST and player.pay_to_escape_jail(self):
             logger.debug("Player " + str(player.id) + " pays to leave jail")
-            player.give_cash_to(self, None, self.ESCAPE_JAIL_COST)
+            self.collect_fine(player, self.ESCAPE_JAIL_COST)
             player.jail_state = JailState.NOT_IN_JAIL
+            return
 
         # Update the jail state, and if we've been in jail long enough, we can escape
         player.jail_state += 1
         return
 
     def send_to_nearest_utility(self, player):
-        while not self.board_positions[player.position].is_utility:
-            if player.position == 0:
-                player.cash += self.GO_INCOME
-            player.position = (player.position+1) % len(self.board_positions)
+        self.move_player(player, self.movement.nearest_utility[player.position])
 
     def send_to_nearest_railroad(self, player):
-        while not self.board_positions[player.position].is_railroad:
-            if player.position == 0:
-                player.cash += self.GO_INCOME
-            player.position = (player.position+1) % len(self.board_positions)
+        self.move_player(player, self.movement.nearest_railroad[player.position])
+
+    # move - (destination, passed GO) from the movement table
+    def move_player(self, player, move):
+        player.position, passed_go = move
+        if passed_go:
+            player.cash += self.GO_INCOME
 
     def check_property_group_and_update_player(self, board_position):
         if not board_position:
             return
         # For railroads and utilities update the game based on the
+        if board_position.owner is not None:
+            self.dirty_seats.add(board_position.owner)
         if board_position.is_railroad or board_position.is_utility:
             new_rent_idx = -1
             if board_position.property_group in self.group_id_to_position:
@@ -137,31 +252,46 @@ class MonopolyGame():
             else:
                 raise ValueError("Property with invalid group_id = " + str(board_position.group_id) + " found")
             for board_property in property_group:
-                if board_property.owner is board_position.owner:
+                if board_property.owner == board_position.owner:
                     new_rent_idx += 1
+            if new_rent_idx == len(property_group) - 1:
+                self.record_group_completion(board_position)
             # Update the rent index on all properties of the same type the owner owns
             for board_property in property_group:
-                if board_property.owner is board_position.owner:
-                    board_position.rent_idx = RentIdx(new_rent_idx)
+                if board_property.owner == board_position.owner:
+                    board_property.rent_idx = RentIdx(new_rent_idx)
         # Normal property
         else:
             player_owns_all_properties_in_group = True
             owner = board_position.owner
-            if board_position.rent_idx > RentIdx.ONLY_DEED:
-                return
             if board_position.property_group in self.group_id_to_position:
                 property_group = self.group_id_to_position[board_position.property_group]
             for board_property in property_group:
-                if board_property.owner is not owner:
+                if board_property.owner != owner:
                     player_owns_all_properties_in_group = False
                     break
             if player_owns_all_properties_in_group:
+                self.record_group_completion(board_position)
                 for board_property in property_group:
-                    board_property.rent_idx = RentIdx.GROUP_COMPLETE_NO_HOUSES
+                    # Buildings already on a complete group stay
+                    if board_property.rent_idx < RentIdx.GROUP_COMPLETE_NO_HOUSES:
+                        board_property.rent_idx = RentIdx.GROUP_COMPLETE_NO_HOUSES
             else:
+                # The group may have been complete for the previous owner, nobody has it complete now
                 for board_property in property_group:
-                    if board_property.owner is owner:
+                    if board_property.owner is not None:
                         board_property.rent_idx = RentIdx.ONLY_DEED
+            owners = set(board_property.owner for board_property in property_group)
+            if len(owners) == 2 and None not in owners:
+                self.split_groups[board_position.property_group] = property_group
+            else:
+                self.split_groups.pop(board_position.property_group, None)
+
+    # Rounds are counted from 1, only the first completion of a group by a player is kept
+    def record_group_completion(self, board_position):
+        if board_position.owner is not None:
+            self.group_completions.setdefault((board_position.owner, board_position.property_group),
+                                              self.round_count + 1)
 
     """
     BUYING PROPERTY... Whenever you land on an unowned property you may buy that property from the Bank at its printed price. You receive the Title Deed card showing ownership; place it face up in
@@ -181,14 +311,10 @@ class MonopolyGame():
             if player.should_purchase_property(self, current_position):
                 player.purchase_property(self, current_position, current_position.cost_to_buy)
             else:
-                # Auction the property
-                auction = MonopolyAuction(current_position, self.players)
-                winner = auction.get_auction_winner()
-                if winner:
-                    winner.purchase_property(self, current_position, auction.last_offer)
+                self.auction_property(current_position, self.live_players)
 
         # If someone owns the property and it isn't mortgaged, pay up!
-        elif current_position.owner is not player and not current_position.is_mortgaged:
+        elif current_position.owner != player.seat and not current_position.is_mortgaged:
             amount_owed = 0
             # We need to pay the owner of the property
             if current_position.is_railroad:
@@ -198,15 +324,91 @@ class MonopolyGame():
             else:
                 amount_owed = current_position.rents[current_position.rent_idx]
 
+            owner = self.players[current_position.owner]
             logger.debug("Player " + str(player.id) + " owes $" + str(amount_owed) + " to Player " + str(
-                current_position.owner.id) + " for rent @ " + current_position.name)
-            player.give_cash_to(self, current_position.owner, amount_owed)
+                owner.id) + " for rent @ " + current_position.name)
+            if player.give_cash_to(self, owner, amount_owed) and self.stats is not None:
+                self.stats.rent_collected[current_position.position] += amount_owed
         return
 
-    @staticmethod
-    def roll_dice():
-        d1 = randrange(1, 6)
-        d2 = randrange(1, 6)
+    # Fines and taxes, returns False if the player went bankrupt paying
+    def collect_fine(self, player, amount):
+        return self.fine_handler(self, player, amount)
+
+    def pay_fine_to_bank(self, player, amount):
+        return player.give_cash_to(self, None, amount)
+
+    def pay_fine_to_jackpot(self, player, amount):
+        if player.give_cash_to(self, None, amount):
+            self.jackpot += amount
+            return True
+        return False
+
+    # Sells a property the bank holds to one of the bidders
+    def auction_property(self, board_position, bidders):
+        self.auction_handler(self, board_position, bidders)
+
+    def run_property_auction(self, board_position, bidders):
+        auction = MonopolyAuction(board_position, bidders, self.order_random)
+        winner = auction.get_auction_winner()
+        if winner:
+            winner.purchase_property(self, board_position, auction.last_offer)
+
+    # Without auctions the property stays with the bank
+    def skip_property_auction(self, board_position, bidders):
+        return
+
+    # The player whose turn it is makes up to TRADES_PER_TURN offers before rolling, until one is turned down
+    def negotiate_trades(self, player):
+        if not self.split_groups:
+            return
+        for _ in range(self.TRADES_PER_TURN):
+            offer = player.attempt_trade(self)
+            if offer is None or not offer.is_valid(self) or not offer.responder.evaluate_trade(self, offer):
+                return
+            logger.debug(str(offer) + " accepted")
+            offer.execute(self)
+
+    def skip_trades(self, player):
+        return
+
+    def land_on_plain_square(self, player, board_position, dice):
+        return False
+
+    def land_on_chance(self, player, board_position, dice):
+        return self.chance_deck.draw_and_perform(self, player).type == "set_spot"
+
+    def land_on_community_chest(self, player, board_position, dice):
+        return self.community_chest_deck.draw_and_perform(self, player).type == "set_spot"
+
+    def land_on_go_to_jail(self, player, board_position, dice):
+        player.jail_state = JailState.JAIL_TURN_1
+        player.position = self.POSITION_JAIL
+        return False
+
+    def land_on_luxury_tax(self, player, board_position, dice):
+        self.collect_fine(player, self.LUXURY_TAX)
+        return False
+
+    def land_on_income_tax(self, player, board_position, dice):
+        self.collect_fine(player, min(self.INCOME_TAX_OPTION, int(ceil(player.get_asset_value() * .10))))
+        return False
+
+    def land_on_free_parking_jackpot(self, player, board_position, dice):
+        logger.debug("Player " + str(player.id) + " collects the $" + str(self.jackpot) + " Free Parking jackpot")
+        player.cash += self.jackpot
+        self.jackpot = 0
+        return False
+
+    # Passing GO already paid the income once
+    def land_on_go_exactly(self, player, board_position, dice):
+        player.cash += self.GO_INCOME
+        return False
+
+    def roll_dice(self, player):
+        dice_random = self.dice_random[player.seat]
+        d1 = dice_random.randrange(1, 6)
+        d2 = dice_random.randrange(1, 6)
         return d1, d2
 
     # Plays the turn for the player per rules of the gam
@@ -215,6 +417,8 @@ class MonopolyGame():
         if player.is_bankrupt:
             return
 
+        self.trade_handler(self, player)
+
         if player.jail_state != JailState.NOT_IN_JAIL:
             self.play_jail(player)
 
@@ -223,7 +427,7 @@ class MonopolyGame():
 
         while doubles_rolled and not player.is_bankrupt:
             doubles_rolled = False
-            d1, d2 = self.roll_dice()
+            d1, d2 = self.roll_dice(player)
             logger.debug("Player " + str(player.id) + " rolls " + str((d1, d2)))
 
             # Rolling doubles will get you out of jail
@@ -243,92 +447,201 @@ class MonopolyGame():
             if player.jail_state != JailState.NOT_IN_JAIL:
                 return
 
-            # Update the position
-            player.position = (player.position + d1 + d2)
-
-            # If we passed or landed on go, collect the money
-            if player.position >= len(self.board_positions):
-                player.cash += self.GO_INCOME
-                player.position %= len(self.board_positions)
+            # Update the position, if we passed or landed on go, collect the money
+            self.move_player(player, self.movement.dice_moves[player.position][d1 + d2])
 
             # Someone owns this position, we need to pay rent to them
             while not player.is_bankrupt:
                 # Process what to do for this position
-                if player.position not in range(0, len(self.board_positions)):
-                    raise ValueError("Player " + str(player.id) + " in invalid board position " + str(player.position))
                 current_position = self.board_positions[player.position]
-                if current_position.is_chance:
-                    card = self.chance_deck.draw_and_perform(player)
-                    position_changed = card.type == "set_spot"
-                    # If our position changed, we need to to reprocess
-                    if position_changed:
-                        continue
-                    break
-                elif current_position.is_community_chest:
-                    card = self.community_chest_deck.draw_and_perform(player)
-                    position_changed = card.type == "set_spot"
-                    # If our position changed, we need to to reprocess
-                    if position_changed:
-                        continue
-                    break
-                elif current_position.name == "Go to Jail":
-                    player.jail_state = JailState.JAIL_TURN_1
-                    player.position = self.POSITION_JAIL
-                    break
-                elif current_position.name == "Luxury Tax":
-                    player.give_cash_to(self, None, self.LUXURY_TAX)
-                    break
-                elif current_position.name == "Income Tax":
-                    amount_owed = min(self.INCOME_TAX_OPTION, int(ceil(player.get_asset_value() * .10)))
-                    player.give_cash_to(self, None, amount_owed)
-                    break
-                else:
-                    self.process_property(player, current_position, (d1, d2))
+                if self.stats is not None:
+                    self.stats.landings[player.position] += 1
+                # If our position changed, we need to to reprocess
+                if not self.square_handlers[player.position](self, player, current_position, (d1, d2)):
                     break
 
-            # Allow any player to buy/un-mortgage properties
-            # The order in which this is done is random so that one player doesn't have
-            # an advantage over the limited number of house/hotel pieces
-            player_purchase_order = self.players[:]
-            shuffle(player_purchase_order)
-            for purchasing_player in player_purchase_order:
-                if not purchasing_player.is_bankrupt:
-                    purchasing_player.unmortgage_properties()
-                    purchasing_player.purchase_houses(self)
+            self.improve_properties()
         return
 
+    # Allow any player to buy/un-mortgage properties
+    # The order in which this is done is random so that one player doesn't have
+    # an advantage over the limited number of house/hotel pieces
+    def improve_properties(self):
+        if self.dirty_seats:
+            for seat in self.dirty_seats:
+                if self.players[seat].can_improve_properties():
+                    self.improving_seats.add(seat)
+                else:
+                    self.improving_seats.discard(seat)
+            self.dirty_seats.clear()
+        if not self.improving_seats:
+            return
+        purchase_order = sorted(self.improving_seats)
+        if len(purchase_order) > 1:
+            self.order_random.shuffle(purchase_order)
+        for seat in purchase_order:
+            self.players[seat].unmortgage_properties()
+        if len(purchase_order) > 1 and self.may_run_short(purchase_order):
+            self.auction_short_buildings(purchase_order)
+        for seat in purchase_order:
+            purchasing_player = self.players[seat]
+            purchasing_player.purchase_houses(self)
+            if not purchasing_player.can_improve_properties():
+                self.improving_seats.discard(seat)
+
+    # False when the bank has enough houses and hotels for anything the players could want to build now:
+    # every street at the next level, or as much as their cash pays for. Hotels replace 4 houses already built.
+    def may_run_short(self, purchase_order):
+        max_demand = sum(self.players[seat].cash for seat in purchase_order) // self.cheapest_house_cost
+        built_houses = self.INITIAL_HOUSE_COUNT - self.house_count
+        return self.house_count < min(max_demand, self.street_count) or \
+            self.hotel_count < min(max_demand, built_houses // (RentIdx.HOUSE_TO_HOTEL - 1))
+
+    """
+    HOUSING SHORTAGE... If there are a limited number of houses and hotels available and two or more players
+    wish to buy more than the Bank has, the houses or hotels must be sold at auction to the highest bidder.
+
+    What every player could build is collected before anything is built. While two or more players want more
+    houses (or hotels) than the bank has, one is auctioned between them. Each bidder names the position it
+    would build on first, bidding starts at that position's house cost and the winner pays its bid.
+    The demand totals are kept up to date as counters, only the winner's demand is collected again.
+    """
+    def auction_short_buildings(self, purchase_order):
+        demand = {}
+        house_demand = hotel_demand = 0
+        for seat in purchase_order:
+            houses, hotels = self.players[seat].get_building_demand(self)
+            if houses or hotels:
+                demand[seat] = (houses, hotels)
+                house_demand += houses
+                hotel_demand += hotels
+
+        while len(demand) > 1:
+            if house_demand > self.house_count > 0:
+                item_name, is_hotel = "House", False
+            elif hotel_demand > self.hotel_count > 0:
+                item_name, is_hotel = "Hotel", True
+            else:
+                return
+            candidates = {}
+            for seat in sorted(demand):
+                if not demand[seat][is_hotel]:
+                    continue
+                candidate = self.players[seat].get_house_to_purchase(
+                    self.get_short_building_options(self.players[seat], is_hotel))
+                if candidate is None:
+                    # Nothing the player is willing to build after all, it leaves the auctions
+                    houses, hotels = demand.pop(seat)
+                    house_demand -= houses
+                    hotel_demand -= hotels
+                else:
+                    candidates[seat] = candidate
+            if len(candidates) < 2:
+                return
+            bidders = [self.players[seat] for seat in candidates]
+            auction = MonopolyAuction(MonopolyAuctionItem(item_name, candidates=candidates), bidders,
+                                      self.order_random)
+            winner = auction.get_auction_winner()
+            if winner is None:
+                return
+            houses, hotels = demand.pop(winner.seat)
+            house_demand -= houses
+            hotel_demand -= hotels
+            logger.debug("Player " + str(winner.id) + " wins a " + item_name.lower() + " for " + str(auction.last_offer))
+            if not winner.give_cash_to(self, None, auction.last_offer):
+                continue
+            # Selling or mortgaging to pay the bid can change what the group allows, so the position is only
+            # picked now. If nothing can be built on the group anymore the bank takes the piece back.
+            group = candidates[winner.seat].property_group
+            options = [option for option in self.get_short_building_options(winner, is_hotel)
+                       if option.property_group == group]
+            if not options:
+                winner.cash += auction.last_offer
+                continue
+            winner.build_at(self, candidates[winner.seat] if candidates[winner.seat] in options else options[0])
+            houses, hotels = winner.get_building_demand(self)
+            if houses or hotels:
+                demand[winner.seat] = (houses, hotels)
+                house_demand += houses
+                hotel_demand += hotels
+
+    # Where player could build the next house, or hotel when is_hotel is set
+    def get_short_building_options(self, player, is_hotel):
+        return [option for option in player.get_house_building_options(self)
+                if (option.rent_idx == RentIdx.HOUSE_4) == is_hotel]
+
     # Start a simulation with the provided players
     # players - players in order, first player in this list will play first
     def do_simulation(self, players=None):
+        if not self.start_simulation(players):
+            return None
+
+        # Keep playing until there is a winner
+        winner = self.play_rounds(self.MAX_ROUNDS)
+
+        logger.debug("Ending statistics:")
+        logger.debug("Remaining houses: " + str(self.house_count) + " Remaining hotels:" + str(self.hotel_count))
+        if self.stats is not None:
+            self.stats.record_game(self, winner)
+        return winner
+
+    # Seats the players and deals the starting cash, returns False if there is nobody to play
+    def start_simulation(self, players=None):
         if not self.players:
             if not players:
-                return None
+                return False
             else:
                 self.players = players
 
         logger.debug("Starting simulation")
 
-        for player in self.players:
+        for seat, player in enumerate(self.players):
+            player.seat = seat
             self.init_player(player)
+            if seat == len(self.dice_random):
+                self.dice_random.append(Random())
+            self.dice_random[seat].seed(None if self.seed is None else str(self.seed) + ":dice:" + str(seat))
+        self.reset_live_players()
+        self.round_count = 0
+        self.turn_count = 0
+        return True
 
-        # Keep playing until there is a winner
-        turn_counter = 0
+    """
+        Plays whole rounds from the current position until somebody wins or max_rounds rounds have been
+        played since the start of the game. Returns the winner, None if there is none yet.
+    """
+    def play_rounds(self, max_rounds):
         winner = None
-        while not winner:
+        while not winner and self.round_count < max_rounds:
             for player in self.players:
+                if not player.is_bankrupt:
+                    self.turn_count += 1
                 self.play_turn(player)
+                if self.invariants is not None:
+                    self.invariants.after_turn(self)
             winner = self.get_winner()
-            turn_counter += 1
-            logger.debug("-------------------------")
-            logger.debug("Turn " + str(turn_counter))
-            logger.debug("-------------------------")
-            for player in self.players:
-                logger.debug("Player " + str(player.id) + "\tposition:" + str(player.position) + "\tcash="  + str(player.cash) + "\tproperty assets="  + str(player.get_property_value()) + " " + str(sorted(player.owned_properties, key=lambda x:x.position)))
-                logger.debug(player.house_building_history)
-            logger.debug("-------------------------")
-            if turn_counter == 500:
-                break
-
-        logger.debug("Ending statistics:")
-        logger.debug("Remaining houses: " + str(self.house_count) + " Remaining hotels:" + str(self.hotel_count))
+            self.round_count += 1
+            # Building the summary of every player costs more than the round itself
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("-------------------------")
+                logger.debug("Turn " + str(self.round_count))
+                logger.debug("-------------------------")
+                for player in self.players:
+                    logger.debug("Player " + str(player.id) + "\tposition:" + str(player.position) + "\tcash="  + str(player.cash) + "\tproperty assets="  + str(player.get_property_value()) + " " + str(sorted(player.owned_properties, key=lambda x:x.position)))
+                    logger.debug(player.house_building_history)
+                logger.debug("-------------------------")
         return winner
+
+    """
+        Reseeds every random stream so that a copy of a game in progress plays on differently, seed being
+        any string or number. Only the cards that haven't come up since the decks were shuffled are reshuffled,
+        the cards drawn so far come back in the order everybody saw them in.
+    """
+    def reseed(self, seed):
+        seed = str(seed)
+        for seat, dice_random in enumerate(self.dice_random):
+            dice_random.seed(seed + ":dice:" + str(seat))
+        self.deck_random.seed(seed + ":deck")
+        self.order_random.seed(seed + ":order")
+        self.chance_deck.shuffle_unseen(self.deck_random)
+        self.community_chest_deck.shuffle_unseen(self.deck_random)
@@ -0,0 +1,71 @@
+# Precomputed movement on the board
+#
+# Where a token ends up only depends on the square it starts from and on the dice total or the card drawn,
+# so every move is resolved once when the game is created:
+#
+#   dice_moves[start][dice total]       -> (destination, passed GO)
+#   card_moves[(flag, amount)][start]   -> (destination, passed GO), for the set_spot cards of both decks
+#   nearest_railroad[start]             -> (destination, passed GO), None on a board without railroads
+#   nearest_utility[start]              -> (destination, passed GO), None on a board without utilities
+#
+# The follow-up action of a move is the landing handler of its destination, from the game's square_handlers.
+# Resolving a move is a couple of list lookups instead of stepping over the board square by square.
+# Only plain ints and tuples are kept, the table never refers back to the game.
+
+# Highest total two dice can roll
+MAX_DICE_TOTAL = 12
+
+
+# Steps one square at a time until is_target, GO counts as passed when the token leaves it
+def get_nearest(board_positions, start, is_target):
+    num_positions = len(board_positions)
+    position = start
+    passed_go = False
+    while not is_target(board_positions[position]):
+        if position == 0:
+            passed_go = True
+        position = (position + 1) % num_positions
+    return position, passed_go
+
+
+"""
+    Where a set_spot card with flag and amount sends a token from start: back flag squares when the flag
+    is negative, straight to the amount square when it is 0, otherwise forward to it collecting GO on the way
+"""
+def get_card_move(num_positions, start, flag, amount):
+    if flag < 0:
+        return (start + flag) % num_positions, False
+    elif flag == 0:
+        return amount, False
+    return amount, amount < start
+
+
+class MovementTable:
+    def __init__(self, board_positions, cards):
+        num_positions = len(board_positions)
+        if sorted(board_positions) != list(range(num_positions)):
+            raise ValueError("Board positions must be numbered from 0 to " + str(num_positions - 1))
+        self.num_positions = num_positions
+        self.dice_moves = [[((start + total) % num_positions, start + total >= num_positions)
+                            for total in range(MAX_DICE_TOTAL + 1)] for start in range(num_positions)]
+
+        self.card_moves = {}
+        for card in cards:
+            if card.type != "set_spot":
+                continue
+            if card.flag >= 0 and card.amount not in board_positions:
+                raise ValueError("Card " + card.description + " moves to invalid board position " + str(card.amount))
+            self.card_moves[(card.flag, card.amount)] = [get_card_move(num_positions, start, card.flag, card.amount)
+                                                         for start in range(num_positions)]
+
+        # Only boards with railroads (utilities) get the table, their cards can't be played anywhere else
+        self.nearest_railroad = None
+        self.nearest_utility = None
+        card_types = set(card.type for card in cards)
+        for name, is_target in (("railroad", lambda p: p.is_railroad), ("utility", lambda p: p.is_utility)):
+            table_name = "nearest_" + name
+            if any(is_target(board_position) for board_position in board_positions.values()):
+                setattr(self, table_name, [get_nearest(board_positions, start, is_target)
+                                           for start in range(num_positions)])
+            elif table_name in card_types:
+                raise ValueError("Card moving to the nearest " + name + " on a board without any " + name)
@@ -0,0 +1,177 @@
+# Paired comparison of two strategies with common random numbers
+#
+# Comparing win rates from independent games needs a huge number of games because dice and card luck
+# dominate the outcome, and seat 0 always moves first. Here both strategies play exactly the same games
+# instead: every seed is replayed once per seating of the tested player and once per strategy, and the game
+# keeps its dice (per seat), deck and auction/build order streams apart, so the only thing that differs
+# between the two replays is the strategy. The luck cancels out of the per seed difference of the scores.
+#
+# A strategy is a (player class path, parameters) pair, parameters being player attributes set through
+# the game pool. The tested strategy scores 1 for a win, 0.5 for a draw it survived and 0 otherwise.
+#
+#   python -m monopoly_ai_sim.paired --a monopoly_ai_sim.ai.greedy:GreedyMonopolyPlayer \
+#       --b-params '{"PURCHASE_CASH_RESERVE": 200}' --games 200
+import itertools
+import logging
+import math
+from concurrent.futures import ProcessPoolExecutor
+
+from monopoly_ai_sim.pool import game_pool
+from monopoly_ai_sim.shards import DEFAULT_PLAYER_CLASS
+
+logger = logging.getLogger('monopoly_ai_simulator')
+
+# Two sided 95% normal quantile
+CONFIDENCE_Z = 1.96
+
+
+"""
+    Returns the seatings a seed is replayed with, as (tested seat, opponent index per other seat).
+    With all_permutations the opponents are permuted over the other seats too, otherwise only the tested
+    player is rotated through the seats. Permutations that seat the same opponents in the same places are
+    only played once, they would replay identical games.
+"""
+def get_seatings(player_count, num_opponents, all_permutations=False):
+    seatings = []
+    for tested_seat in range(player_count):
+        other_seats = player_count - 1
+        if all_permutations:
+            orders = itertools.permutations(range(other_seats))
+        else:
+            orders = [range(other_seats)]
+        seen_orders = set()
+        for order in orders:
+            opponent_order = tuple(idx % num_opponents for idx in order)
+            if opponent_order not in seen_orders:
+                seen_orders.add(opponent_order)
+                seatings.append((tested_seat, list(opponent_order)))
+    return seatings
+
+
+def play_scored_game(strategy, opponents, seed, tested_seat, opponent_order):
+    seating = [opponents[idx] for idx in opponent_order]
+    seating.insert(tested_seat, strategy)
+    game = game_pool.get_game([class_path for class_path, _ in seating], seed,
+                              player_parameters=[parameters for _, parameters in seating])
+    winner = game.do_simulation()
+    if winner is None:
+        return 0.0 if game.players[tested_seat].is_bankrupt else 0.5
+    return 1.0 if winner.seat == tested_seat else 0.0
+
+
+"""
+    Plays every seed with every seating for both strategies and returns, per seed, the list of
+    (score of a, score of b) per seating
+"""
+def play_paired_games(strategy_a, strategy_b, opponents, player_count, seeds, all_permutations=False):
+    seatings = get_seatings(player_count, len(opponents), all_permutations)
+    results = []
+    for seed in seeds:
+        results.append([(play_scored_game(strategy_a, opponents, seed, tested_seat, opponent_order),
+                         play_scored_game(strategy_b, opponents, seed, tested_seat, opponent_order))
+                        for tested_seat, opponent_order in seatings])
+    return results
+
+
+def get_mean_variance(values):
+    mean = sum(values) / len(values)
+    if len(values) < 2:
+        return mean, 0.0
+    return mean, sum((value - mean) ** 2 for value in values) / (len(values) - 1)
+
+
+class PairedResult:
+    def __init__(self, scores):
+        self.scores = scores  # per seed, (score of a, score of b) per seating
+        self.num_seeds = len(scores)
+        self.num_games = sum(len(seed_scores) for seed_scores in scores)  # per strategy
+        # Replays of a seed are correlated, so the seed is the unit the variance is estimated over
+        differences = [sum(a - b for a, b in seed_scores) / len(seed_scores) for seed_scores in scores]
+        self.mean_difference, self.variance = get_mean_variance(differences)
+        self.stderr = math.sqrt(self.variance / self.num_seeds)
+        # What the standard error would be had the two strategies played the same number of independent games
+        self.mean_a, self.variance_a = get_mean_variance([a for seed_scores in scores for a, _ in seed_scores])
+        self.mean_b, self.variance_b = get_mean_variance([b for seed_scores in scores for _, b in seed_scores])
+        self.unpaired_stderr = math.sqrt((self.variance_a + self.variance_b) / self.num_games)
+
+    def get_confidence_interval(self, z=CONFIDENCE_Z):
+        return self.mean_difference - z * self.stderr, self.mean_difference + z * self.stderr
+
+    # How many times more games independent play would need for the same precision
+    def get_variance_reduction(self):
+        if self.stderr == 0.0:
+            return float('inf')
+        return (self.unpaired_stderr / self.stderr) ** 2
+
+    def __repr__(self):
+        low, high = self.get_confidence_interval()
+        return ("Strategy a scored %.4f, strategy b %.4f over %d games each (%d seeds)\n"
+                "Paired difference %.4f, stderr %.4f, 95%% CI [%.4f, %.4f]\n"
+                "Unpaired stderr would be %.4f, %.1fx variance reduction") % (
+            self.mean_a, self.mean_b, self.num_games, self.num_seeds, self.mean_difference, self.stderr, low, high,
+            self.unpaired_stderr, self.get_variance_reduction())
+
+
+class PairedEvaluation:
+    """
+        Compares strategy_a and strategy_b, (class path, parameters) pairs, playing against opponents,
+        a list of strategies filling the other seats. Opponents default to strategy_b.
+    """
+    def __init__(self, strategy_a, strategy_b, opponents=None, player_count=2, num_seeds=100, base_seed=0,
+                 all_permutations=False, batch_size=20, processes=None):
+        if player_count < 2:
+            raise ValueError("A paired evaluation needs at least two players")
+        self.strategy_a = strategy_a
+        self.strategy_b = strategy_b
+        self.opponents = opponents or [strategy_b]
+        self.player_count = player_count
+        self.seeds = list(range(base_seed, base_seed + num_seeds))
+        self.all_permutations = all_permutations
+        self.batch_size = batch_size
+        self.processes = processes
+
+    def get_batches(self):
+        return [self.seeds[start:start + self.batch_size] for start in range(0, len(self.seeds), self.batch_size)]
+
+    def play_batch(self, seeds):
+        return play_paired_games(self.strategy_a, self.strategy_b, self.opponents, self.player_count, seeds,
+                                 self.all_permutations)
+
+    def run(self):
+        scores = []
+        if self.processes == 0:
+            for batch in self.get_batches():
+                scores.extend(self.play_batch(batch))
+        else:
+            with ProcessPoolExecutor(self.processes) as executor:
+                for batch_scores in executor.map(self.play_batch, self.get_batches()):
+                    scores.extend(batch_scores)
+        return PairedResult(scores)
+
+
+def main():
+    import argparse
+    import json
+    import sys
+    parser = argparse.ArgumentParser(prog="monopoly_ai_sim.paired",
+                                     description="Compare two strategies on the same dice and cards")
+    parser.add_argument("--a", default=DEFAULT_PLAYER_CLASS, help="class path of strategy a")
+    parser.add_argument("--a-params", default="{}", help="JSON player attributes of strategy a")
+    parser.add_argument("--b", default=DEFAULT_PLAYER_CLASS, help="class path of strategy b")
+    parser.add_argument("--b-params", default="{}", help="JSON player attributes of strategy b")
+    parser.add_argument("--games", type=int, default=100, help="number of seeds")
+    parser.add_argument("--players", type=int, default=2)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--all-permutations", action="store_true",
+                        help="replay every permutation of the seats, not only rotations of the tested player")
+    parser.add_argument("--processes", type=int, help="0 plays in this process")
+    args = parser.parse_args()
+    logging.basicConfig(stream=sys.stdout, level=logging.INFO)
+    evaluation = PairedEvaluation((args.a, json.loads(args.a_params)), (args.b, json.loads(args.b_params)),
+                                  player_count=args.players, num_seeds=args.games, base_seed=args.seed,
+                                  all_permutations=args.all_permutations, processes=args.processes)
+    print(evaluation.run())
+
+
+if __name__ == '__main__':
+    main()
@@ -12,10 +12,16 @@ logger = logging.getLogger('monopoly_ai_simulator')
 class MonopolyPlayer:
     def __init__(self, player_id):
         self.id: int = player_id
+        self.reset()
+
+    # Restores the state of a player who hasn't started a game, so the player can be reused
+    # Subclasses keeping per-game state should extend this
+    def reset(self) -> None:
+        self.seat: int = 0  # Index in the game's players, assigned when the game starts
         self.cash: int = 0
         self.position: int = 0
-        self.other_players: ["MonopolyPlayer"] = []
         self.is_bankrupt: bool = False
+        self.bankrupt_round: int = None  # Round the player went bankrupt in, counted from 1
         self.owned_properties: [MonopolyBoardPosition] = []
         self.get_out_of_jail_free: MonopolyCard = []
         self.jail_state: JailState = JailState.NOT_IN_JAIL
@@ -37,14 +43,14 @@ class MonopolyPlayer:
     def get_properties_for_sell_or_mortgage(self, money_needed: int) -> (Dict[int, int], List[MonopolyBoardPosition]):
         return
 
-    # TODO: Current version won't offer trades for simplicity, it assumes all trades are disadvantageous
+    # Return a trade.TradeOffer to make before rolling, or None
     @abc.abstractmethod
-    def attempt_trade(self):
+    def attempt_trade(self, game: MonopolyGame):
         return
 
-    # TODO: Current version won't accept for simplicity, it assumes all trades are disadvantageous
+    # Return boolean, True accepts the trade.TradeOffer another player made
     @abc.abstractmethod
-    def evaluate_trade(self):
+    def evaluate_trade(self, game: MonopolyGame, offer) -> bool:
         return
 
     @abc.abstractmethod
@@ -78,7 +84,7 @@ class MonopolyPlayer:
         if group_id not in self.house_building_history:
             raise ValueError("Invalid group id provided for has_hotels_in_group")
         for owned_property in group_properties:
-            if owned_property.owner is not self:
+            if owned_property.owner != self.seat:
                 return 0
         num_hotels = len(self.house_building_history[group_id]) - (RentIdx.HOUSE_TO_HOTEL - 1) * len(group_properties)
         if num_hotels > 0:
@@ -94,6 +100,7 @@ class MonopolyPlayer:
         game.hotel_count += 1
         board_position.rent_idx = RentIdx.GROUP_COMPLETE_NO_HOUSES
         self.cash += int(board_position.house_cost * RentIdx.HOUSE_TO_HOTEL / 2)
+        game.mark_dirty(self)
 
         logger.debug("Player " + str(self.id) + " sells hotel @ " + board_position.name)
         return True
@@ -117,6 +124,7 @@ class MonopolyPlayer:
 
         board_position.rent_idx = RentIdx(board_position.rent_idx-1)
         self.cash += int(board_position.house_cost / 2)
+        game.mark_dirty(self)
         logger.debug("Player " + str(self.id) + " sells house @ " + board_position.name)
         return True
 
@@ -140,7 +148,14 @@ class MonopolyPlayer:
 
             # Figure out how many hotels are are being sold directly
             hotels_sold_directly = []
-            if num_properties_to_sell / num_properties_in_group == RentIdx.HOUSE_TO_HOTEL:
+            num_hotels = self.num_owned_hotels_in_group(game, group_id)
+            if num_hotels and game.house_count < (RentIdx.HOUSE_TO_HOTEL - 1) * num_hotels:
+                # Housing shortage, the bank can't break the hotels down so every building in the group is sold
+                num_properties_to_sell = len(self.house_building_history[group_id])
+                num_sell_properties[group_id] = num_properties_to_sell
+                hotels_sold_directly = [board_position for board_position in game.group_id_to_position[group_id]
+                                        if board_position.rent_idx == RentIdx.HOTEL]
+            elif num_properties_to_sell / num_properties_in_group == RentIdx.HOUSE_TO_HOTEL:
                 hotels_sold_directly = self.house_building_history[group_id][(num_properties_to_sell % num_properties_in_group):num_properties_in_group]
             # Figure out how many hotels need to be converted
             num_hotels_converted = min(self.num_owned_hotels_in_group(game, group_id), num_properties_to_sell) \
@@ -159,7 +174,6 @@ class MonopolyPlayer:
             group_id, hotels_sold_directly, num_hotels_converted = sell_request
             num_properties_in_group = len(game.group_id_to_position[group_id])
             num_properties_to_sell = num_sell_properties[group_id]
-            hotels_sold_directly = []
             # Sell hotels directly if needed
             for owned_hotel in hotels_sold_directly:
                 self.do_sell_hotel_at(game, owned_hotel)
@@ -184,11 +198,12 @@ class MonopolyPlayer:
                                        mortgage_properties: List[MonopolyBoardPosition]) -> None:
         mortgage_sum = 0
         for board_position in mortgage_properties:
-            if board_position.owner is self:
+            if board_position.owner == self.seat:
                 # If you can build houses on this property, make sure that there are none currently
                 if board_position.is_mortgaged == False and ((0 == board_position.house_cost) or (board_position.rent_idx < RentIdx.HOUSE_1)):
                     mortgage_sum += board_position.mortgage_value
                     board_position.is_mortgaged = True
+                    game.mark_dirty(self)
                     logger.debug("Player " + str(self.id) + " mortgages " + board_position.name)
         self.cash += mortgage_sum
 
@@ -218,7 +233,7 @@ class MonopolyPlayer:
     def get_property(self,
                      game: MonopolyGame,
                      board_position: MonopolyBoardPosition) -> None:
-        board_position.owner = self
+        board_position.owner = self.seat
         self.owned_properties.append(board_position)
         game.check_property_group_and_update_player(board_position)
 
@@ -238,7 +253,7 @@ class MonopolyPlayer:
             raise ValueError("Player " + str(other_player.id) + " attempted to sell property " +
                              board_position.name + " which they do not own")
         else:
-            board_position.owner = other_player
+            board_position.owner = other_player.seat
             self.owned_properties.remove(board_position)
             other_player.owned_properties.append(board_position)
             game.check_property_group_and_update_player(board_position)
@@ -251,31 +266,54 @@ class MonopolyPlayer:
             # User failed to generate cash for the purchase, or does not
             # want to purchase, or we simply don't have enough houses,
             # end house purchasing routine
-            if (game.house_count < 1) or \
-                    (not house_position) or \
+            if (not house_position) or \
+                    (game.hotel_count < 1 if house_position.rent_idx == RentIdx.HOUSE_4 else game.house_count < 1) or \
                     (self.cash < house_position.house_cost) or \
                     (house_position.rent_idx in [RentIdx.ONLY_DEED, RentIdx.HOTEL]):
                 break
             else:
                 self.cash -= house_position.house_cost
-                house_position.rent_idx = RentIdx(house_position.rent_idx + 1)
-                if house_position.rent_idx == RentIdx.HOTEL:
-                    self.house_count -= RentIdx.HOUSE_TO_HOTEL - 1
-                    self.hotel_count += 1
-                    game.house_count += RentIdx.HOUSE_TO_HOTEL - 1
-                    game.hotel_count -= 1
-                    logger.debug("Player " + str(self.id) + " bought hotel @ " + house_position.name)
-                else:
-                    logger.debug("Player " + str(self.id) + " bought house @ " + house_position.name)
-                    game.house_count -= 1
-                    self.house_count += 1
-                if house_position.property_group in self.house_building_history:
-                    self.house_building_history[house_position.property_group].append(house_position)
-                else:
-                    self.house_building_history[house_position.property_group] = [house_position]
+                self.build_at(game, house_position)
 
             house_position = self.get_house_to_purchase(self.get_house_building_options(game))
 
+    # Puts the next house, or the hotel, on house_position with pieces from the bank, paying is up to the caller
+    def build_at(self,
+                 game: MonopolyGame,
+                 house_position: MonopolyBoardPosition) -> None:
+        house_position.rent_idx = RentIdx(house_position.rent_idx + 1)
+        if house_position.rent_idx == RentIdx.HOTEL:
+            self.house_count -= RentIdx.HOUSE_TO_HOTEL - 1
+            self.hotel_count += 1
+            game.house_count += RentIdx.HOUSE_TO_HOTEL - 1
+            game.hotel_count -= 1
+            logger.debug("Player " + str(self.id) + " bought hotel @ " + house_position.name)
+        else:
+            logger.debug("Player " + str(self.id) + " bought house @ " + house_position.name)
+            game.house_count -= 1
+            self.house_count += 1
+        if game.stats is not None:
+            game.stats.record_building(game, house_position)
+        if house_position.property_group in self.house_building_history:
+            self.house_building_history[house_position.property_group].append(house_position)
+        else:
+            self.house_building_history[house_position.property_group] = [house_position]
+
+    # Houses and hotels the player can afford on its next level of development, (houses, hotels). Only the
+    # engine's view of what the player could build, the player isn't asked anything.
+    def get_building_demand(self,
+                            game: MonopolyGame) -> (int, int):
+        houses = hotels = 0
+        cash = self.cash
+        for house_position in self.get_house_building_options(game):
+            if house_position.house_cost <= cash:
+                cash -= house_position.house_cost
+                if house_position.rent_idx == RentIdx.HOUSE_4:
+                    hotels += 1
+                else:
+                    houses += 1
+        return houses, hotels
+
     def get_property_value(self) -> int:
         property_value = 0
         for owned_property in self.owned_properties:
@@ -309,7 +347,6 @@ class MonopolyPlayer:
         self.house_count = 0
         self.hotel_count = 0
         self.house_building_history = {}
-        self.owned_properties = []
         return
 
     def get_num_houses(self) -> int:
@@ -324,19 +361,16 @@ class MonopolyPlayer:
         if owed_player:
             for owned_property in self.owned_properties:
                 if owned_property.rent_idx < RentIdx.HOUSE_1:
-                    owned_property.owner = owed_player
+                    owned_property.owner = owed_player.seat
                     owed_player.owned_properties.append(owned_property)
                     game.check_property_group_and_update_player(owned_property)
         # Giving up properties to the bank, auction all of them
         else:
             for owned_property in self.owned_properties:
-                auction = MonopolyAuction(owned_property, self.other_players)
-                winner = auction.get_auction_winner()
-                if winner:
-                    winner.cash -= auction.last_offer
-                    winner.owned_properties.append(owned_property)
-                    owned_property.owner = winner
-                    game.check_property_group_and_update_player(owned_property)
+                # Back to the bank, the house rules decide whether it gets auctioned
+                owned_property.reset()
+                game.split_groups.pop(owned_property.property_group, None)
+                game.auction_property(owned_property, game.live_players)
         # We have no more properties after this
         self.owned_properties = []
         return
@@ -350,6 +384,9 @@ class MonopolyPlayer:
             owed_player_name = "Player " + str(owed_player.id)
 
         logger.debug("Player " + str(self.id) + " is forced bankrupt by " + owed_player_name)
+        game.remove_live_player(self)
+        if game.stats is not None:
+            game.stats.record_bankruptcy(self, owed_player)
         self.sell_all_houses(game)
         if owed_player:
             owed_player.cash += self.cash
@@ -359,6 +396,18 @@ class MonopolyPlayer:
             card.drawn = False
         self.get_out_of_jail_free = []
         self.is_bankrupt = True
+        self.bankrupt_round = game.round_count + 1
+
+    # True if the build/unmortgage pass could do anything for the player: it has a mortgaged property, or owns
+    # a completed group that isn't full of hotels yet. Cash isn't considered, it changes far too often
+    def can_improve_properties(self) -> bool:
+        for owned_property in self.owned_properties:
+            if owned_property.is_mortgaged:
+                return True
+            if not owned_property.is_railroad and not owned_property.is_utility and \
+                    RentIdx.ONLY_DEED < owned_property.rent_idx < RentIdx.HOTEL:
+                return True
+        return False
 
     def unmortgage_properties(self) -> None:
         properties_to_unmortgage = self.get_properties_to_unmortgage()
@@ -394,7 +443,11 @@ class MonopolyPlayer:
                 # This property group is full of HOTELs, can't build more!
                 if min_rent_idx == RentIdx.HOTEL:
                     continue
+                # Nothing can be built on a group while any of its properties is mortgaged
+                if any(owned_group_property.is_mortgaged for owned_group_property in group_properties):
+                    continue
                 for owned_group_property in group_properties:
                     if min_rent_idx == owned_group_property.rent_idx:
                         valid_options.add(owned_group_property)
-        return list(valid_options)
+        # Sets are ordered by object identity, sort so that seeded games replay identically
+        return sorted(valid_options, key=lambda x: x.position)
@@ -0,0 +1,64 @@
+# Per-process pool of reusable games
+#
+# Creating a game allocates the whole board, both decks and every player. Runners that play many games ask
+# the pool for a game with the seating they need instead, and get the same objects back, reset in place.
+import importlib
+
+from monopoly_ai_sim.monopoly import MonopolyGame
+
+
+# Player classes are referenced by "module:qualname" so the configuration can be written to disk
+# or sent to another machine
+def get_class_path(player_class):
+    return player_class.__module__ + ":" + player_class.__qualname__
+
+
+def load_class(class_path):
+    module_name, _, qualname = class_path.partition(":")
+    loaded = importlib.import_module(module_name)
+    for name in qualname.split("."):
+        loaded = getattr(loaded, name)
+    return loaded
+
+
+class GamePool:
+    def __init__(self):
+        self.games = {}  # (player class paths in seat order, bundle path, house rules) -> game
+        self.default_parameters = {}  # id(player) -> values of the attributes overridden by set_parameters
+
+    """
+        Returns the pooled game for the seating, reset with the seed
+        player_parameters - optional dict per seat of player attributes to set for this game, see set_parameters
+        rules - HouseRules of the game, the standard rules by default
+    """
+    def get_game(self, player_class_paths, seed=None, bundle_path=None, player_parameters=None, rules=None):
+        key = (tuple(player_class_paths), bundle_path, rules)
+        if key not in self.games:
+            players = [load_class(class_path)(seat) for seat, class_path in enumerate(player_class_paths)]
+            self.games[key] = MonopolyGame(players, seed, bundle_path, rules)
+        else:
+            self.games[key].reset(seed)
+        game = self.games[key]
+        for seat, player in enumerate(game.players):
+            self.set_parameters(player, player_parameters[seat] if player_parameters else {})
+        return game
+
+    # Sets strategy attributes (like GreedyMonopolyPlayer.DEFAULT_HOUSE_VALUE) on a pooled player
+    # Attributes set for an earlier game but not in parameters go back to the player's own value
+    def set_parameters(self, player, parameters):
+        if not parameters and id(player) not in self.default_parameters:
+            return
+        defaults = self.default_parameters.setdefault(id(player), {})
+        for name in parameters:
+            if name not in defaults:
+                defaults[name] = getattr(player, name)
+        for name, value in defaults.items():
+            setattr(player, name, parameters.get(name, value))
+
+    def clear(self):
+        self.games = {}
+        self.default_parameters = {}
+
+
+# Every worker process gets its own pool
+game_pool = GamePool()
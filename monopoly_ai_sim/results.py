@@ -0,0 +1,277 @@
+# Results store for past experiments
+#
+# Games are written to a SQLite database so experiments can be queried long after they ran, beyond win
+# counts: who won, how long it took, how every seat ended and when each seat completed which property group.
+#
+#   experiments   - one row per configuration (player classes, player count, house rules), keyed by the hash
+#                   of its JSON so every run of the same configuration adds to the same experiment
+#   games         - seed, winning seat (NULL for a draw) and rounds played
+#   players       - class, final cash and bankruptcy round of every seat
+#   player_groups - round every seat first completed each property group in
+#
+# Rows are inserted with executemany, a whole batch of games per transaction, into a WAL database. SQLite has
+# a single writer, so in multi-process runs workers only build game records (plain lists, cheap to pickle or
+# send as JSON) and the main process or coordinator writes them. For example, the win rate of seat 1 when it
+# owns the orange group by round 30, across every experiment played with $1000 starting cash:
+#
+#   store = ResultsStore("results.db")
+#   store.get_group_win_rate(seat=1, group_id=ORANGE, by_round=30, config={"rules.starting_cash": 1000})
+import hashlib
+import json
+import sqlite3
+import time
+
+from monopoly_ai_sim.rules import STANDARD_RULES
+
+# Games buffered by a ResultsWriter before they're written in one transaction
+WRITE_BATCH = 5000
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS experiments (
+    id INTEGER PRIMARY KEY,
+    config_hash TEXT NOT NULL UNIQUE,
+    config TEXT NOT NULL,
+    created REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS games (
+    id INTEGER PRIMARY KEY,
+    experiment_id INTEGER NOT NULL REFERENCES experiments (id),
+    seed INTEGER,
+    winner_seat INTEGER,
+    rounds INTEGER NOT NULL
+);
+CREATE UNIQUE INDEX IF NOT EXISTS games_experiment_seed ON games (experiment_id, seed);
+CREATE INDEX IF NOT EXISTS games_experiment_winner ON games (experiment_id, winner_seat);
+CREATE TABLE IF NOT EXISTS players (
+    game_id INTEGER NOT NULL REFERENCES games (id),
+    seat INTEGER NOT NULL,
+    player_class TEXT NOT NULL,
+    cash INTEGER NOT NULL,
+    bankrupt_round INTEGER,
+    PRIMARY KEY (game_id, seat)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS player_groups (
+    game_id INTEGER NOT NULL REFERENCES games (id),
+    seat INTEGER NOT NULL,
+    group_id INTEGER NOT NULL,
+    completed_round INTEGER NOT NULL,
+    PRIMARY KEY (game_id, seat, group_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS player_groups_group ON player_groups (group_id, completed_round);
+"""
+
+
+"""
+    The configuration identifying an experiment, rules default to the standard rules
+"""
+def get_experiment_config(player_class_paths, rules=None):
+    return {
+        "player_count": len(player_class_paths),
+        "player_classes": list(player_class_paths),
+        "rules": (rules if rules is not None else STANDARD_RULES).to_dict(),
+    }
+
+
+def get_config_hash(config):
+    return hashlib.sha256(json.dumps(config, sort_keys=True).encode()).hexdigest()
+
+
+"""
+    Returns the record of a finished game:
+        [seed, winner seat, rounds, [[seat, class path, cash, bankrupt round], ...], [[seat, group id, round], ...]]
+"""
+def get_game_record(game, winner, player_class_paths):
+    players = [[player.seat, player_class_paths[player.seat], player.cash, player.bankrupt_round]
+               for player in game.players]
+    groups = [[seat, group_id, completed_round]
+              for (seat, group_id), completed_round in game.group_completions.items()]
+    return [game.seed, winner.seat if winner else None, game.round_count, players, groups]
+
+
+class ResultsStore:
+    def __init__(self, path):
+        self.path = path
+        # The coordinator writes from its connection threads, always one at a time under its record_lock
+        self.connection = sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.executescript(SCHEMA)
+
+    def close(self):
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    # Returns the id of the experiment with this configuration, adding it if it's new
+    def get_experiment_id(self, config):
+        config_hash = get_config_hash(config)
+        self.connection.execute("INSERT OR IGNORE INTO experiments (config_hash, config, created) VALUES (?, ?, ?)",
+                                (config_hash, json.dumps(config, sort_keys=True), time.time()))
+        return self.connection.execute("SELECT id FROM experiments WHERE config_hash = ?",
+                                       (config_hash,)).fetchone()[0]
+
+    def get_experiments(self):
+        return [(experiment_id, json.loads(config)) for experiment_id, config in
+                self.connection.execute("SELECT id, config FROM experiments ORDER BY id")]
+
+    """
+        Writes game records from get_game_record in a single transaction. Seeded games already in the
+        experiment are skipped, so shards that are run again after a crash don't count twice.
+        Returns the number of games written.
+    """
+    def add_games(self, experiment_id, records):
+        connection = self.connection
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            seeds = [record[0] for record in records if record[0] is not None]
+            existing = set()
+            if seeds:
+                existing = {row[0] for row in connection.execute(
+                    "SELECT seed FROM games WHERE experiment_id = ? AND seed BETWEEN ? AND ?",
+                    (experiment_id, min(seeds), max(seeds)))}
+            # Game ids are assigned here so the player rows can refer to them without a query per game
+            game_id = connection.execute("SELECT COALESCE(MAX(id), 0) FROM games").fetchone()[0]
+            games = []
+            players = []
+            groups = []
+            for seed, winner_seat, rounds, player_records, group_records in records:
+                if seed is not None:
+                    if seed in existing:
+                        continue
+                    existing.add(seed)
+                game_id += 1
+                games.append((game_id, experiment_id, seed, winner_seat, rounds))
+                players.extend((game_id, seat, player_class, cash, bankrupt_round)
+                               for seat, player_class, cash, bankrupt_round in player_records)
+                groups.extend((game_id, seat, group_id, completed_round)
+                              for seat, group_id, completed_round in group_records)
+            connection.executemany("INSERT INTO games VALUES (?, ?, ?, ?, ?)", games)
+            connection.executemany("INSERT INTO players VALUES (?, ?, ?, ?, ?)", players)
+            connection.executemany("INSERT INTO player_groups VALUES (?, ?, ?, ?)", groups)
+            connection.execute("COMMIT")
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        return len(games)
+
+    """
+        Restricts a query to experiments matching config, a dictionary of dotted paths into the experiment
+        configuration and their values, like {"rules.starting_cash": 1000, "player_count": 2}
+    """
+    @staticmethod
+    def get_experiment_filter(experiment_id=None, config=None):
+        conditions = []
+        parameters = []
+        if experiment_id is not None:
+            conditions.append("g.experiment_id = ?")
+            parameters.append(experiment_id)
+        if config:
+            subconditions = []
+            for path, value in sorted(config.items()):
+                subconditions.append("json_extract(config, ?) = ?")
+                parameters.extend(("$." + path, value))
+            conditions.append("g.experiment_id IN (SELECT id FROM experiments WHERE " +
+                              " AND ".join(subconditions) + ")")
+        return conditions, parameters
+
+    # Returns {seat: (games, wins)}
+    def get_win_rates(self, experiment_id=None, config=None):
+        conditions, parameters = self.get_experiment_filter(experiment_id, config)
+        where = " WHERE " + " AND ".join(conditions) if conditions else ""
+        rows = self.connection.execute(
+            "SELECT p.seat, COUNT(*), SUM(g.winner_seat IS p.seat) FROM games g JOIN players p ON p.game_id = g.id" +
+            where + " GROUP BY p.seat ORDER BY p.seat", parameters)
+        return {seat: (games, wins) for seat, games, wins in rows}
+
+    # Returns (games, draws, average rounds)
+    def get_game_summary(self, experiment_id=None, config=None):
+        conditions, parameters = self.get_experiment_filter(experiment_id, config)
+        where = " WHERE " + " AND ".join(conditions) if conditions else ""
+        games, draws, rounds = self.connection.execute(
+            "SELECT COUNT(*), SUM(g.winner_seat IS NULL), AVG(g.rounds) FROM games g" + where, parameters).fetchone()
+        return games, draws or 0, rounds
+
+    """
+        Returns (games, wins) of the games in which seat completed the group by round by_round
+        (any round if None). Without a seat, games are counted once for every seat that completed the group.
+    """
+    def get_group_win_rate(self, group_id, by_round=None, seat=None, experiment_id=None, config=None):
+        conditions, parameters = self.get_experiment_filter(experiment_id, config)
+        conditions.insert(0, "pg.group_id = ?")
+        parameters.insert(0, group_id)
+        if by_round is not None:
+            conditions.append("pg.completed_round <= ?")
+            parameters.append(by_round)
+        if seat is not None:
+            conditions.append("pg.seat = ?")
+            parameters.append(seat)
+        games, wins = self.connection.execute(
+            "SELECT COUNT(*), SUM(g.winner_seat IS pg.seat) FROM player_groups pg JOIN games g ON g.id = pg.game_id "
+            "WHERE " + " AND ".join(conditions), parameters).fetchone()
+        return games, wins or 0
+
+    # Returns {group id: (completions, average completion round, wins of the completing seat)}
+    def get_group_completions(self, experiment_id=None, config=None):
+        conditions, parameters = self.get_experiment_filter(experiment_id, config)
+        where = " WHERE " + " AND ".join(conditions) if conditions else ""
+        rows = self.connection.execute(
+            "SELECT pg.group_id, COUNT(*), AVG(pg.completed_round), SUM(g.winner_seat IS pg.seat) "
+            "FROM player_groups pg JOIN games g ON g.id = pg.game_id" + where +
+            " GROUP BY pg.group_id ORDER BY pg.group_id", parameters)
+        return {group_id: (completions, rounds, wins) for group_id, completions, rounds, wins in rows}
+
+
+"""
+    Buffers game records of one experiment and writes them WRITE_BATCH games at a time
+"""
+class ResultsWriter:
+    def __init__(self, store, config, batch_size=WRITE_BATCH):
+        self.store = store
+        self.experiment_id = store.get_experiment_id(config)
+        self.batch_size = batch_size
+        self.records = []
+
+    def add_record(self, record):
+        self.records.append(record)
+        if len(self.records) >= self.batch_size:
+            self.flush()
+
+    def add_records(self, records):
+        self.records.extend(records)
+        if len(self.records) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if self.records:
+            self.store.add_games(self.experiment_id, self.records)
+            self.records = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.flush()
+
+
+if __name__ == '__main__':
+    import argparse
+    parser = argparse.ArgumentParser(prog="monopoly_ai_sim.results", description="Summarize a results database")
+    parser.add_argument("path", help="results database")
+    args = parser.parse_args()
+    with ResultsStore(args.path) as store:
+        for experiment_id, config in store.get_experiments():
+            games, draws, rounds = store.get_game_summary(experiment_id)
+            print("Experiment " + str(experiment_id) + ": " + json.dumps(config, sort_keys=True))
+            if not games:
+                continue
+            print("  " + str(games) + " games, " + str(draws) + " draws, %.1f rounds on average" % rounds)
+            for seat, (seat_games, wins) in store.get_win_rates(experiment_id).items():
+                print("  Seat " + str(seat) + " won %.1f%%" % (100.0 * wins / seat_games))
+            for group_id, (completions, completion_round, wins) in store.get_group_completions(experiment_id).items():
+                print("  Group " + str(group_id) + " completed in %.1f%% of games, round %.1f on average, "
+                      "the completing seat won %.1f%%" % (100.0 * completions / games, completion_round,
+                                                          100.0 * wins / completions))
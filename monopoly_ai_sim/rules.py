@@ -0,0 +1,69 @@
+# House rules
+#
+# HouseRules holds the rule constants of a game and the popular variants people play with. MonopolyGame
+# resolves it once when the game is created: constants are copied onto the game (GO_INCOME, JAIL_TURNS, ...)
+# and every variant is turned into a handler, either in the per-square landing table (the Free Parking
+# jackpot, land_on_go_exactly for double GO income) or as the fine, auction or trade handler that
+# collect_fine, auction_property and play_turn call, so a disabled variant costs nothing while playing.
+#
+#   rules = HouseRules(free_parking_jackpot=True, auctions=False)
+#   game = MonopolyGame(players, seed, rules=rules)
+
+
+class HouseRules:
+    """
+        starting_cash, go_income, luxury_tax, income_tax_option, escape_jail_cost - amounts of the standard rules
+        doubles_to_jail - consecutive doubles that send a player to jail
+        jail_turns - turns a player can spend rolling for doubles in jail, the next turn they pay escape_jail_cost
+            to leave and roll as usual
+        house_count, hotel_count - building supply of the bank
+        free_parking_jackpot - taxes and fines go into a pot that a player landing on Free Parking collects
+        double_go_on_exact_landing - landing exactly on GO pays twice the GO income
+        auctions - properties the player who lands on them declines are auctioned, otherwise they stay unowned
+        trades_per_turn - trade offers a player can make before rolling, 0 disables trading
+    """
+    def __init__(self, starting_cash=1500, go_income=200, luxury_tax=100, income_tax_option=200,
+                 escape_jail_cost=50, doubles_to_jail=3, jail_turns=3, house_count=32, hotel_count=12,
+                 free_parking_jackpot=False, double_go_on_exact_landing=False, auctions=True, trades_per_turn=1):
+        if doubles_to_jail < 1 or jail_turns < 1:
+            raise ValueError("doubles_to_jail and jail_turns must be at least 1")
+        if house_count < 0 or hotel_count < 0:
+            raise ValueError("Building supply can't be negative")
+        if trades_per_turn < 0:
+            raise ValueError("trades_per_turn can't be negative")
+        self.starting_cash = starting_cash
+        self.go_income = go_income
+        self.luxury_tax = luxury_tax
+        self.income_tax_option = income_tax_option
+        self.escape_jail_cost = escape_jail_cost
+        self.doubles_to_jail = doubles_to_jail
+        self.jail_turns = jail_turns
+        self.house_count = house_count
+        self.hotel_count = hotel_count
+        self.free_parking_jackpot = free_parking_jackpot
+        self.double_go_on_exact_landing = double_go_on_exact_landing
+        self.auctions = auctions
+        self.trades_per_turn = trades_per_turn
+
+    # Identifies the rules, for keying pooled games and writing configurations to disk
+    def get_key(self):
+        return tuple(sorted(self.__dict__.items()))
+
+    def to_dict(self):
+        return dict(self.__dict__)
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(**data)
+
+    def __eq__(self, other):
+        return isinstance(other, HouseRules) and self.get_key() == other.get_key()
+
+    def __hash__(self):
+        return hash(self.get_key())
+
+    def __repr__(self):
+        return "HouseRules(" + ", ".join(name + "=" + repr(value) for name, value in self.get_key()) + ")"
+
+
+STANDARD_RULES = HouseRules()
@@ -0,0 +1,222 @@
+# Checkpointed experiment runs
+#
+# An experiment of num_games games is split into shards of consecutive seeds. Every shard is independent:
+# it only needs its seed range and the experiment configuration, and writes its aggregates to its own file
+# with an atomic rename. A file on disk means the shard is complete, so a restarted run skips it.
+import json
+import logging
+import os
+import time
+
+from monopoly_ai_sim.invariants import InvariantChecker
+from monopoly_ai_sim.pool import game_pool
+from monopoly_ai_sim.results import ResultsStore, get_experiment_config, get_game_record
+from monopoly_ai_sim.stats import GameStatistics
+
+logger = logging.getLogger('monopoly_ai_simulator')
+
+DEFAULT_PLAYER_CLASS = "monopoly_ai_sim.ai.greedy:GreedyMonopolyPlayer"
+MANIFEST_NAME = "manifest.json"
+
+
+# Write to a temporary file and rename it so readers never see a partially written file
+def write_json_atomic(path, data):
+    tmp_path = path + ".tmp." + str(os.getpid())
+    with open(tmp_path, 'w') as f:
+        json.dump(data, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def new_aggregates(player_count):
+    return {"games": 0, "draws": 0, "turns": 0, "wins": [0] * player_count}
+
+
+def merge_aggregates(total, aggregates):
+    total["games"] += aggregates["games"]
+    total["draws"] += aggregates["draws"]
+    total["turns"] += aggregates.get("turns", 0)
+    for seat, wins in enumerate(aggregates["wins"]):
+        total["wins"][seat] += wins
+    if "stats" in aggregates:
+        if "stats" in total:
+            total["stats"] = GameStatistics.from_dict(total["stats"]).merge(
+                GameStatistics.from_dict(aggregates["stats"])).to_dict()
+        else:
+            total["stats"] = aggregates["stats"]
+    return total
+
+
+"""
+    Plays the games of one shard and returns their aggregates. Only depends on its arguments, so it can
+    run in any process or on any machine.
+    With collect_results the aggregates also hold the game records for the results store under "results".
+    With check_invariants the game state is validated every check_invariants turns.
+"""
+def run_shard(first_seed, num_games, player_count, player_class_path=DEFAULT_PLAYER_CLASS, collect_stats=False,
+              collect_results=False, check_invariants=0):
+    aggregates = new_aggregates(player_count)
+    player_class_paths = [player_class_path] * player_count
+    stats = None
+    invariants = InvariantChecker(check_invariants) if check_invariants else None
+    records = [] if collect_results else None
+    for seed in range(first_seed, first_seed + num_games):
+        game = game_pool.get_game(player_class_paths, seed)
+        if collect_stats and stats is None:
+            stats = GameStatistics.from_game(game)
+        game.stats = stats
+        game.invariants = invariants
+        winner = game.do_simulation()
+        aggregates["games"] += 1
+        aggregates["turns"] += game.turn_count
+        if winner:
+            aggregates["wins"][winner.id] += 1
+        else:
+            aggregates["draws"] += 1
+        if records is not None:
+            records.append(get_game_record(game, winner, player_class_paths))
+    if stats is not None:
+        aggregates["stats"] = stats.to_dict()
+    if records is not None:
+        aggregates["results"] = records
+    return aggregates
+
+
+class ExperimentShard:
+    def __init__(self, index, first_seed, num_games):
+        self.index = index
+        self.first_seed = first_seed
+        self.num_games = num_games
+
+    def __repr__(self):
+        return "Shard " + str(self.index) + " [seeds " + str(self.first_seed) + "-" + \
+               str(self.first_seed + self.num_games - 1) + "]"
+
+
+class ShardedExperiment:
+    """
+        results_path - optional results database every game is also written to, as each shard completes.
+                       It isn't part of the experiment, a resumed run only writes the shards it runs.
+        check_invariants - validate the game state every this many turns, 0 never does
+    """
+    def __init__(self, directory, num_games, shard_size=100, player_count=2, base_seed=0,
+                 player_class_path=DEFAULT_PLAYER_CLASS, collect_stats=False, results_path=None, check_invariants=0):
+        if shard_size < 1:
+            raise ValueError("Shards need at least one game")
+        self.directory = directory
+        self.num_games = num_games
+        self.shard_size = shard_size
+        self.player_count = player_count
+        self.base_seed = base_seed
+        self.player_class_path = player_class_path
+        self.collect_stats = collect_stats
+        self.results_path = results_path
+        self.check_invariants = check_invariants
+        self.results_store = None
+        self.results_experiment_id = None
+
+    @property
+    def collect_results(self):
+        return self.results_path is not None
+
+    def get_config(self):
+        return {
+            "num_games": self.num_games,
+            "shard_size": self.shard_size,
+            "player_count": self.player_count,
+            "base_seed": self.base_seed,
+            "player_class": self.player_class_path,
+            "collect_stats": self.collect_stats,
+        }
+
+    # Refuse to resume a directory that was written by a different experiment
+    def prepare(self):
+        os.makedirs(self.directory, exist_ok=True)
+        manifest_path = os.path.join(self.directory, MANIFEST_NAME)
+        if os.path.exists(manifest_path):
+            with open(manifest_path, 'r') as f:
+                manifest = json.load(f)
+            if manifest != self.get_config():
+                raise ValueError("Checkpoint directory " + self.directory + " belongs to a different experiment")
+        else:
+            write_json_atomic(manifest_path, self.get_config())
+        if self.collect_results and self.results_store is None:
+            self.results_store = ResultsStore(self.results_path)
+            self.results_experiment_id = self.results_store.get_experiment_id(
+                get_experiment_config([self.player_class_path] * self.player_count))
+
+    # Releases the results store opened by prepare
+    def close(self):
+        if self.results_store is not None:
+            self.results_store.close()
+            self.results_store = None
+            self.results_experiment_id = None
+
+    def get_shards(self):
+        shards = []
+        for index, first_game in enumerate(range(0, self.num_games, self.shard_size)):
+            num_games = min(self.shard_size, self.num_games - first_game)
+            shards.append(ExperimentShard(index, self.base_seed + first_game, num_games))
+        return shards
+
+    def get_shard_path(self, shard):
+        return os.path.join(self.directory, "shard_%06d.json" % shard.index)
+
+    def is_complete(self, shard):
+        return os.path.exists(self.get_shard_path(shard))
+
+    def get_pending_shards(self):
+        return [shard for shard in self.get_shards() if not self.is_complete(shard)]
+
+    # Games go to the results store before the shard file is written, a crash in between only means the shard
+    # runs again and its games, already in the store, are skipped
+    def record_shard(self, shard, aggregates):
+        records = aggregates.pop("results", None)
+        if records is not None and self.results_store is not None:
+            self.results_store.add_games(self.results_experiment_id, records)
+        write_json_atomic(self.get_shard_path(shard), {
+            "first_seed": shard.first_seed,
+            "num_games": shard.num_games,
+            "aggregates": aggregates,
+        })
+
+    def run_shard(self, shard):
+        aggregates = run_shard(shard.first_seed, shard.num_games, self.player_count, self.player_class_path,
+                               self.collect_stats, self.collect_results, self.check_invariants)
+        self.record_shard(shard, aggregates)
+        return aggregates
+
+    def merge(self):
+        total = new_aggregates(self.player_count)
+        for shard in self.get_shards():
+            if not self.is_complete(shard):
+                raise ValueError(str(shard) + " has not been completed")
+            with open(self.get_shard_path(shard), 'r') as f:
+                merge_aggregates(total, json.load(f)["aggregates"])
+        return total
+
+    def get_completed_games(self):
+        return sum(shard.num_games for shard in self.get_shards() if self.is_complete(shard))
+
+    # Runs every shard that hasn't been completed yet and returns the merged aggregates
+    # metrics - optional RunMetrics, updated after every shard
+    def run(self, metrics=None):
+        self.prepare()
+        pending_shards = self.get_pending_shards()
+        logger.info(str(len(self.get_shards()) - len(pending_shards)) + " shards already complete, " +
+                    str(len(pending_shards)) + " to run")
+        counters = None
+        if metrics is not None:
+            metrics.completed_games = self.get_completed_games()
+            counters = metrics.get_worker("local")
+        try:
+            for shard in pending_shards:
+                start = time.perf_counter()
+                aggregates = self.run_shard(shard)
+                if counters is not None:
+                    counters.record_aggregates(aggregates, time.perf_counter() - start)
+                logger.debug(str(shard) + " complete")
+        finally:
+            self.close()
+        return self.merge()
@@ -1,37 +1,119 @@
-import sys
+import gc
 import logging
+import time
 from monopoly_ai_sim.monopoly import MonopolyGame
 from monopoly_ai_sim.ai.greedy import GreedyMonopolyPlayer
+from monopoly_ai_sim.invariants import InvariantChecker
+from monopoly_ai_sim.metrics import MetricsMonitor, RunMetrics
+from monopoly_ai_sim.pool import get_class_path
+from monopoly_ai_sim.results import ResultsStore, ResultsWriter, get_experiment_config, get_game_record
+from monopoly_ai_sim.shards import ShardedExperiment
+from monopoly_ai_sim.stats import GameStatistics
 
 logger = logging.getLogger('monopoly_ai_simulator')
-logging.basicConfig(stream=sys.stdout, level=logging.INFO)
 
 class Simulator:
     def __init__(self):
         self.DEFAULT_PLAYER_COUNT = 2
         self.NUM_RUNS = 1000
+        self.SHARD_SIZE = 100
+        self.COLLECT_STATS = False
+        self.METRICS_PORT = None  # Serve Prometheus metrics on this local port while running
+        self.SUMMARY_INTERVAL = 10.0  # Seconds between progress summaries in the log
+        self.RESULTS_PATH = None  # Write every game to this results database
+        self.CHECK_INVARIANTS = 0  # Validate the game state every this many turns, 0 never does
         self.player_wincount = {}  # Dictionary for recording victories
+        self.stats = None
 
     def run(self):
-        for runIdx in range(self.NUM_RUNS):
-            players = []
-            for i in range(self.DEFAULT_PLAYER_COUNT):
-                players.append(GreedyMonopolyPlayer(i))
-
-            game = MonopolyGame(players)
-            winner = game.do_simulation()
-            if winner:
-                logger.info("Game " + str(runIdx+1) + ": Player " + str(winner.id) + " won")
-                if winner.id in self.player_wincount:
-                    self.player_wincount[winner.id] += 1
-                else:
-                    self.player_wincount[winner.id] = 1
+        # The same game and players are reset and reused for every run
+        players = []
+        for i in range(self.DEFAULT_PLAYER_COUNT):
+            players.append(GreedyMonopolyPlayer(i))
+        game = MonopolyGame(players)
+        if self.COLLECT_STATS:
+            self.stats = GameStatistics.from_game(game)
+            game.stats = self.stats
+        if self.CHECK_INVARIANTS:
+            game.invariants = InvariantChecker(self.CHECK_INVARIANTS)
+
+        player_class_paths = [get_class_path(type(player)) for player in players]
+        results_store = None
+        results = None
+        if self.RESULTS_PATH:
+            results_store = ResultsStore(self.RESULTS_PATH)
+            results = ResultsWriter(results_store, get_experiment_config(player_class_paths))
+
+        metrics = RunMetrics(self.NUM_RUNS, self.DEFAULT_PLAYER_COUNT)
+        counters = metrics.get_worker("simulator")
+        # The game is reused for every run, set up objects never need collecting
+        gc.freeze()
+        try:
+            with self.get_monitor(metrics):
+                for runIdx in range(self.NUM_RUNS):
+                    start = time.perf_counter()
+                    game.reset()
+                    winner = game.do_simulation()
+                    counters.record_game(winner.seat if winner else None, game.turn_count,
+                                         time.perf_counter() - start)
+                    if results is not None:
+                        results.add_record(get_game_record(game, winner, player_class_paths))
+                    if winner:
+                        logger.debug("Game " + str(runIdx+1) + ": Player " + str(winner.id) + " won")
+                        if winner.id in self.player_wincount:
+                            self.player_wincount[winner.id] += 1
+                        else:
+                            self.player_wincount[winner.id] = 1
+                    else:
+                        logger.debug("Game " + str(runIdx+1) + ": Turn limit reached, draw")
+                counters.publish()
+            if results is not None:
+                results.flush()
+        finally:
+            if results_store is not None:
+                results_store.close()
+        self.report()
+
+    # Same as run, but games are seeded and checkpointed in shards under checkpoint_dir
+    # Rerunning with the same directory resumes where the last run stopped
+    def run_sharded(self, checkpoint_dir, base_seed=0):
+        metrics = RunMetrics(self.NUM_RUNS, self.DEFAULT_PLAYER_COUNT)
+        with self.get_monitor(metrics):
+            aggregates = self.get_experiment(checkpoint_dir, base_seed).run(metrics)
+        self.report_aggregates(aggregates)
+
+    # Hands the shards out to workers connecting to host:port, or to num_local_workers processes on this machine
+    def run_distributed(self, checkpoint_dir, base_seed=0, host="127.0.0.1", port=0, num_local_workers=0):
+        from monopoly_ai_sim.distributed import Coordinator, run_local
+        experiment = self.get_experiment(checkpoint_dir, base_seed)
+        metrics = RunMetrics(self.NUM_RUNS, self.DEFAULT_PLAYER_COUNT)
+        with self.get_monitor(metrics):
+            if num_local_workers:
+                aggregates = run_local(experiment, num_local_workers, metrics=metrics)
             else:
-                logger.info("Game " + str(runIdx+1) + ": Turn limit reached, draw")
+                aggregates = Coordinator(experiment, host, port, metrics=metrics).run()
+        self.report_aggregates(aggregates)
+
+    def get_monitor(self, metrics):
+        return MetricsMonitor(metrics, self.METRICS_PORT, self.SUMMARY_INTERVAL)
+
+    def get_experiment(self, checkpoint_dir, base_seed):
+        return ShardedExperiment(checkpoint_dir, self.NUM_RUNS, self.SHARD_SIZE, self.DEFAULT_PLAYER_COUNT, base_seed,
+                                 collect_stats=self.COLLECT_STATS, results_path=self.RESULTS_PATH,
+                                 check_invariants=self.CHECK_INVARIANTS)
+
+    def report_aggregates(self, aggregates):
+        self.player_wincount = dict(enumerate(aggregates["wins"]))
+        if "stats" in aggregates:
+            self.stats = GameStatistics.from_dict(aggregates["stats"])
+        self.report()
 
+    def report(self):
         # TODO: Is this the best format?
         for player_id in range(self.DEFAULT_PLAYER_COUNT):
             if player_id not in self.player_wincount:
                 self.player_wincount[player_id] = 0
             logger.info("Player " + str(player_id) + " won " + str(
                 float(self.player_wincount[player_id] * 100) / self.NUM_RUNS) + "%")
+        if self.stats is not None:
+            self.stats.report(MonopolyGame())
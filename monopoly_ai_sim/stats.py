@@ -0,0 +1,128 @@
+# Opt-in analytics counters
+#
+# Attach a GameStatistics to MonopolyGame.stats and the engine counts landings, rent, building and
+# bankruptcies into fixed-size integer arrays indexed by board position, property group or player seat.
+# Collectors from different games or processes merge by adding their arrays.
+import logging
+from array import array
+
+from monopoly_ai_sim.board import RentIdx
+
+logger = logging.getLogger('monopoly_ai_simulator')
+
+MAX_SEATS = 8
+
+# Who a bankrupt player owed money to
+CREDITOR_BANK = 0
+CREDITOR_PLAYER = 1
+NUM_CREDITOR_TYPES = 2
+
+
+class GameStatistics:
+    def __init__(self, num_positions=40, num_groups=11, num_seats=MAX_SEATS):
+        self.num_positions = num_positions
+        self.num_groups = num_groups
+        self.num_seats = num_seats
+        # Per position
+        self.landings = self._zeros(num_positions)
+        self.rent_collected = self._zeros(num_positions)
+        self.bankruptcies_at = self._zeros(num_positions)
+        # Per property group, build-out timing is kept as a sum of rounds and a count to average
+        self.houses_built = self._zeros(num_groups)
+        self.hotels_built = self._zeros(num_groups)
+        self.first_house_round_sum = self._zeros(num_groups)
+        self.first_house_count = self._zeros(num_groups)
+        self.first_hotel_round_sum = self._zeros(num_groups)
+        self.first_hotel_count = self._zeros(num_groups)
+        # Per player seat
+        self.wins = self._zeros(num_seats)
+        self.bankruptcies = self._zeros(num_seats)
+        self.bankruptcies_to = self._zeros(NUM_CREDITOR_TYPES)
+        self.games = 0
+        self.draws = 0
+        self.rounds = 0
+        # (group id, is hotel) already built on in the game being played, cleared when the game is recorded.
+        # Groups sold down and rebuilt keep the round of their first building
+        self.built_groups = set()
+
+    ARRAY_FIELDS = ("landings", "rent_collected", "bankruptcies_at", "houses_built", "hotels_built",
+                    "first_house_round_sum", "first_house_count", "first_hotel_round_sum", "first_hotel_count",
+                    "wins", "bankruptcies", "bankruptcies_to")
+    COUNT_FIELDS = ("games", "draws", "rounds")
+
+    @staticmethod
+    def _zeros(size):
+        return array('q', bytes(8 * size))
+
+    @classmethod
+    def from_game(cls, game, num_seats=MAX_SEATS):
+        return cls(len(game.board_positions), max(game.group_id_to_position) + 1, num_seats)
+
+    def record_building(self, game, board_position):
+        group_id = board_position.property_group
+        is_hotel = board_position.rent_idx == RentIdx.HOTEL
+        if is_hotel:
+            self.hotels_built[group_id] += 1
+        else:
+            self.houses_built[group_id] += 1
+        if (group_id, is_hotel) in self.built_groups:
+            return
+        self.built_groups.add((group_id, is_hotel))
+        if is_hotel:
+            self.first_hotel_round_sum[group_id] += game.round_count
+            self.first_hotel_count[group_id] += 1
+        else:
+            self.first_house_round_sum[group_id] += game.round_count
+            self.first_house_count[group_id] += 1
+
+    def record_bankruptcy(self, player, owed_player):
+        self.bankruptcies_at[player.position] += 1
+        self.bankruptcies[player.seat] += 1
+        self.bankruptcies_to[CREDITOR_BANK if owed_player is None else CREDITOR_PLAYER] += 1
+
+    def record_game(self, game, winner):
+        self.built_groups.clear()
+        self.games += 1
+        self.rounds += game.round_count
+        if winner:
+            self.wins[winner.seat] += 1
+        else:
+            self.draws += 1
+
+    def merge(self, other):
+        for field in self.ARRAY_FIELDS:
+            counts = getattr(self, field)
+            for idx, count in enumerate(getattr(other, field)):
+                counts[idx] += count
+        for field in self.COUNT_FIELDS:
+            setattr(self, field, getattr(self, field) + getattr(other, field))
+        return self
+
+    # Plain lists and ints, for JSON checkpoints and sending between processes
+    def to_dict(self):
+        data = {field: getattr(self, field).tolist() for field in self.ARRAY_FIELDS}
+        data.update({field: getattr(self, field) for field in self.COUNT_FIELDS})
+        return data
+
+    @classmethod
+    def from_dict(cls, data):
+        stats = cls(len(data["landings"]), len(data["houses_built"]), len(data["wins"]))
+        for field in cls.ARRAY_FIELDS:
+            setattr(stats, field, array('q', data[field]))
+        for field in cls.COUNT_FIELDS:
+            setattr(stats, field, data[field])
+        return stats
+
+    def report(self, game):
+        total_landings = sum(self.landings) or 1
+        logger.info("Statistics over " + str(self.games) + " games, " + str(self.rounds) + " rounds")
+        for position, board_position in sorted(game.board_positions.items()):
+            logger.info("%-24s landed %6.2f%%  rent collected %d" % (
+                board_position.name, 100.0 * self.landings[position] / total_landings, self.rent_collected[position]))
+        for group_id in range(self.num_groups):
+            if self.first_house_count[group_id]:
+                logger.info("Group %d: %d houses, %d hotels, first house at round %.1f" % (
+                    group_id, self.houses_built[group_id], self.hotels_built[group_id],
+                    float(self.first_house_round_sum[group_id]) / self.first_house_count[group_id]))
+        logger.info("Bankruptcies to the bank: " + str(self.bankruptcies_to[CREDITOR_BANK]) +
+                    ", to players: " + str(self.bankruptcies_to[CREDITOR_PLAYER]))
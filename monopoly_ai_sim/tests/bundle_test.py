@@ -0,0 +1,66 @@
+from monopoly_ai_sim.bundle import BUNDLE_MAGIC, BUNDLE_VERSION, STANDARD_BUNDLE, compile_bundle, load_bundle, \
+    parse_bundle
+
+import os
+import pickle
+import subprocess
+import sys
+import tempfile
+import unittest
+
+PACKAGE_PATH = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def get_package_file(name):
+    return os.path.join(PACKAGE_PATH, name)
+
+
+def compile_standard_bundle():
+    return compile_bundle(get_package_file("game_data.csv"), get_package_file("chance.csv"),
+                          get_package_file("community_chest.csv"))
+
+
+class Test(unittest.TestCase):
+
+    def test_standard_bundle_matches_csvs(self):
+        with open(get_package_file(STANDARD_BUNDLE), 'rb') as f:
+            self.assertEqual(f.read(), compile_standard_bundle())
+        rules = load_bundle()
+        self.assertEqual(len(rules["board"]), 40)
+        self.assertEqual(rules["board"][1][1], "Mediterranean Avenue")
+
+    def test_rejects_bad_header(self):
+        data = compile_standard_bundle()
+        with self.assertRaises(ValueError):
+            parse_bundle(b"X" + data[1:])
+        with self.assertRaises(ValueError):
+            parse_bundle(BUNDLE_MAGIC + bytes([BUNDLE_VERSION + 1]) + data[len(BUNDLE_MAGIC) + 1:])
+        with self.assertRaises(ValueError):
+            parse_bundle(BUNDLE_MAGIC)
+
+    def test_rejects_pickled_rules(self):
+        rules = parse_bundle(compile_standard_bundle())
+        with self.assertRaises(ValueError):
+            parse_bundle(BUNDLE_MAGIC + bytes([BUNDLE_VERSION]) + pickle.dumps(rules))
+        with self.assertRaises(ValueError):
+            parse_bundle(BUNDLE_MAGIC + bytes([BUNDLE_VERSION]) +
+                         b'{"board": [[{}]], "chance": [], "community_chest": []}')
+
+    def test_variant_bundle(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "variant.bundle")
+            with open(path, 'wb') as f:
+                f.write(compile_standard_bundle())
+            self.assertEqual(load_bundle(path), load_bundle())
+
+    def test_loads_from_another_working_directory(self):
+        with tempfile.TemporaryDirectory() as directory:
+            env = dict(os.environ, PYTHONPATH=os.path.dirname(PACKAGE_PATH))
+            output = subprocess.check_output(
+                [sys.executable, "-c", "from monopoly_ai_sim.monopoly import MonopolyGame; "
+                                       "print(len(MonopolyGame().board_positions))"], cwd=directory, env=env)
+            self.assertEqual(output.strip(), b"40")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,87 @@
+from monopoly_ai_sim.distributed import Coordinator, Worker, run_local, receive_message, send_message
+from monopoly_ai_sim.shards import ShardedExperiment, run_shard
+
+import socket
+import tempfile
+import threading
+import unittest
+
+
+class Test(unittest.TestCase):
+
+    def test_run_local_matches_sharded_run(self):
+        with tempfile.TemporaryDirectory() as local_directory, tempfile.TemporaryDirectory() as directory:
+            expected = ShardedExperiment(local_directory, num_games=12, shard_size=3).run()
+            self.assertEqual(run_local(ShardedExperiment(directory, num_games=12, shard_size=3), 3), expected)
+
+    def test_lost_worker_shard_is_reassigned(self):
+        with tempfile.TemporaryDirectory() as directory:
+            experiment = ShardedExperiment(directory, num_games=4, shard_size=2)
+            coordinator = Coordinator(experiment, poll_interval=0.05)
+            coordinator.start()
+            host, port = coordinator.address
+
+            # This worker takes a shard and dies without returning a result
+            with socket.create_connection((host, port)) as connection, \
+                    connection.makefile('rb') as rfile, connection.makefile('wb') as wfile:
+                send_message(wfile, {"type": "request"})
+                self.assertEqual(receive_message(rfile)["type"], "shard")
+
+            worker = threading.Thread(target=Worker(host, port).run)
+            worker.start()
+            totals = coordinator.wait()
+            worker.join()
+            self.assertEqual(totals["games"], 4)
+            self.assertEqual(experiment.get_pending_shards(), [])
+
+    def test_unknown_shard_releases_lease(self):
+        with tempfile.TemporaryDirectory() as directory:
+            experiment = ShardedExperiment(directory, num_games=4, shard_size=2)
+            coordinator = Coordinator(experiment, lease_timeout=600.0, poll_interval=0.05)
+            coordinator.start()
+            host, port = coordinator.address
+
+            with socket.create_connection((host, port)) as connection, \
+                    connection.makefile('rb') as rfile, connection.makefile('wb') as wfile:
+                send_message(wfile, {"type": "request"})
+                self.assertEqual(receive_message(rfile)["type"], "shard")
+                send_message(wfile, {"type": "result", "index": 99, "aggregates": {}})
+                # The coordinator drops the connection right away instead of waiting for the lease to expire
+                self.assertIsNone(receive_message(rfile))
+            self.assertEqual(coordinator.leases, {})
+
+            worker = threading.Thread(target=Worker(host, port).run)
+            worker.start()
+            totals = coordinator.wait()
+            worker.join()
+            self.assertEqual(totals["games"], 4)
+
+    def test_checkpoint_does_not_block_leases(self):
+        with tempfile.TemporaryDirectory() as directory:
+            experiment = ShardedExperiment(directory, num_games=4, shard_size=2)
+            coordinator = Coordinator(experiment)
+            experiment.prepare()
+            coordinator.pending.extend(experiment.get_pending_shards())
+            first = coordinator.lease_shard("a")
+            aggregates = run_shard(first["first_seed"], first["num_games"], 2)
+
+            # The checkpoint write hangs until the second shard has been leased
+            recording, leased = threading.Event(), threading.Event()
+            record_shard = experiment.record_shard
+
+            def slow_record_shard(shard, shard_aggregates):
+                recording.set()
+                leased.wait(5)
+                record_shard(shard, shard_aggregates)
+            experiment.record_shard = slow_record_shard
+            completing = threading.Thread(target=coordinator.complete_shard, args=("a", first["index"], aggregates))
+            completing.start()
+            recording.wait(5)
+            self.assertEqual(coordinator.lease_shard("b")["type"], "shard")
+            leased.set()
+            completing.join()
+            self.assertEqual(len(experiment.get_pending_shards()), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,54 @@
+from monopoly_ai_sim.ai.greedy import GreedyMonopolyPlayer
+from monopoly_ai_sim.monopoly import MonopolyGame
+
+import unittest
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+@unittest.skipIf(np is None, "numpy is not installed")
+class Test(unittest.TestCase):
+
+    def setUp(self):
+        from monopoly_ai_sim.encoder import ObservationEncoder, MAX_PLAYERS
+        self.max_players = MAX_PLAYERS
+        self.game = MonopolyGame([GreedyMonopolyPlayer(0), GreedyMonopolyPlayer(1)], 0)
+        self.game.do_simulation()
+        self.encoder = ObservationEncoder(self.game)
+
+    def test_encode_is_relative_to_seat(self):
+        out = np.zeros((2, self.encoder.size), np.float32)
+        self.encoder.encode_batch([self.game, self.game], [0, 1], out)
+        for idx, position in enumerate(self.encoder.property_positions):
+            ownership = out[:, idx * (self.max_players + 1):(idx + 1) * (self.max_players + 1)]
+            self.assertEqual(ownership[0].sum(), 1.0)
+            owner = self.game.board_positions[position].owner
+            if owner is not None:
+                self.assertEqual(ownership[0][1 + owner], 1.0)
+                self.assertEqual(ownership[1][1 + (owner - 1) % 2], 1.0)
+        self.assertEqual(out[0][self.encoder.cash_offset], self.game.players[0].cash / self.game.STARTING_CASH)
+        self.assertEqual(out[1][self.encoder.cash_offset], self.game.players[1].cash / self.game.STARTING_CASH)
+
+    def test_encode_writes_in_place(self):
+        out = np.full(self.encoder.size, 7.0)
+        self.assertIs(self.encoder.encode(self.game, 0, out), out)
+        self.assertNotIn(7.0, out)
+
+    def test_vector_env_steps(self):
+        from monopoly_ai_sim.env import MonopolyVectorEnv
+        env = MonopolyVectorEnv(2, seed=0)
+        try:
+            observations = env.reset()
+            actions = np.ones(2, np.int64)
+            for _ in range(50):
+                result = env.step(actions)
+                self.assertIs(result[0], observations)
+        finally:
+            env.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
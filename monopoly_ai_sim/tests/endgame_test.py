@@ -0,0 +1,93 @@
+from random import Random
+
+from monopoly_ai_sim.ai.endgame import EndgamePlayer, EndgameSolver, check_against_rollouts
+from monopoly_ai_sim.ai.greedy import GreedyMonopolyPlayer
+from monopoly_ai_sim.board import RentIdx
+from monopoly_ai_sim.monopoly import MonopolyGame
+
+import unittest
+
+
+# Two players left, player 1 owns everything but Mediterranean Avenue and has a hotel on every street
+def get_lost_endgame():
+    players = [EndgamePlayer(0), GreedyMonopolyPlayer(1)]
+    game = MonopolyGame(players, 0)
+    for seat, player in enumerate(players):
+        player.seat = seat
+        game.init_player(player)
+    for board_position in game.board_positions.values():
+        if board_position.is_property:
+            owner = players[0] if board_position.name == "Mediterranean Avenue" else players[1]
+            board_position.owner = owner.seat
+            owner.owned_properties.append(board_position)
+    for board_position in players[1].owned_properties:
+        game.check_property_group_and_update_player(board_position)
+        if board_position.house_cost and board_position.rent_idx == RentIdx.GROUP_COMPLETE_NO_HOUSES:
+            board_position.rent_idx = RentIdx.HOTEL
+    players[0].cash = 0
+    players[0].position = 30
+    game.dice_random = [Random(seat) for seat in range(len(players))]
+    return game
+
+
+# Greedy game of seed 10 played on to the round every property has an owner, with neither player far ahead
+def get_contested_endgame():
+    game = MonopolyGame([GreedyMonopolyPlayer(0), GreedyMonopolyPlayer(1)], 10)
+    game.start_simulation()
+    solver = EndgameSolver(game)
+    while solver.get_state(game, game.players[0]) is None:
+        game.play_rounds(game.round_count + 1)
+    return game
+
+
+class Test(unittest.TestCase):
+
+    def test_swap_is_symmetric(self):
+        game = get_lost_endgame()
+        solver = EndgameSolver(game)
+        state = solver.get_state(game, game.players[0])
+        self.assertEqual(solver.swap(solver.swap(state)), state)
+        self.assertEqual(solver.swap(state), solver.get_state(game, game.players[1]))
+
+    def test_values_are_memoized(self):
+        game = get_lost_endgame()
+        solver = EndgameSolver(game)
+        state = solver.get_state(game, game.players[0])
+        value = solver.get_value(state)
+        cache_size = len(solver.cache)
+        self.assertEqual(solver.get_value(state), value)
+        self.assertEqual(len(solver.cache), cache_size)
+
+    def test_not_an_endgame(self):
+        game = MonopolyGame([GreedyMonopolyPlayer(0), GreedyMonopolyPlayer(1)], 0)
+        self.assertIsNone(EndgameSolver(game).get_state(game, game.players[0]))
+
+    def test_build_plans_stop_at_hotels(self):
+        game = get_lost_endgame()
+        solver = EndgameSolver(game)
+        state = solver.get_state(game, game.players[1])
+        self.assertEqual(solver.get_build_plans(state), [((), state)])
+
+    def test_search_agrees_with_rollouts(self):
+        game = get_lost_endgame()
+        estimate, rollout_estimate, _ = check_against_rollouts(game, game.players[0], num_games=20)
+        self.assertLess(estimate, 0.1)
+        self.assertLess(abs(estimate - rollout_estimate), 0.1)
+
+    def test_search_agrees_with_rollouts_when_contested(self):
+        game = get_contested_endgame()
+        estimate, rollout_estimate, stderr = check_against_rollouts(game, game.players[0], num_games=200)
+        self.assertTrue(0.2 < rollout_estimate < 0.8)
+        self.assertTrue(0.2 < estimate < 0.8)
+        # The reduced game and the leaf scores are approximations, allow a few standard errors
+        self.assertLess(abs(estimate - rollout_estimate), max(0.15, 4 * stderr))
+
+    def test_solver_follows_the_game_it_is_asked_about(self):
+        solver = EndgameSolver(get_lost_endgame())
+        game = get_contested_endgame()
+        self.assertEqual(solver.get_state(game, game.players[0]),
+                         EndgameSolver(game).get_state(game, game.players[0]))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,94 @@
+import unittest
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+def run_steps(env, num_steps):
+    observations = env.reset()
+    history = [observations.copy()]
+    for step in range(num_steps):
+        # Alternate between declining and taking every decision
+        observations, rewards, dones, decisions = env.step(np.full(env.num_envs, step % 2, np.int64))
+        history.extend([observations.copy(), rewards.copy(), dones.copy(), decisions.copy()])
+    return history
+
+
+@unittest.skipIf(np is None, "numpy is not installed")
+class Test(unittest.TestCase):
+
+    def test_reset_and_step_shapes(self):
+        from monopoly_ai_sim.env import Decision, MonopolyVectorEnv
+        env = MonopolyVectorEnv(3, seed=0)
+        try:
+            observations = env.reset()
+            self.assertEqual(observations.shape, (3, env.observation_size))
+            self.assertEqual(observations.dtype, np.float32)
+            observations, rewards, dones, decisions = env.step(np.ones(3, np.int64))
+            self.assertEqual(rewards.shape, (3,))
+            self.assertEqual(dones.shape, (3,))
+            self.assertEqual(decisions.shape, (3,))
+            for env_idx in range(3):
+                self.assertNotEqual(decisions[env_idx], Decision.NONE)
+                # One decision and at most one position are flagged
+                self.assertEqual(observations[env_idx][decisions[env_idx]], 1.0)
+        finally:
+            env.close()
+
+    def test_finished_games_reset(self):
+        from monopoly_ai_sim.env import Decision, MonopolyVectorEnv
+        env = MonopolyVectorEnv(2, seed=1)
+        try:
+            env.reset()
+            finished = 0
+            for _ in range(20000):
+                observations, rewards, dones, decisions = env.step(np.ones(2, np.int64))
+                for env_idx in np.nonzero(dones)[0]:
+                    finished += 1
+                    self.assertIn(rewards[env_idx], (-1.0, 0.0, 1.0))
+                    # The observation is already the first decision of the next game
+                    self.assertNotEqual(decisions[env_idx], Decision.NONE)
+                    self.assertEqual(env.slots[env_idx].game.round_count, 0)
+                self.assertTrue(np.all(rewards[~dones] == 0.0))
+                if finished >= 2:
+                    break
+            self.assertGreaterEqual(finished, 2)
+        finally:
+            env.close()
+
+    def test_subprocess_workers_match_sync(self):
+        from monopoly_ai_sim.env import MonopolyVectorEnv
+        sync = MonopolyVectorEnv(4, seed=3)
+        try:
+            expected = run_steps(sync, 40)
+        finally:
+            sync.close()
+        pooled = MonopolyVectorEnv(4, seed=3, num_workers=2)
+        try:
+            actual = run_steps(pooled, 40)
+        finally:
+            pooled.close()
+        self.assertEqual(len(actual), len(expected))
+        for expected_array, actual_array in zip(expected, actual):
+            np.testing.assert_array_equal(actual_array, expected_array)
+
+    def test_buffers_are_reused(self):
+        from monopoly_ai_sim.env import MonopolyVectorEnv
+        env = MonopolyVectorEnv(2, seed=0)
+        try:
+            buffers = (env.reset(),) + env.step(np.ones(2, np.int64))
+            addresses = [buffer.__array_interface__["data"][0] for buffer in buffers]
+            for step in range(100):
+                result = env.step(np.full(2, step % 2, np.int64))
+                for buffer, returned, address in zip(buffers[1:], result, addresses[1:]):
+                    self.assertIs(returned, buffer)
+                    self.assertEqual(returned.__array_interface__["data"][0], address)
+            self.assertIs(buffers[0], buffers[1])
+        finally:
+            env.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,50 @@
+from monopoly_ai_sim.board import RentIdx
+from monopoly_ai_sim.evaluator import MonopolyEvaluator
+from monopoly_ai_sim.monopoly import MonopolyGame
+from monopoly_ai_sim.ai.greedy import GreedyMonopolyPlayer
+
+import unittest
+
+
+class Test(unittest.TestCase):
+
+    def setUp(self):
+        self.players = [GreedyMonopolyPlayer(0), GreedyMonopolyPlayer(1)]
+        self.game = MonopolyGame(self.players)
+        self.evaluator = MonopolyEvaluator(self.game)
+
+    def test_landing_probabilities(self):
+        # Probabilities are per move, cards moving the token elsewhere or to jail remove some mass
+        total = sum(self.evaluator.landing_probabilities)
+        self.assertTrue(0.8 < total <= 1.0)
+        # Nobody pays rent on go to jail or while being sent there
+        go_to_jail = [p for p in self.game.board_positions.values() if p.name == "Go to Jail"][0]
+        self.assertEqual(self.evaluator.landing_probabilities[go_to_jail.position], 0)
+
+    def test_expected_rents(self):
+        self.assertEqual(self.evaluator.get_expected_rents(), {})
+        dark_blue = self.game.group_id_to_position[8]
+        for board_position in dark_blue:
+            self.players[0].get_property(self.game, board_position)
+        expected_rents = self.evaluator.get_expected_rents()
+        self.assertEqual(set(expected_rents.keys()), set(p.position for p in dark_blue))
+        self.assertTrue(all(rent > 0 for rent in expected_rents.values()))
+
+    def test_next_house_value(self):
+        dark_blue = self.game.group_id_to_position[8]
+        self.assertEqual(self.evaluator.get_next_house_value(8), (None, 0.0))
+        for board_position in dark_blue:
+            self.players[0].get_property(self.game, board_position)
+        board_position, marginal_rent = self.evaluator.get_next_house_value(8)
+        self.assertIn(board_position, dark_blue)
+        self.assertTrue(marginal_rent > 0)
+        self.assertTrue(self.evaluator.get_house_payback_period(8) < float("inf"))
+
+        # Fully developed groups have nothing left to build
+        for board_position in dark_blue:
+            board_position.rent_idx = RentIdx.HOTEL
+        self.assertEqual(self.evaluator.get_next_house_value(8), (None, 0.0))
+
+
+if __name__ == "__main__":
+    unittest.main()
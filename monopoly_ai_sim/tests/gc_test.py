@@ -0,0 +1,40 @@
+from monopoly_ai_sim.ai.endgame import EndgamePlayer
+from monopoly_ai_sim.ai.greedy import GreedyMonopolyPlayer
+from monopoly_ai_sim.monopoly import MonopolyGame
+
+import gc
+import unittest
+import weakref
+
+
+class Test(unittest.TestCase):
+
+    def setUp(self):
+        gc.collect()
+        gc.disable()
+
+    def tearDown(self):
+        gc.enable()
+
+    # Without the cyclic collector, a finished game has to be freed as soon as it's dropped
+    def test_finished_games_are_freed_without_the_collector(self):
+        for player_count in (2, 4):
+            for seed in range(3):
+                game = MonopolyGame([GreedyMonopolyPlayer(seat) for seat in range(player_count)], seed)
+                game.do_simulation()
+                game_ref = weakref.ref(game)
+                player_ref = weakref.ref(game.players[0])
+                del game
+                self.assertIsNone(game_ref())
+                self.assertIsNone(player_ref())
+        self.assertEqual(gc.collect(), 0)
+
+    def test_players_kept_between_games_dont_keep_games(self):
+        players = [EndgamePlayer(0), GreedyMonopolyPlayer(1)]
+        game = MonopolyGame(players, 0)
+        game.do_simulation()
+        players[0].get_search_state(game)
+        game_ref = weakref.ref(game)
+        del game
+        self.assertIsNone(game_ref())
+        self.assertEqual(gc.collect(), 0)
@@ -0,0 +1,58 @@
+from monopoly_ai_sim.ai.greedy import GreedyMonopolyPlayer
+from monopoly_ai_sim.board import RentIdx
+from monopoly_ai_sim.invariants import InvariantChecker, InvariantViolation, check_game
+from monopoly_ai_sim.monopoly import MonopolyGame
+
+import unittest
+
+
+def get_game(player_count=2, seed=0):
+    game = MonopolyGame([GreedyMonopolyPlayer(seat) for seat in range(player_count)], seed)
+    for player in game.players:
+        game.init_player(player)
+    return game
+
+
+class Test(unittest.TestCase):
+
+    def test_games_keep_invariants(self):
+        for player_count in (2, 4):
+            for seed in range(5):
+                game = MonopolyGame([GreedyMonopolyPlayer(seat) for seat in range(player_count)], seed)
+                game.invariants = InvariantChecker(every=1)
+                game.do_simulation()
+                self.assertGreater(game.invariants.checks, 0)
+
+    def test_violation_is_reported(self):
+        game = get_game()
+        check_game(game)
+        game.house_count -= 1
+        with self.assertRaises(InvariantViolation):
+            InvariantChecker(every=1).after_turn(game)
+
+    def test_railroads_share_their_rent_index(self):
+        game = get_game()
+        player = game.players[0]
+        player.get_property(game, game.board_positions[5])
+        player.get_property(game, game.board_positions[15])
+        self.assertEqual(game.board_positions[5].rent_idx, RentIdx.RAILROAD_2)
+        self.assertEqual(game.board_positions[15].rent_idx, RentIdx.RAILROAD_2)
+        check_game(game)
+
+    # Hotels sold all at once go straight back to the bank, even when it has no houses to break them into
+    def test_sell_hotels_without_houses_in_bank(self):
+        game = get_game()
+        player = game.players[0]
+        player.cash = 10000
+        group = game.group_id_to_position[game.board_positions[39].property_group]
+        for board_position in group:
+            player.get_property(game, board_position)
+        player.purchase_houses(game)
+        self.assertEqual(player.hotel_count, len(group))
+        game.house_count = 0
+        game.INITIAL_HOUSE_COUNT = 0
+        check_game(game)
+        player.do_sell_properties_and_sum(game, {group[0].property_group: RentIdx.HOUSE_TO_HOTEL * len(group)})
+        self.assertEqual(player.hotel_count, 0)
+        self.assertEqual(game.hotel_count, game.INITIAL_HOTEL_COUNT)
+        check_game(game)
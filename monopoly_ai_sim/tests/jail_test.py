@@ -0,0 +1,47 @@
+from monopoly_ai_sim.ai.greedy import GreedyMonopolyPlayer
+from monopoly_ai_sim.monopoly import JailState, MonopolyGame
+
+import unittest
+
+
+# Player 0 in jail on its first jail turn, rolling (4, 6) from now on, which leads to Free Parking
+def get_jailed_game():
+    game = MonopolyGame([GreedyMonopolyPlayer(0), GreedyMonopolyPlayer(1)], 0)
+    game.start_simulation()
+    player = game.players[0]
+    game.land_on_go_to_jail(player, game.board_positions[30], (1, 2))
+    game.roll_dice = lambda rolling_player: (4, 6)
+    return game, player
+
+
+class Test(unittest.TestCase):
+
+    def test_card_leaves_jail_and_rolls(self):
+        game, player = get_jailed_game()
+        card = next(card for card in game.chance_deck.cards if card.type == "out_of_jail")
+        card.drawn = True
+        player.get_out_of_jail_free.append(card)
+        game.play_turn(player)
+        self.assertEqual(player.jail_state, JailState.NOT_IN_JAIL)
+        self.assertEqual(player.position, 20)
+        self.assertEqual(player.get_out_of_jail_free, [])
+        self.assertFalse(card.drawn)
+
+    def test_paying_leaves_jail_and_rolls(self):
+        game, player = get_jailed_game()
+        player.pay_to_escape_jail = lambda paying_game: True
+        game.play_turn(player)
+        self.assertEqual(player.jail_state, JailState.NOT_IN_JAIL)
+        self.assertEqual(player.position, 20)
+        self.assertEqual(player.cash, game.STARTING_CASH - game.ESCAPE_JAIL_COST)
+
+    def test_staying_in_jail_without_doubles(self):
+        game, player = get_jailed_game()
+        game.play_turn(player)
+        self.assertEqual(player.jail_state, JailState.JAIL_TURN_2)
+        self.assertEqual(player.position, game.POSITION_JAIL)
+        self.assertEqual(player.cash, game.STARTING_CASH)
+
+
+if __name__ == "__main__":
+    unittest.main()
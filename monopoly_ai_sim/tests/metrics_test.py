@@ -0,0 +1,62 @@
+from monopoly_ai_sim.ai.greedy import GreedyMonopolyPlayer
+from monopoly_ai_sim.metrics import MetricsMonitor, PUBLISH_BATCH, RunMetrics
+from monopoly_ai_sim.monopoly import MonopolyGame
+from monopoly_ai_sim.shards import ShardedExperiment, run_shard
+
+import tempfile
+import unittest
+import urllib.request
+
+
+class Test(unittest.TestCase):
+
+    def test_bankrupt_players_take_no_turns(self):
+        game = MonopolyGame([GreedyMonopolyPlayer(seat) for seat in range(4)], 0)
+        turns = []
+        play_turn = game.play_turn
+
+        def counted_play_turn(player):
+            if not player.is_bankrupt:
+                turns.append(player.seat)
+            play_turn(player)
+        game.play_turn = counted_play_turn
+        game.do_simulation()
+        self.assertTrue(any(player.is_bankrupt for player in game.players))
+        self.assertEqual(game.turn_count, len(turns))
+        self.assertLess(game.turn_count, game.round_count * len(game.players))
+        self.assertEqual(run_shard(0, 1, 4)["turns"], game.turn_count)
+
+    def test_games_are_published_in_batches(self):
+        metrics = RunMetrics(1000, 2)
+        counters = metrics.get_worker("test")
+        counters.last_published = float("inf")
+        for _ in range(PUBLISH_BATCH - 1):
+            counters.record_game(0, 10, 0.001)
+        self.assertEqual(metrics.get_totals()[0], 0)
+        counters.record_game(None, 10, 0.001)
+        self.assertEqual(metrics.get_totals(), (PUBLISH_BATCH, 1, 10 * PUBLISH_BATCH, [PUBLISH_BATCH - 1, 0]))
+
+    def test_sharded_run_metrics(self):
+        with tempfile.TemporaryDirectory() as directory:
+            metrics = RunMetrics(6, 2)
+            ShardedExperiment(directory, num_games=6, shard_size=3).run(metrics)
+            games, draws, turns, wins = metrics.get_totals()
+            self.assertEqual(games, 6)
+            self.assertEqual(draws + sum(wins), 6)
+            self.assertGreater(turns, 0)
+            self.assertIn("6/6 games", metrics.get_summary())
+
+    def test_prometheus_endpoint(self):
+        metrics = RunMetrics(10, 2)
+        metrics.get_worker("test").record_aggregates({"games": 4, "draws": 1, "turns": 80, "wins": [2, 1]}, 1.0)
+        with MetricsMonitor(metrics, port=0, summary_interval=0) as monitor:
+            host, port = monitor.server.address
+            text = urllib.request.urlopen("http://" + host + ":" + str(port) + "/metrics").read().decode()
+        self.assertIn("monopoly_games_completed_total 4\n", text)
+        self.assertIn("monopoly_games_remaining 6\n", text)
+        self.assertIn('monopoly_wins_total{seat="0"} 2\n', text)
+        self.assertIn('monopoly_worker_games_total{worker="test"} 4\n', text)
+
+
+if __name__ == '__main__':
+    unittest.main()
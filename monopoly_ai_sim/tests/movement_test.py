@@ -0,0 +1,50 @@
+from monopoly_ai_sim.ai.greedy import GreedyMonopolyPlayer
+from monopoly_ai_sim.monopoly import MonopolyGame
+from monopoly_ai_sim.movement import MovementTable
+
+import copy
+import unittest
+
+
+class Test(unittest.TestCase):
+
+    def setUp(self):
+        self.game = MonopolyGame([GreedyMonopolyPlayer(0), GreedyMonopolyPlayer(1)], 0)
+        self.movement = self.game.movement
+
+    def test_dice_moves_collect_go_when_passing_it(self):
+        self.assertEqual(self.movement.dice_moves[5][7], (12, False))
+        self.assertEqual(self.movement.dice_moves[35][5], (0, True))
+        self.assertEqual(self.movement.dice_moves[38][12], (10, True))
+
+    def test_nearest_railroad_and_utility(self):
+        # From the three Chance squares
+        self.assertEqual(self.movement.nearest_railroad[7], (15, False))
+        self.assertEqual(self.movement.nearest_railroad[36], (5, True))
+        self.assertEqual(self.movement.nearest_utility[22], (28, False))
+        self.assertEqual(self.movement.nearest_utility[36], (12, True))
+        self.assertEqual(self.movement.nearest_railroad[25], (25, False))
+
+    def test_card_moves(self):
+        self.assertEqual(self.movement.card_moves[(-3, 0)][7], (4, False))
+        self.assertEqual(self.movement.card_moves[(0, 30)][22], (30, False))
+        # Advance to Illinois Avenue, collecting GO from beyond it
+        self.assertEqual(self.movement.card_moves[(1, 24)][36], (24, True))
+        self.assertEqual(self.movement.card_moves[(1, 24)][7], (24, False))
+
+    def test_cards_must_move_on_the_board(self):
+        card = copy.copy(self.game.chance_deck.cards[0])
+        card.type, card.flag, card.amount = "set_spot", 1, len(self.game.board_positions)
+        with self.assertRaises(ValueError):
+            MovementTable(self.game.board_positions, [card])
+
+    def test_nearest_cards_need_their_squares(self):
+        board_positions = copy.deepcopy(self.game.board_positions)
+        for board_position in board_positions.values():
+            board_position.is_railroad = False
+        cards = self.game.chance_deck.cards
+        with self.assertRaises(ValueError):
+            MovementTable(board_positions, cards)
+        movement = MovementTable(board_positions, [card for card in cards if card.type != "nearest_railroad"])
+        self.assertIsNone(movement.nearest_railroad)
+        self.assertEqual(movement.nearest_utility[7], (12, False))
@@ -0,0 +1,51 @@
+from monopoly_ai_sim.paired import PairedEvaluation, get_seatings, play_scored_game
+from monopoly_ai_sim.pool import GamePool
+from monopoly_ai_sim.shards import DEFAULT_PLAYER_CLASS
+
+import unittest
+
+
+class Test(unittest.TestCase):
+
+    def test_seatings(self):
+        self.assertEqual(get_seatings(3, 1), [(0, [0, 0]), (1, [0, 0]), (2, [0, 0])])
+        self.assertEqual(len(get_seatings(3, 2, all_permutations=True)), 6)
+        # With a single opponent strategy every permutation of the other seats is the same seating
+        self.assertEqual(get_seatings(3, 1, all_permutations=True), get_seatings(3, 1))
+        self.assertEqual(len(get_seatings(8, 1, all_permutations=True)), 8)
+        self.assertEqual(get_seatings(4, 2, all_permutations=True)[:3], [(0, [0, 1, 0]), (0, [0, 0, 1]),
+                                                                          (0, [1, 0, 0])])
+
+    def test_identical_strategies_have_no_difference(self):
+        strategy = (DEFAULT_PLAYER_CLASS, {})
+        result = PairedEvaluation(strategy, strategy, num_seeds=10, processes=0).run()
+        self.assertEqual(result.mean_difference, 0.0)
+        self.assertEqual(result.stderr, 0.0)
+        self.assertEqual(result.num_games, 20)
+
+    def test_different_strategies_share_the_luck(self):
+        strategy_a = (DEFAULT_PLAYER_CLASS, {"PURCHASE_CASH_RESERVE": 400})
+        strategy_b = (DEFAULT_PLAYER_CLASS, {})
+        result = PairedEvaluation(strategy_a, strategy_b, num_seeds=20, processes=0).run()
+        self.assertEqual(result.num_games, 40)
+        self.assertGreater(result.stderr, 0.0)
+        self.assertGreater(result.get_variance_reduction(), 1.0)
+        # Both strategies played the very same games as they would on their own
+        self.assertEqual(result.scores[3][1], (play_scored_game(strategy_a, [strategy_b], 3, 1, [0]),
+                                               play_scored_game(strategy_b, [strategy_b], 3, 1, [0])))
+        self.assertTrue(any(a != b for seed_scores in result.scores for a, b in seed_scores))
+
+        result = PairedEvaluation(strategy_a, strategy_b, player_count=3, num_seeds=2, all_permutations=True,
+                                  processes=0).run()
+        self.assertEqual(result.num_games, 6)
+
+    def test_pool_restores_parameters(self):
+        pool = GamePool()
+        game = pool.get_game([DEFAULT_PLAYER_CLASS] * 2, 0, player_parameters=[{"PURCHASE_CASH_RESERVE": 300}, {}])
+        self.assertEqual(game.players[0].PURCHASE_CASH_RESERVE, 300)
+        game = pool.get_game([DEFAULT_PLAYER_CLASS] * 2, 1)
+        self.assertEqual(game.players[0].PURCHASE_CASH_RESERVE, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,49 @@
+from monopoly_ai_sim.ai.greedy import GreedyMonopolyPlayer
+from monopoly_ai_sim.board import RentIdx
+from monopoly_ai_sim.monopoly import MonopolyGame
+from monopoly_ai_sim.pool import GamePool
+
+import unittest
+
+
+def play(game):
+    winner = game.do_simulation()
+    return (winner.id if winner else None, game.round_count, game.house_count, game.hotel_count,
+            [(player.cash, player.position, player.is_bankrupt) for player in game.players])
+
+
+class Test(unittest.TestCase):
+
+    def test_reset_replays_new_game(self):
+        game = MonopolyGame([GreedyMonopolyPlayer(0), GreedyMonopolyPlayer(1)], 3)
+        game.do_simulation()
+        for seed in range(5):
+            game.reset(seed)
+            self.assertEqual(play(game), play(MonopolyGame([GreedyMonopolyPlayer(0), GreedyMonopolyPlayer(1)], seed)))
+
+    def test_reset_restores_starting_state(self):
+        game = MonopolyGame([GreedyMonopolyPlayer(0), GreedyMonopolyPlayer(1)], 1)
+        game.do_simulation()
+        game.reset(1)
+        self.assertEqual(game.house_count, game.INITIAL_HOUSE_COUNT)
+        self.assertEqual(game.hotel_count, game.INITIAL_HOTEL_COUNT)
+        for board_position in game.board_positions.values():
+            self.assertIsNone(board_position.owner)
+            self.assertFalse(board_position.is_mortgaged)
+            self.assertEqual(board_position.rent_idx, RentIdx.DEFAULT)
+        for player in game.players:
+            self.assertEqual(player.owned_properties, [])
+            self.assertEqual(player.house_building_history, {})
+            self.assertFalse(player.is_bankrupt)
+        self.assertFalse(any(card.drawn for card in game.chance_deck.cards + game.community_chest_deck.cards))
+
+    def test_pool_reuses_games(self):
+        pool = GamePool()
+        class_paths = ["monopoly_ai_sim.ai.greedy:GreedyMonopolyPlayer"] * 2
+        game = pool.get_game(class_paths, 0)
+        self.assertIs(pool.get_game(class_paths, 1), game)
+        self.assertIsNot(pool.get_game(class_paths * 2, 1), game)
+
+
+if __name__ == "__main__":
+    unittest.main()
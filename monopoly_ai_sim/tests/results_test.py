@@ -0,0 +1,47 @@
+from monopoly_ai_sim.results import ResultsStore, get_experiment_config
+from monopoly_ai_sim.rules import HouseRules
+from monopoly_ai_sim.shards import DEFAULT_PLAYER_CLASS, ShardedExperiment, run_shard
+
+import os
+import tempfile
+import unittest
+
+
+class Test(unittest.TestCase):
+
+    def test_sharded_run_writes_every_game_once(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "results.db")
+            experiment = ShardedExperiment(os.path.join(directory, "run"), num_games=8, shard_size=4,
+                                           results_path=path)
+            aggregates = experiment.run()
+            self.assertIsNone(experiment.results_store)
+            # A shard that runs again after a crash must not count twice
+            experiment.prepare()
+            experiment.record_shard(experiment.get_shards()[0],
+                                    run_shard(0, 4, 2, collect_results=True))
+            experiment.close()
+            with ResultsStore(path) as store:
+                games, draws, _ = store.get_game_summary()
+                self.assertEqual(games, 8)
+                self.assertEqual(draws, aggregates["draws"])
+                win_rates = store.get_win_rates(config={"player_count": 2, "rules.starting_cash": 1500})
+                self.assertEqual([wins for _, wins in win_rates.values()], aggregates["wins"])
+                self.assertEqual(store.get_win_rates(config={"rules.starting_cash": 1000}), {})
+
+    def test_group_queries(self):
+        with tempfile.TemporaryDirectory() as directory, \
+                ResultsStore(os.path.join(directory, "results.db")) as store:
+            config = get_experiment_config([DEFAULT_PLAYER_CLASS] * 2, HouseRules(starting_cash=1000))
+            experiment_id = store.get_experiment_id(config)
+            self.assertEqual(store.get_experiment_id(config), experiment_id)
+            players = [[0, DEFAULT_PLAYER_CLASS, 0, 40], [1, DEFAULT_PLAYER_CLASS, 900, None]]
+            store.add_games(experiment_id, [
+                [1, 1, 40, players, [[1, 5, 20], [0, 2, 10]]],
+                [2, 0, 60, players, [[1, 5, 35]]],
+                [3, None, 500, players, [[1, 5, 25]]],
+            ])
+            filters = {"config": {"rules.starting_cash": 1000}}
+            self.assertEqual(store.get_group_win_rate(5, by_round=30, seat=1, **filters), (2, 1))
+            self.assertEqual(store.get_group_win_rate(5, **filters), (3, 1))
+            self.assertEqual(store.get_group_completions(experiment_id)[5], (3, 80 / 3, 1))
@@ -0,0 +1,95 @@
+from monopoly_ai_sim.ai.greedy import GreedyMonopolyPlayer
+from monopoly_ai_sim.board import RentIdx
+from monopoly_ai_sim.monopoly import JailState, MonopolyGame
+from monopoly_ai_sim.pool import GamePool
+from monopoly_ai_sim.rules import HouseRules
+from monopoly_ai_sim.shards import DEFAULT_PLAYER_CLASS
+
+import unittest
+
+
+def new_game(rules):
+    game = MonopolyGame([GreedyMonopolyPlayer(0), GreedyMonopolyPlayer(1)], 0, rules=rules)
+    for player in game.players:
+        game.init_player(player)
+    return game
+
+
+class Test(unittest.TestCase):
+
+    def test_standard_rules_have_no_variant_handlers(self):
+        game = new_game(None)
+        self.assertIs(game.square_handlers[20], MonopolyGame.land_on_plain_square)
+        self.assertIs(game.square_handlers[0], MonopolyGame.land_on_plain_square)
+        self.assertIs(game.fine_handler, MonopolyGame.pay_fine_to_bank)
+
+    def test_free_parking_jackpot(self):
+        game = new_game(HouseRules(free_parking_jackpot=True))
+        player = game.players[0]
+        game.land_on_luxury_tax(player, game.board_positions[38], (1, 2))
+        self.assertEqual(game.jackpot, game.LUXURY_TAX)
+        game.square_handlers[20](game, player, game.board_positions[20], (1, 2))
+        self.assertEqual(player.cash, game.STARTING_CASH)
+        self.assertEqual(game.jackpot, 0)
+
+    def test_double_go_on_exact_landing(self):
+        game = new_game(HouseRules(double_go_on_exact_landing=True))
+        game.square_handlers[0](game, game.players[0], game.board_positions[0], (1, 2))
+        self.assertEqual(game.players[0].cash, game.STARTING_CASH + game.GO_INCOME)
+
+    def test_no_auctions(self):
+        game = new_game(HouseRules(auctions=False))
+        game.auction_property(game.board_positions[1], game.players)
+        self.assertIsNone(game.board_positions[1].owner)
+
+    def test_jail_turn_cap(self):
+        game = new_game(HouseRules(jail_turns=2))
+        player = game.players[1]
+        game.land_on_go_to_jail(player, game.board_positions[30], (1, 2))
+        # Never rolls doubles, leading from jail to Free Parking
+        game.roll_dice = lambda rolling_player: (4, 6)
+        for _ in range(2):
+            game.play_turn(player)
+            self.assertEqual(player.position, game.POSITION_JAIL)
+            self.assertNotEqual(player.jail_state, JailState.NOT_IN_JAIL)
+        self.assertEqual(player.cash, game.STARTING_CASH)
+        game.play_turn(player)
+        self.assertEqual(player.jail_state, JailState.NOT_IN_JAIL)
+        self.assertEqual(player.position, 20)
+        self.assertEqual(player.cash, game.STARTING_CASH - game.ESCAPE_JAIL_COST)
+
+    def test_negative_cash_card_is_a_fine(self):
+        game = new_game(HouseRules(free_parking_jackpot=True))
+        player = game.players[0]
+        card = next(card for card in game.chance_deck.cards + game.community_chest_deck.cards
+                    if card.type == "cash_change" and card.amount < 0)
+        card.perform_action_on_player(game, player)
+        self.assertEqual(player.cash, game.STARTING_CASH + card.amount)
+        self.assertEqual(game.jackpot, -card.amount)
+
+    def test_properties_given_to_the_bank_are_reset(self):
+        game = new_game(HouseRules(auctions=False))
+        player = game.players[0]
+        board_position = game.board_positions[1]
+        player.get_property(game, board_position)
+        board_position.is_mortgaged = True
+        player.force_bankruptcy(None, game)
+        self.assertIsNone(board_position.owner)
+        self.assertFalse(board_position.is_mortgaged)
+        self.assertEqual(board_position.rent_idx, RentIdx.DEFAULT)
+
+    def test_building_supply(self):
+        game = new_game(HouseRules(house_count=8, hotel_count=2))
+        self.assertEqual((game.house_count, game.hotel_count), (8, 2))
+        game.do_simulation()
+
+    def test_pool_keys_games_by_rules(self):
+        pool = GamePool()
+        standard = pool.get_game([DEFAULT_PLAYER_CLASS] * 2, 0)
+        variant = pool.get_game([DEFAULT_PLAYER_CLASS] * 2, 0, rules=HouseRules(auctions=False))
+        self.assertIsNot(standard, variant)
+        self.assertIs(variant, pool.get_game([DEFAULT_PLAYER_CLASS] * 2, 1, rules=HouseRules(auctions=False)))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,34 @@
+from monopoly_ai_sim.shards import ShardedExperiment, run_shard
+
+import os
+import tempfile
+import unittest
+
+
+class Test(unittest.TestCase):
+
+    def test_run_shard_is_deterministic(self):
+        self.assertEqual(run_shard(10, 5, 2), run_shard(10, 5, 2))
+
+    def test_resume_skips_complete_shards(self):
+        with tempfile.TemporaryDirectory() as directory:
+            experiment = ShardedExperiment(directory, num_games=9, shard_size=4)
+            self.assertEqual([shard.num_games for shard in experiment.get_shards()], [4, 4, 1])
+            totals = experiment.run()
+            self.assertEqual(totals["games"], 9)
+            self.assertEqual(totals["draws"] + sum(totals["wins"]), 9)
+
+            # Losing a shard only reruns that shard, and gives the same result
+            os.remove(experiment.get_shard_path(experiment.get_shards()[1]))
+            self.assertEqual(len(experiment.get_pending_shards()), 1)
+            self.assertEqual(experiment.run(), totals)
+
+    def test_resume_rejects_other_experiment(self):
+        with tempfile.TemporaryDirectory() as directory:
+            ShardedExperiment(directory, num_games=2).prepare()
+            with self.assertRaises(ValueError):
+                ShardedExperiment(directory, num_games=3).prepare()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,89 @@
+from monopoly_ai_sim.ai.greedy import GreedyMonopolyPlayer
+from monopoly_ai_sim.invariants import check_game
+from monopoly_ai_sim.monopoly import MonopolyGame
+from monopoly_ai_sim.rules import HouseRules
+
+import unittest
+
+# Oriental, Vermont and Connecticut Avenue, St. Charles Place, States and Virginia Avenue,
+# Pacific, North Carolina and Pennsylvania Avenue, Park Place and Boardwalk
+LIGHT_BLUE = (6, 8, 9)
+PINK = (11, 13, 14)
+GREEN = (31, 32, 34)
+DARK_BLUE = (37, 39)
+
+
+# Greedy player that bids a fixed amount on houses, whatever it has to sell or mortgage to pay for it
+class OverbiddingPlayer(GreedyMonopolyPlayer):
+    def __init__(self, player_id, house_bid):
+        super().__init__(player_id)
+        self.house_bid = house_bid
+
+    def handle_auction_turn(self, auction):
+        return self.house_bid
+
+
+def get_game(house_count, groups=(LIGHT_BLUE, PINK), players=None):
+    players = players or [GreedyMonopolyPlayer(seat) for seat in range(len(groups))]
+    game = MonopolyGame(players, 0, rules=HouseRules(house_count=house_count))
+    for player in game.players:
+        game.init_player(player)
+    for player, group in zip(game.players, groups):
+        for position in group:
+            player.get_property(game, game.board_positions[position])
+        game.mark_dirty(player)
+    return game
+
+
+class Test(unittest.TestCase):
+
+    def test_short_houses_are_auctioned(self):
+        game = get_game(house_count=4)
+        self.assertTrue(game.may_run_short([0, 1]))
+        game.improve_properties()
+        self.assertEqual(game.house_count, 0)
+        # Pink houses cost more, so their owner's bid of price plus premium outbids light blue every time
+        light_blue, pink = game.players
+        self.assertEqual(light_blue.cash, 1500)
+        self.assertEqual(pink.house_count, 4)
+        self.assertEqual(1500 - pink.cash, 4 * (game.board_positions[PINK[0]].house_cost + pink.DEFAULT_HOUSE_VALUE))
+        check_game(game)
+
+    def test_short_houses_are_not_sold_below_their_price(self):
+        game = get_game(house_count=2, groups=(GREEN, DARK_BLUE))
+        game.improve_properties()
+        self.assertEqual(game.house_count, 0)
+        for player, group in zip(game.players, (GREEN, DARK_BLUE)):
+            house_cost = game.board_positions[group[0]].house_cost
+            self.assertGreaterEqual(1500 - player.cash, player.house_count * house_cost)
+        # A bid below the price of the house the bidder would build is turned down
+        players = [OverbiddingPlayer(0, 199), OverbiddingPlayer(1, 60)]
+        game = get_game(house_count=1, groups=(GREEN, LIGHT_BLUE), players=players)
+        game.auction_short_buildings([0, 1])
+        self.assertEqual(players[0].house_count, 0)
+        self.assertEqual(players[1].house_count, 1)
+        self.assertEqual(players[1].cash, 1440)
+        check_game(game)
+
+    def test_house_is_placed_after_paying(self):
+        players = [GreedyMonopolyPlayer(0), OverbiddingPlayer(1, 190)]
+        game = get_game(house_count=3, players=players)
+        light_blue, pink = players
+        pink.cash = 120
+        game.auction_short_buildings([0, 1])
+        # Paying the bid mortgaged St. Charles Place, so the pink group can't take the house anymore
+        self.assertTrue(game.board_positions[PINK[0]].is_mortgaged)
+        self.assertEqual(pink.house_count, 0)
+        self.assertEqual(pink.cash, 120 + game.board_positions[PINK[0]].mortgage_value)
+        self.assertEqual(game.house_count, 3)
+        check_game(game)
+
+    def test_enough_houses_are_bought_at_their_price(self):
+        game = get_game(house_count=32)
+        self.assertFalse(game.may_run_short([0, 1]))
+        game.improve_properties()
+        for player, group in zip(game.players, (LIGHT_BLUE, PINK)):
+            house_cost = game.board_positions[group[0]].house_cost
+            built = sum(len(history) for history in player.house_building_history.values())
+            self.assertEqual(1500 - player.cash, built * house_cost)
+        check_game(game)
@@ -0,0 +1,95 @@
+from monopoly_ai_sim.ai.greedy import GreedyMonopolyPlayer
+from monopoly_ai_sim.board import RentIdx
+from monopoly_ai_sim.monopoly import MonopolyGame
+from monopoly_ai_sim.shards import merge_aggregates, run_shard
+from monopoly_ai_sim.stats import GameStatistics
+
+import unittest
+
+# Oriental, Vermont and Connecticut Avenue
+LIGHT_BLUE = (6, 8, 9)
+LIGHT_BLUE_GROUP = 2
+
+
+def get_game():
+    game = MonopolyGame([GreedyMonopolyPlayer(0), GreedyMonopolyPlayer(1)], 0)
+    game.start_simulation()
+    game.stats = GameStatistics.from_game(game)
+    return game
+
+
+class Test(unittest.TestCase):
+
+    def test_merge_is_additive(self):
+        first = run_shard(0, 3, 2, collect_stats=True)
+        second = run_shard(3, 4, 2, collect_stats=True)
+        total = merge_aggregates(merge_aggregates({"games": 0, "draws": 0, "turns": 0, "wins": [0, 0]}, first),
+                                 second)
+        self.assertEqual(run_shard(0, 7, 2, collect_stats=True), total)
+        for field in GameStatistics.ARRAY_FIELDS:
+            self.assertEqual(total["stats"][field],
+                             [a + b for a, b in zip(first["stats"][field], second["stats"][field])])
+        self.assertEqual(total["stats"]["games"], 7)
+
+    def test_dict_round_trip(self):
+        stats = GameStatistics.from_dict(run_shard(0, 2, 2, collect_stats=True)["stats"])
+        self.assertEqual(GameStatistics.from_dict(stats.to_dict()).to_dict(), stats.to_dict())
+
+    def test_rebuilding_is_not_a_first_building(self):
+        game = get_game()
+        player = game.players[0]
+        for position in LIGHT_BLUE:
+            player.get_property(game, game.board_positions[position])
+        game.round_count = 3
+        for _ in range(RentIdx.HOUSE_TO_HOTEL):
+            for position in LIGHT_BLUE:
+                player.build_at(game, game.board_positions[position])
+        # Every hotel broken back to houses and a group sold down to no houses, each then built again
+        game.round_count = 7
+        for position in LIGHT_BLUE:
+            player.do_sell_house_at(game, game.board_positions[position])
+        for position in LIGHT_BLUE:
+            player.build_at(game, game.board_positions[position])
+        player.do_sell_properties_and_sum(game, {LIGHT_BLUE_GROUP: 3 * RentIdx.HOUSE_TO_HOTEL})
+        player.build_at(game, game.board_positions[LIGHT_BLUE[0]])
+
+        stats = game.stats
+        self.assertEqual(stats.houses_built[LIGHT_BLUE_GROUP], 3 * (RentIdx.HOUSE_TO_HOTEL - 1) + 1)
+        self.assertEqual(stats.hotels_built[LIGHT_BLUE_GROUP], 6)
+        self.assertEqual(stats.first_house_count[LIGHT_BLUE_GROUP], 1)
+        self.assertEqual(stats.first_house_round_sum[LIGHT_BLUE_GROUP], 3)
+        self.assertEqual(stats.first_hotel_count[LIGHT_BLUE_GROUP], 1)
+        self.assertEqual(stats.first_hotel_round_sum[LIGHT_BLUE_GROUP], 3)
+
+        # The next game counts its first buildings again
+        stats.record_game(game, None)
+        player.build_at(game, game.board_positions[LIGHT_BLUE[1]])
+        self.assertEqual(stats.first_house_count[LIGHT_BLUE_GROUP], 2)
+
+    def test_hand_played_turns(self):
+        game = get_game()
+        mover, owner = game.players
+        owner.get_property(game, game.board_positions[3])
+        rolls = iter([(1, 2), (2, 3)])
+        game.roll_dice = lambda player: next(rolls)
+        # GO to Baltic Avenue, paying its deed rent
+        game.play_turn(mover)
+        # Baltic Avenue to Vermont Avenue, which nobody owns
+        game.play_turn(mover)
+
+        stats = game.stats
+        self.assertEqual(stats.landings[3], 1)
+        self.assertEqual(stats.landings[8], 1)
+        self.assertEqual(sum(stats.landings), 2)
+        self.assertEqual(stats.rent_collected[3], game.board_positions[3].rents[RentIdx.ONLY_DEED])
+        self.assertEqual(sum(stats.rent_collected), stats.rent_collected[3])
+        self.assertEqual(owner.cash, game.STARTING_CASH + stats.rent_collected[3])
+
+        owner.force_bankruptcy(None, game)
+        self.assertEqual(stats.bankruptcies[owner.seat], 1)
+        self.assertEqual(stats.bankruptcies_at[owner.position], 1)
+        self.assertEqual(list(stats.bankruptcies_to), [1, 0])
+
+
+if __name__ == "__main__":
+    unittest.main()
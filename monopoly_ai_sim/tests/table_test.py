@@ -0,0 +1,38 @@
+from monopoly_ai_sim.ai.greedy import GreedyMonopolyPlayer
+from monopoly_ai_sim.board import RentIdx
+from monopoly_ai_sim.monopoly import MonopolyGame
+
+import unittest
+
+
+class Test(unittest.TestCase):
+
+    def test_live_players_at_a_full_table(self):
+        for seed in range(5):
+            game = MonopolyGame([GreedyMonopolyPlayer(seat) for seat in range(8)], seed)
+            winner = game.do_simulation()
+            self.assertEqual(game.live_players, [player for player in game.players if not player.is_bankrupt])
+            self.assertEqual(winner, game.live_players[0] if len(game.live_players) == 1 else None)
+            self.assertTrue(game.improving_seats.issubset(player.seat for player in game.live_players))
+
+    def test_only_improvable_players_are_visited(self):
+        game = MonopolyGame([GreedyMonopolyPlayer(0), GreedyMonopolyPlayer(1)], 0)
+        for player in game.players:
+            game.init_player(player)
+        game.improve_properties()
+        self.assertEqual(game.improving_seats, set())
+
+        # Park Place and Boardwalk, too expensive to fill with hotels in one go
+        player = game.players[1]
+        for board_position in game.group_id_to_position[game.board_positions[39].property_group]:
+            player.get_property(game, board_position)
+        game.improve_properties()
+        self.assertEqual(game.improving_seats, {1})
+        self.assertGreater(player.house_count, 0)
+
+        # Once the group is full of hotels there is nothing left to do
+        for board_position in player.owned_properties:
+            board_position.rent_idx = RentIdx.HOTEL
+        game.mark_dirty(player)
+        game.improve_properties()
+        self.assertEqual(game.improving_seats, set())
@@ -0,0 +1,138 @@
+from monopoly_ai_sim.ai.greedy import GreedyMonopolyPlayer
+from monopoly_ai_sim.board import RentIdx
+from monopoly_ai_sim.invariants import check_game
+from monopoly_ai_sim.monopoly import MonopolyGame
+from monopoly_ai_sim.rules import HouseRules
+from monopoly_ai_sim.trade import TradeOffer, get_trade_candidates
+
+import unittest
+
+# Mediterranean and Baltic Avenue, Oriental, Vermont and Connecticut Avenue
+BROWN = (1, 3)
+LIGHT_BLUE = (6, 8, 9)
+
+
+def get_game(player_count=2):
+    game = MonopolyGame([GreedyMonopolyPlayer(seat) for seat in range(player_count)], 0)
+    for player in game.players:
+        game.init_player(player)
+    return game
+
+
+class Test(unittest.TestCase):
+
+    def test_candidates_complete_or_block_groups(self):
+        game = get_game(3)
+        player_0, player_1, player_2 = game.players
+        player_0.get_property(game, game.board_positions[BROWN[0]])
+        self.assertEqual(get_trade_candidates(game, player_0), [])
+        player_1.get_property(game, game.board_positions[BROWN[1]])
+        candidates = get_trade_candidates(game, player_0)
+        self.assertEqual(len(candidates), 1)
+        self.assertTrue(candidates[0].completes)
+        self.assertIs(candidates[0].responder, player_1)
+        # Player 2 can only keep one of the two from completing the group, both hold as much
+        candidates = get_trade_candidates(game, player_2)
+        self.assertEqual(sorted((c.responder.seat, c.blocked_player.seat) for c in candidates), [(0, 1), (1, 0)])
+        self.assertEqual(get_trade_candidates(game, player_2, blocking=False), [])
+
+    def test_trade_completes_group(self):
+        game = get_game()
+        player_0, player_1 = game.players
+        for position in LIGHT_BLUE[:2]:
+            player_0.get_property(game, game.board_positions[position])
+        player_1.get_property(game, game.board_positions[LIGHT_BLUE[2]])
+        offer = TradeOffer(player_0, player_1, properties_received=[game.board_positions[LIGHT_BLUE[2]]], cash=200)
+        self.assertTrue(offer.completes_group_for(game, player_0))
+        offer.execute(game)
+        self.assertEqual((player_0.cash, player_1.cash), (1300, 1700))
+        for position in LIGHT_BLUE:
+            self.assertEqual(game.board_positions[position].owner, player_0.seat)
+            self.assertEqual(game.board_positions[position].rent_idx, RentIdx.GROUP_COMPLETE_NO_HOUSES)
+        self.assertEqual(game.split_groups, {})
+        check_game(game)
+
+    def test_mortgaged_property_pays_interest(self):
+        game = get_game()
+        player_0, player_1 = game.players
+        board_position = game.board_positions[BROWN[0]]
+        player_1.get_property(game, board_position)
+        board_position.is_mortgaged = True
+        TradeOffer(player_0, player_1, properties_received=[board_position], cash=50).execute(game)
+        self.assertEqual(player_0.cash, 1500 - 50 - int(board_position.mortgage_value * 0.1))
+        self.assertTrue(board_position.is_mortgaged)
+        self.assertEqual(board_position.owner, player_0.seat)
+
+    def test_invalid_offers(self):
+        game = get_game()
+        player_0, player_1 = game.players
+        for position in BROWN:
+            player_1.get_property(game, game.board_positions[position])
+        brown = game.board_positions[BROWN[0]]
+        with self.assertRaises(ValueError):
+            TradeOffer(player_0, player_1).validate(game)
+        with self.assertRaises(ValueError):
+            TradeOffer(player_0, player_1, properties_given=[brown]).validate(game)
+        with self.assertRaises(ValueError):
+            TradeOffer(player_0, player_1, properties_received=[brown], cash=2000).validate(game)
+        player_1.cash = 1000
+        player_1.purchase_houses(game)
+        self.assertGreaterEqual(brown.rent_idx, RentIdx.HOUSE_1)
+        offer = TradeOffer(player_0, player_1, properties_received=[brown], cash=500)
+        self.assertFalse(offer.is_valid(game))
+        with self.assertRaises(ValueError):
+            offer.execute(game)
+        self.assertEqual(brown.owner, player_1.seat)
+
+    def test_greedy_player_blocks(self):
+        game = get_game(3)
+        player_0, player_1, player_2 = game.players
+        player_0.get_property(game, game.board_positions[LIGHT_BLUE[0]])
+        player_0.get_property(game, game.board_positions[LIGHT_BLUE[1]])
+        player_1.get_property(game, game.board_positions[LIGHT_BLUE[2]])
+        offer = player_2.attempt_trade(game)
+        self.assertIs(offer.responder, player_1)
+        self.assertEqual(offer.properties_received, [game.board_positions[LIGHT_BLUE[2]]])
+        self.assertTrue(player_1.evaluate_trade(game, offer))
+        offer.execute(game)
+        self.assertEqual(game.board_positions[LIGHT_BLUE[2]].owner, player_2.seat)
+        # Player 0 can still try to complete the group, but has to pay the premium
+        self.assertTrue(get_trade_candidates(game, player_0, blocking=False)[0].completes)
+        check_game(game)
+
+    def test_trades_can_be_disabled(self):
+        trades = {}
+        for trades_per_turn in (0, 1, 2):
+            trades[trades_per_turn] = 0
+            for seed in range(3):
+                game = MonopolyGame([GreedyMonopolyPlayer(seat) for seat in range(4)], seed,
+                                    rules=HouseRules(trades_per_turn=trades_per_turn))
+                offers = []
+                for player in game.players:
+                    player.attempt_trade = self.count_calls(player.attempt_trade, offers)
+                    player.give_property_to = self.count_calls(player.give_property_to, [])
+                play_turn = game.play_turn
+
+                def counted_play_turn(player):
+                    del offers[:]
+                    play_turn(player)
+                    self.assertLessEqual(len(offers), trades_per_turn)
+                game.play_turn = counted_play_turn
+                game.do_simulation()
+                trades[trades_per_turn] += sum(len(player.give_property_to.calls) for player in game.players)
+        self.assertEqual(trades[0], 0)
+        self.assertGreater(trades[1], 0)
+        self.assertGreater(trades[2], 0)
+
+    # Wraps function to append its arguments to calls
+    @staticmethod
+    def count_calls(function, calls):
+        def counted(*args):
+            calls.append(args)
+            return function(*args)
+        counted.calls = calls
+        return counted
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,92 @@
+from monopoly_ai_sim.ai.greedy import GreedyMonopolyPlayer
+from monopoly_ai_sim.board import MonopolyBoardPosition
+from monopoly_ai_sim.pool import game_pool, get_class_path
+from monopoly_ai_sim.tuner import GREEDY_PARAMETERS, StrategyTuner, TunableParameter, play_candidate_games
+
+import os
+import tempfile
+import unittest
+
+
+# Greedy player that can be tuned into never getting a property, and so never winning
+class PassivePlayer(GreedyMonopolyPlayer):
+    def __init__(self, player_id):
+        super().__init__(player_id)
+        self.BUYS_PROPERTIES = 1
+
+    def should_purchase_property(self, game, current_position):
+        return self.BUYS_PROPERTIES and super().should_purchase_property(game, current_position)
+
+    def handle_auction_turn(self, auction):
+        if type(auction.auction_item) is MonopolyBoardPosition and not self.BUYS_PROPERTIES:
+            return 0
+        return super().handle_auction_turn(auction)
+
+
+PASSIVE_PARAMETERS = GREEDY_PARAMETERS + [TunableParameter("BUYS_PROPERTIES", 0, 1)]
+
+
+def get_tuner(checkpoint_path=None):
+    return StrategyTuner(population_size=3, elite_count=1, games_per_candidate=6, batch_size=3, seed=5,
+                         checkpoint_path=checkpoint_path, processes=0)
+
+
+class Test(unittest.TestCase):
+
+    def test_parameters_map_to_player_attributes(self):
+        tuner = get_tuner()
+        defaults = tuner.get_default_parameters()
+        player = GreedyMonopolyPlayer(0)
+        self.assertEqual(defaults, {p.name: getattr(player, p.name) for p in GREEDY_PARAMETERS})
+
+        parameters = {"DEFAULT_HOUSE_VALUE": 7, "PURCHASE_CASH_RESERVE": 1400}
+        game = game_pool.get_game([tuner.player_class_path] * 2, 0, player_parameters=[parameters, {}])
+        self.assertEqual(game.players[0].DEFAULT_HOUSE_VALUE, 7)
+        self.assertEqual(game.players[0].PURCHASE_CASH_RESERVE, 1400)
+        self.assertEqual(game.players[1].DEFAULT_HOUSE_VALUE, player.DEFAULT_HOUSE_VALUE)
+        # A $200 property leaves less than the reserve out of the starting cash
+        game.start_simulation()
+        self.assertFalse(game.players[0].should_purchase_property(game, game.board_positions[5]))
+        self.assertTrue(game.players[1].should_purchase_property(game, game.board_positions[5]))
+        # Vectors are kept inside the parameter bounds
+        self.assertEqual(GREEDY_PARAMETERS[0].clip(10000.4), GREEDY_PARAMETERS[0].high)
+        self.assertEqual(GREEDY_PARAMETERS[0].clip(12.6), 13)
+
+    def test_candidates_play_the_same_seeds(self):
+        tuner = get_tuner()
+        defaults = tuner.get_default_parameters()
+        ranked = tuner.evaluate([defaults, dict(defaults)])
+        self.assertEqual(ranked[0].wins, ranked[1].wins)
+        self.assertEqual(ranked[0].games, len(tuner.seeds))
+        self.assertEqual(ranked[0].wins, play_candidate_games(tuner.player_class_path, defaults,
+                                                              tuner.reference_pool, tuner.player_count, tuner.seeds))
+
+    def test_worse_candidates_stop_early(self):
+        class_path = get_class_path(PassivePlayer)
+        tuner = StrategyTuner(class_path, PASSIVE_PARAMETERS, games_per_candidate=60, batch_size=20, processes=0)
+        defaults = tuner.get_default_parameters()
+        ranked = tuner.evaluate([defaults, dict(defaults, BUYS_PROPERTIES=0)])
+        self.assertEqual(ranked[0].parameters, defaults)
+        self.assertEqual(ranked[0].games, 60)
+        self.assertFalse(ranked[1].active)
+        self.assertEqual(ranked[1].games, 20)
+        self.assertEqual(ranked[1].wins, 0)
+
+    def test_resume_matches_uninterrupted_run(self):
+        uninterrupted = get_tuner().run(2)
+        with tempfile.TemporaryDirectory() as directory:
+            checkpoint_path = os.path.join(directory, "tuning.json")
+            get_tuner(checkpoint_path).run(1)
+            resumed = get_tuner(checkpoint_path)
+            evaluated = []
+            evaluate = resumed.evaluate
+            resumed.evaluate = lambda population, executor: evaluated.append(population) or \
+                evaluate(population, executor)
+            self.assertEqual(resumed.run(2), uninterrupted)
+            # Only the second generation was played again
+            self.assertEqual(len(evaluated), 1)
+            self.assertEqual(resumed.generation, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
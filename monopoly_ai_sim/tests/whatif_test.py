@@ -0,0 +1,55 @@
+from monopoly_ai_sim.shards import DEFAULT_PLAYER_CLASS
+from monopoly_ai_sim.whatif import Override, WhatIf, capture_game, get_wilson_interval
+
+import unittest
+
+
+class Test(unittest.TestCase):
+
+    def test_continuations_replay_and_pool_matches(self):
+        snapshot = capture_game([DEFAULT_PLAYER_CLASS] * 3, 3, 20)
+        self.assertEqual(snapshot.fork("a").round_count, 20)
+        scenarios = {"as is": [], "hold cash": [Override(0, {"BUILD_CASH_RESERVE": 100000})]}
+        inline = WhatIf(snapshot, scenarios, num_continuations=12, batch_size=5, processes=0).run()
+        pooled = WhatIf(snapshot, scenarios, num_continuations=12, batch_size=5, processes=2).run()
+        for name in scenarios:
+            self.assertEqual(inline[name].continuations, 12)
+            self.assertEqual((inline[name].wins, inline[name].draws), (pooled[name].wins, pooled[name].draws))
+
+    def test_invalid_override(self):
+        snapshot = capture_game([DEFAULT_PLAYER_CLASS] * 2, 0, 5)
+        with self.assertRaises(ValueError):
+            WhatIf(snapshot, {"bad": [Override(1, {"NO_SUCH_PARAMETER": 1})]}, 1, processes=0).run()
+
+    def test_fork_only_reshuffles_unseen_cards(self):
+        snapshot = capture_game([DEFAULT_PLAYER_CLASS] * 2, 0, 20)
+        original = snapshot.fork("a")
+        forks = [snapshot.fork(seed) for seed in range(10)]
+        for deck_name in ("chance_deck", "community_chest_deck"):
+            deck = getattr(original, deck_name)
+            self.assertGreater(deck.rotations, 0)
+            unseen = len(deck.cards) - deck.rotations
+            card_ids = [card.id for card in deck.cards]
+            orders = set()
+            for fork in forks:
+                fork_ids = [card.id for card in getattr(fork, deck_name).cards]
+                # The cards drawn so far keep their order at the bottom of the deck
+                self.assertEqual(fork_ids[unseen:], card_ids[unseen:])
+                self.assertEqual(sorted(fork_ids[:unseen]), sorted(card_ids[:unseen]))
+                orders.add(tuple(fork_ids[:unseen]))
+            self.assertGreater(len(orders), 1)
+
+        # Once every card has come up the whole order is known
+        deck = original.chance_deck
+        deck.rotations = len(deck.cards)
+        card_ids = [card.id for card in deck.cards]
+        original.reseed("b")
+        self.assertEqual([card.id for card in deck.cards], card_ids)
+
+    def test_wilson_interval(self):
+        low, high = get_wilson_interval(0, 100)
+        self.assertEqual(low, 0.0)
+        self.assertGreater(high, 0.0)
+        low, high = get_wilson_interval(50, 100)
+        self.assertAlmostEqual((low + high) / 2, 0.5)
+        self.assertLess(high - low, 0.2)
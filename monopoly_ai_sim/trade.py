@@ -1 +1,163 @@
-# TODO: implement a trade class
+# Trades between players
+#
+# A TradeOffer moves properties, cash and Get Out of Jail Free cards between two players. The game asks the
+# player whose turn it is for an offer before it rolls, up to the trades_per_turn house rule, and executes it
+# when the other player accepts and the offer is valid:
+#
+#   - both players are still in the game and hold what they give, cash included
+#   - no property of a group with buildings changes hands, buildings have to be sold first
+#   - whoever receives a mortgaged property pays the bank 10% of its mortgage value right away
+#
+# Offers are only worth making for properties that complete a color group, or keep an opponent from
+# completing one. get_trade_candidates only returns those, looking at the groups the game keeps track of as
+# split between two players, so most turns have nothing to look at.
+from monopoly_ai_sim.board import RentIdx
+
+# Share of the mortgage value the new owner of a mortgaged property pays to the bank
+MORTGAGE_TRANSFER_INTEREST = 0.1
+
+
+def get_mortgage_interest(board_position):
+    return int(board_position.mortgage_value * MORTGAGE_TRANSFER_INTEREST) if board_position.is_mortgaged else 0
+
+
+# What owning a property is worth in cash, a mortgaged property has to be unmortgaged first
+def get_trade_value(board_position):
+    if board_position.is_mortgaged:
+        return board_position.cost_to_buy - int(board_position.mortgage_value * 1.1)
+    return board_position.cost_to_buy
+
+
+class TradeCandidate:
+    """
+        properties - what player would need from responder
+        completes - True when they complete a group of player, False when they keep blocked_player
+                    from completing one
+    """
+    def __init__(self, responder, properties, completes, blocked_player=None):
+        self.responder = responder
+        self.properties = properties
+        self.completes = completes
+        self.blocked_player = blocked_player
+
+    def __repr__(self):
+        return ("Complete " if self.completes else "Block ") + str([p.name for p in self.properties]) + \
+               " from Player " + str(self.responder.id)
+
+
+"""
+    Returns the TradeCandidates of player: for every color group split between two players, the properties
+    player is missing when they are all held by a single other player (completes), and when another player is
+    only missing properties held by a third player, those properties (blocks)
+"""
+def get_trade_candidates(game, player, blocking=True):
+    candidates = []
+    # Buildings need the whole group, groups split between two players never have any
+    for group in game.split_groups.values():
+        owners = [board_position.owner for board_position in group]
+        holders = set(owners)
+        if player.seat in holders:
+            holders.discard(player.seat)
+            responder = holders.pop()
+            candidates.append(TradeCandidate(
+                game.players[responder],
+                [board_position for board_position in group if board_position.owner == responder], True))
+        elif blocking:
+            # Two opponents split the group, the one holding less blocks the other (both when it's even)
+            first, second = sorted(holders)
+            for responder, blocked in ((first, second), (second, first)):
+                if owners.count(responder) <= owners.count(blocked):
+                    candidates.append(TradeCandidate(
+                        game.players[responder],
+                        [board_position for board_position in group if board_position.owner == responder],
+                        False, game.players[blocked]))
+    return candidates
+
+
+class TradeOffer:
+    """
+        proposer offers properties_given, cash (negative when the responder pays) and jail_cards_given
+        to responder, for properties_received and jail_cards_received
+    """
+    def __init__(self, proposer, responder, properties_given=None, properties_received=None, cash=0,
+                 jail_cards_given=None, jail_cards_received=None):
+        self.proposer = proposer
+        self.responder = responder
+        self.properties_given = properties_given or []
+        self.properties_received = properties_received or []
+        self.cash = cash
+        self.jail_cards_given = jail_cards_given or []
+        self.jail_cards_received = jail_cards_received or []
+
+    def __repr__(self):
+        return "Player " + str(self.proposer.id) + " offers " + str([p.name for p in self.properties_given]) + \
+               ", $" + str(self.cash) + " and " + str(len(self.jail_cards_given)) + " cards to Player " + \
+               str(self.responder.id) + " for " + str([p.name for p in self.properties_received]) + " and " + \
+               str(len(self.jail_cards_received)) + " cards"
+
+    # Interest the proposer and the responder pay on the mortgaged properties they receive
+    def get_interest(self):
+        return sum(get_mortgage_interest(p) for p in self.properties_received), \
+               sum(get_mortgage_interest(p) for p in self.properties_given)
+
+    # Raises ValueError when the offer breaks a rule of the game
+    def validate(self, game):
+        if self.proposer is self.responder:
+            raise ValueError("Player " + str(self.proposer.id) + " can't trade with themselves")
+        for player in (self.proposer, self.responder):
+            if player not in game.live_players:
+                raise ValueError("Player " + str(player.id) + " is no longer in the game")
+        if not (self.properties_given or self.properties_received or self.cash or self.jail_cards_given or
+                self.jail_cards_received):
+            raise ValueError("Empty trade offer")
+        properties = self.properties_given + self.properties_received
+        if len(set(id(p) for p in properties)) != len(properties):
+            raise ValueError("A property appears more than once in the trade")
+        for giver, given in ((self.proposer, self.properties_given), (self.responder, self.properties_received)):
+            for board_position in given:
+                if board_position.owner != giver.seat:
+                    raise ValueError("Player " + str(giver.id) + " doesn't own " + board_position.name)
+                if board_position.house_cost and any(group_property.rent_idx >= RentIdx.HOUSE_1 for group_property
+                                                     in game.group_id_to_position[board_position.property_group]):
+                    raise ValueError(board_position.name + " is in a group with buildings")
+        for giver, cards in ((self.proposer, self.jail_cards_given), (self.responder, self.jail_cards_received)):
+            for card in cards:
+                if card not in giver.get_out_of_jail_free:
+                    raise ValueError("Player " + str(giver.id) + " doesn't hold card " + card.description)
+        proposer_interest, responder_interest = self.get_interest()
+        if max(self.cash, 0) + proposer_interest > self.proposer.cash or \
+                max(-self.cash, 0) + responder_interest > self.responder.cash:
+            raise ValueError("Trade needs more cash than the players have")
+
+    def is_valid(self, game):
+        try:
+            self.validate(game)
+        except ValueError:
+            return False
+        return True
+
+    # True when the trade completes a color group of player
+    def completes_group_for(self, game, player):
+        received = self.properties_received if player is self.proposer else self.properties_given
+        for board_position in received:
+            if board_position.house_cost and all(
+                    group_property.owner == player.seat or group_property in received
+                    for group_property in game.group_id_to_position[board_position.property_group]):
+                return True
+        return False
+
+    def execute(self, game):
+        self.validate(game)
+        proposer_interest, responder_interest = self.get_interest()
+        for board_position in self.properties_given:
+            self.proposer.give_property_to(game, self.responder, board_position)
+        for board_position in self.properties_received:
+            self.responder.give_property_to(game, self.proposer, board_position)
+        for card in self.jail_cards_given:
+            self.proposer.get_out_of_jail_free.remove(card)
+            self.responder.get_out_of_jail_free.append(card)
+        for card in self.jail_cards_received:
+            self.responder.get_out_of_jail_free.remove(card)
+            self.proposer.get_out_of_jail_free.append(card)
+        self.proposer.cash -= self.cash + proposer_interest
+        self.responder.cash += self.cash - responder_interest
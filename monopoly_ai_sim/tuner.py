@@ -0,0 +1,227 @@
+# Evolutionary tuning of player strategy parameters
+#
+# A player class is turned into a parameter vector through a list of TunableParameters, which are attributes
+# set on the player after it is created (like GreedyMonopolyPlayer.DEFAULT_HOUSE_VALUE). A genetic algorithm
+# then evolves a population of parameter vectors. Every candidate is scored by its win rate against a pool of
+# reference players over the same seeds, rotating through the seats, so scores are directly comparable.
+# Games are played in batches on a process pool, and a candidate stops being evaluated as soon as its win
+# rate is clearly below the best candidate's. Every generation is checkpointed and a rerun resumes from it.
+#
+#   python -m monopoly_ai_sim.tuner --generations 20 --checkpoint tuning.json
+import json
+import logging
+import math
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+
+from monopoly_ai_sim.pool import game_pool, load_class
+from monopoly_ai_sim.shards import DEFAULT_PLAYER_CLASS, write_json_atomic
+
+logger = logging.getLogger('monopoly_ai_simulator')
+
+# Candidates whose win rate upper bound falls below the best lower bound are dropped
+CONFIDENCE_Z = 2.5
+
+
+class TunableParameter:
+    def __init__(self, name, low, high, integer=True):
+        self.name = name
+        self.low = low
+        self.high = high
+        self.integer = integer
+
+    def clip(self, value):
+        value = min(max(value, self.low), self.high)
+        return int(round(value)) if self.integer else value
+
+
+GREEDY_PARAMETERS = [
+    TunableParameter("DEFAULT_HOUSE_VALUE", 0, 500),
+    TunableParameter("DEFAULT_HOTEL_VALUE", 0, 500),
+    TunableParameter("PURCHASE_CASH_RESERVE", 0, 1000),
+    TunableParameter("UNMORTGAGE_CASH_RESERVE", 0, 1000),
+]
+
+"""
+    Plays one game per seed and returns the number of games won by the candidate. The candidate sits in
+    seat seed % player_count, the other seats are filled from the reference pool in order.
+"""
+def play_candidate_games(player_class_path, parameters, reference_pool, player_count, seeds):
+    wins = 0
+    for seed in seeds:
+        candidate_seat = seed % player_count
+        seating = []
+        for seat in range(player_count):
+            if seat == candidate_seat:
+                seating.append((player_class_path, parameters))
+            else:
+                seating.append(reference_pool[(seed + seat) % len(reference_pool)])
+        game = game_pool.get_game([class_path for class_path, _ in seating], seed,
+                                  player_parameters=[player_parameters for _, player_parameters in seating])
+        winner = game.do_simulation()
+        if winner is not None and winner.seat == candidate_seat:
+            wins += 1
+    return wins
+
+
+class Candidate:
+    def __init__(self, parameters):
+        self.parameters = parameters
+        self.wins = 0
+        self.games = 0
+        self.active = True
+
+    @property
+    def win_rate(self):
+        return float(self.wins) / self.games if self.games else 0.0
+
+    def get_bounds(self):
+        if not self.games:
+            return 0.0, 1.0
+        margin = CONFIDENCE_Z * math.sqrt(max(self.win_rate * (1 - self.win_rate), 0.25 / self.games) / self.games)
+        return self.win_rate - margin, self.win_rate + margin
+
+
+class StrategyTuner:
+    def __init__(self, player_class_path=DEFAULT_PLAYER_CLASS, parameters=GREEDY_PARAMETERS, reference_pool=None,
+                 player_count=2, population_size=16, elite_count=4, games_per_candidate=400, batch_size=50,
+                 mutation_scale=0.1, seed=0, checkpoint_path=None, processes=None):
+        if elite_count < 1 or elite_count > population_size:
+            raise ValueError("elite_count must be between 1 and population_size")
+        self.player_class_path = player_class_path
+        self.parameters = parameters
+        # (class path, parameters) of the opponents, untuned default players by default
+        self.reference_pool = reference_pool or [(player_class_path, {})]
+        self.player_count = player_count
+        self.population_size = population_size
+        self.elite_count = elite_count
+        self.games_per_candidate = games_per_candidate
+        self.batch_size = batch_size
+        self.mutation_scale = mutation_scale
+        self.checkpoint_path = checkpoint_path
+        self.processes = processes
+        self.random = random.Random(seed)
+        # Every candidate of every generation plays the same seeds
+        self.seeds = list(range(seed, seed + games_per_candidate))
+        self.generation = 0
+        self.population = None
+        self.best = None  # (parameters, win rate)
+
+    def get_default_parameters(self):
+        defaults = load_class(self.player_class_path)(0)
+        return {p.name: p.clip(getattr(defaults, p.name)) for p in self.parameters}
+
+    def get_initial_population(self):
+        population = [self.get_default_parameters()]
+        while len(population) < self.population_size:
+            population.append({p.name: p.clip(self.random.uniform(p.low, p.high)) for p in self.parameters})
+        return population
+
+    def get_next_population(self, ranked):
+        elites = [candidate.parameters for candidate in ranked[:self.elite_count]]
+        population = elites[:]
+        while len(population) < self.population_size:
+            mother, father = self.random.choice(elites), self.random.choice(elites)
+            child = {}
+            for p in self.parameters:
+                value = mother[p.name] if self.random.random() < 0.5 else father[p.name]
+                child[p.name] = p.clip(value + self.random.gauss(0, self.mutation_scale * (p.high - p.low)))
+            population.append(child)
+        return population
+
+    """
+        Plays the candidates batch by batch, dropping the ones that are clearly worse than the best so far
+        executor - runs the batches, None plays them in this process
+    """
+    def evaluate(self, population, executor=None):
+        candidates = [Candidate(parameters) for parameters in population]
+        for start in range(0, len(self.seeds), self.batch_size):
+            batch = self.seeds[start:start + self.batch_size]
+            active = [candidate for candidate in candidates if candidate.active]
+            if executor is None:
+                batch_wins = [play_candidate_games(self.player_class_path, candidate.parameters,
+                                                   self.reference_pool, self.player_count, batch)
+                              for candidate in active]
+            else:
+                futures = [executor.submit(play_candidate_games, self.player_class_path, candidate.parameters,
+                                           self.reference_pool, self.player_count, batch)
+                           for candidate in active]
+                batch_wins = [future.result() for future in futures]
+            for candidate, wins in zip(active, batch_wins):
+                candidate.wins += wins
+                candidate.games += len(batch)
+            best_lower_bound = max(candidate.get_bounds()[0] for candidate in active)
+            for candidate in active:
+                if candidate.get_bounds()[1] < best_lower_bound:
+                    candidate.active = False
+        return sorted(candidates, key=lambda candidate: (candidate.active, candidate.win_rate), reverse=True)
+
+    def save_checkpoint(self):
+        if self.checkpoint_path:
+            version, state, gauss_next = self.random.getstate()
+            write_json_atomic(self.checkpoint_path, {
+                "generation": self.generation,
+                "population": self.population,
+                "best": self.best,
+                "random_state": [version, list(state), gauss_next],
+            })
+
+    def load_checkpoint(self):
+        if not self.checkpoint_path or not os.path.exists(self.checkpoint_path):
+            return False
+        with open(self.checkpoint_path, 'r') as f:
+            checkpoint = json.load(f)
+        self.generation = checkpoint["generation"]
+        self.population = checkpoint["population"]
+        self.best = tuple(checkpoint["best"]) if checkpoint["best"] is not None else None
+        version, state, gauss_next = checkpoint["random_state"]
+        self.random.setstate((version, tuple(state), gauss_next))
+        logger.info("Resuming tuning at generation " + str(self.generation))
+        return True
+
+    # Runs until num_generations generations have been evaluated, returns the best (parameters, win rate)
+    # processes == 0 plays every game in this process
+    def run(self, num_generations):
+        if not self.load_checkpoint():
+            self.population = self.get_initial_population()
+        if self.processes == 0:
+            self.run_generations(num_generations, None)
+        else:
+            with ProcessPoolExecutor(self.processes) as executor:
+                self.run_generations(num_generations, executor)
+        return self.best
+
+    def run_generations(self, num_generations, executor):
+        while self.generation < num_generations:
+            ranked = self.evaluate(self.population, executor)
+            if self.best is None or ranked[0].win_rate > self.best[1]:
+                self.best = (ranked[0].parameters, ranked[0].win_rate)
+            logger.info("Generation " + str(self.generation + 1) + ": best win rate " +
+                        str(ranked[0].win_rate) + " " + str(ranked[0].parameters) + ", " +
+                        str(sum(1 for candidate in ranked if not candidate.active)) + " candidates stopped early")
+            self.generation += 1
+            self.population = self.get_next_population(ranked)
+            self.save_checkpoint()
+
+
+def main():
+    import argparse
+    import sys
+    parser = argparse.ArgumentParser(prog="monopoly_ai_sim.tuner", description="Tune player strategy parameters")
+    parser.add_argument("--generations", type=int, default=10)
+    parser.add_argument("--population", type=int, default=16)
+    parser.add_argument("--games", type=int, default=400, help="games per candidate")
+    parser.add_argument("--players", type=int, default=2)
+    parser.add_argument("--checkpoint", help="checkpoint file, resumed from if it exists")
+    parser.add_argument("--processes", type=int, help="0 plays in this process")
+    args = parser.parse_args()
+    logging.basicConfig(stream=sys.stdout, level=logging.INFO)
+    tuner = StrategyTuner(player_count=args.players, population_size=args.population,
+                          games_per_candidate=args.games, checkpoint_path=args.checkpoint, processes=args.processes)
+    parameters, win_rate = tuner.run(args.generations)
+    logger.info("Best parameters " + str(parameters) + " won " + str(100 * win_rate) + "%")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,217 @@
+# What-if analysis of a game in progress
+#
+# A GameSnapshot captures a game between two rounds. Continuations fork it, reseed every random stream
+# (reshuffling the cards that haven't come up yet), optionally change the decisions of some players, and play the
+# game on to its end. Every scenario plays the same continuation seeds, so scenarios are compared on the same
+# dice and cards. The snapshot is pickled once and handed to every process of the pool when it starts,
+# continuations only send their seeds.
+#
+#   python -m monopoly_ai_sim.whatif --seed 3 --round 40 --seat 0 --continuations 2000
+import gc
+import logging
+import math
+import pickle
+from concurrent.futures import ProcessPoolExecutor
+
+from monopoly_ai_sim.pool import game_pool
+from monopoly_ai_sim.shards import DEFAULT_PLAYER_CLASS
+
+logger = logging.getLogger('monopoly_ai_simulator')
+
+# Two sided 95% normal quantile
+CONFIDENCE_Z = 1.96
+
+
+"""
+    Wilson score interval of a proportion, well behaved near 0 and 1 where the normal interval isn't
+"""
+def get_wilson_interval(successes, trials, z=CONFIDENCE_Z):
+    if not trials:
+        return 0.0, 1.0
+    proportion = float(successes) / trials
+    denominator = 1 + z * z / trials
+    center = (proportion + z * z / (2 * trials)) / denominator
+    margin = z * math.sqrt(proportion * (1 - proportion) / trials + z * z / (4 * trials * trials)) / denominator
+    return max(center - margin, 0.0), min(center + margin, 1.0)
+
+
+class GameSnapshot:
+    def __init__(self, game):
+        self.data = pickle.dumps(game, protocol=pickle.HIGHEST_PROTOCOL)
+        self.round_count = game.round_count
+        self.player_count = len(game.players)
+
+    # A copy of the game, playing on differently for every seed
+    def fork(self, seed):
+        game = pickle.loads(self.data)
+        game.stats = None
+        game.reseed(seed)
+        return game
+
+
+"""
+    Plays a seeded game between the players up to the start of round_count and snapshots it
+"""
+def capture_game(player_class_paths, seed, round_count, player_parameters=None):
+    game = game_pool.get_game(player_class_paths, seed, player_parameters=player_parameters)
+    game.start_simulation()
+    game.play_rounds(round_count)
+    if game.get_winner() is not None:
+        raise ValueError("Game " + str(seed) + " is over before round " + str(round_count))
+    return GameSnapshot(game)
+
+
+class Override:
+    """
+        Changes the decisions of the player in seat for a continuation
+        parameters - player attributes to set, like {"BUILD_CASH_RESERVE": 100000} to hold cash
+        build_now - the player runs its build/unmortgage pass before the game continues
+    """
+    def __init__(self, seat, parameters=None, build_now=False):
+        self.seat = seat
+        self.parameters = parameters or {}
+        self.build_now = build_now
+
+    def apply(self, game):
+        player = game.players[self.seat]
+        if player.is_bankrupt:
+            raise ValueError("Player in seat " + str(self.seat) + " is already bankrupt")
+        for name, value in self.parameters.items():
+            if not hasattr(player, name):
+                raise ValueError("Player in seat " + str(self.seat) + " has no parameter " + name)
+            setattr(player, name, value)
+        if self.build_now:
+            player.unmortgage_properties()
+            player.purchase_houses(game)
+            game.mark_dirty(player)
+
+
+class WhatIfResult:
+    def __init__(self, player_count):
+        self.continuations = 0
+        self.draws = 0
+        self.wins = [0] * player_count
+
+    def record(self, winner_seat):
+        self.continuations += 1
+        if winner_seat is None:
+            self.draws += 1
+        else:
+            self.wins[winner_seat] += 1
+
+    def get_win_probability(self, seat):
+        return float(self.wins[seat]) / self.continuations if self.continuations else 0.0
+
+    def get_confidence_interval(self, seat, z=CONFIDENCE_Z):
+        return get_wilson_interval(self.wins[seat], self.continuations, z)
+
+    def __repr__(self):
+        lines = []
+        for seat in range(len(self.wins)):
+            low, high = self.get_confidence_interval(seat)
+            lines.append("Seat %d wins %.1f%% [%.1f%%, %.1f%%]" % (seat, 100.0 * self.get_win_probability(seat),
+                                                                   100.0 * low, 100.0 * high))
+        lines.append("Draws %.1f%% of %d continuations" % (100.0 * self.draws / max(self.continuations, 1),
+                                                           self.continuations))
+        return "\n".join(lines)
+
+
+# The snapshot of the pool's processes, set once when each process starts
+_worker_snapshot = None
+
+
+def _init_worker(snapshot):
+    global _worker_snapshot
+    _worker_snapshot = snapshot
+    # The snapshot and the modules are kept for the life of the process, keep them out of collections
+    gc.freeze()
+
+
+"""
+    Plays continuations of the snapshot for every seed, returns the winning seat of each, None for a draw
+"""
+def play_continuations(snapshot, overrides, seeds, max_rounds=None):
+    winner_seats = []
+    for seed in seeds:
+        game = snapshot.fork(seed)
+        for override in overrides:
+            override.apply(game)
+        winner = game.get_winner() or game.play_rounds(max_rounds or game.MAX_ROUNDS)
+        winner_seats.append(winner.seat if winner else None)
+    return winner_seats
+
+
+def _play_worker_continuations(overrides, seeds, max_rounds):
+    return play_continuations(_worker_snapshot, overrides, seeds, max_rounds)
+
+
+class WhatIf:
+    """
+        Estimates every player's chances from the snapshot under each scenario, scenarios being a dictionary
+        of names to lists of Override. Without scenarios the game continues as it is.
+        max_rounds - rounds counted from the start of the game after which a continuation is a draw
+    """
+    def __init__(self, snapshot, scenarios=None, num_continuations=1000, base_seed=0, max_rounds=None,
+                 batch_size=50, processes=None):
+        self.snapshot = snapshot
+        self.scenarios = scenarios if scenarios is not None else {"as is": []}
+        self.seeds = [str(base_seed) + ":whatif:" + str(idx) for idx in range(num_continuations)]
+        self.max_rounds = max_rounds
+        self.batch_size = batch_size
+        self.processes = processes
+
+    def get_tasks(self):
+        return [(name, self.seeds[start:start + self.batch_size])
+                for name in self.scenarios for start in range(0, len(self.seeds), self.batch_size)]
+
+    # Returns {scenario name: WhatIfResult}
+    def run(self):
+        results = {name: WhatIfResult(self.snapshot.player_count) for name in self.scenarios}
+        tasks = self.get_tasks()
+        if self.processes == 0:
+            batches = (play_continuations(self.snapshot, self.scenarios[name], seeds, self.max_rounds)
+                       for name, seeds in tasks)
+            for (name, _), winner_seats in zip(tasks, batches):
+                for winner_seat in winner_seats:
+                    results[name].record(winner_seat)
+            return results
+
+        with ProcessPoolExecutor(self.processes, initializer=_init_worker, initargs=(self.snapshot,)) as executor:
+            futures = [executor.submit(_play_worker_continuations, self.scenarios[name], seeds, self.max_rounds)
+                       for name, seeds in tasks]
+            for (name, _), future in zip(tasks, futures):
+                for winner_seat in future.result():
+                    results[name].record(winner_seat)
+        return results
+
+
+def main():
+    import argparse
+    import sys
+    parser = argparse.ArgumentParser(prog="monopoly_ai_sim.whatif",
+                                     description="Compare building now with holding cash from a game in progress")
+    parser.add_argument("--player-class", default=DEFAULT_PLAYER_CLASS, help="class path of every player")
+    parser.add_argument("--players", type=int, default=2)
+    parser.add_argument("--seed", type=int, default=0, help="seed of the game to snapshot")
+    parser.add_argument("--round", type=int, default=30, help="round the game is snapshot at")
+    parser.add_argument("--seat", type=int, default=0, help="seat of the player deciding")
+    parser.add_argument("--hold-cash", type=int, default=100000,
+                        help="cash the player holding keeps in hand instead of building")
+    parser.add_argument("--continuations", type=int, default=1000)
+    parser.add_argument("--processes", type=int, help="0 plays in this process")
+    args = parser.parse_args()
+    logging.basicConfig(stream=sys.stdout, level=logging.INFO)
+    snapshot = capture_game([args.player_class] * args.players, args.seed, args.round)
+    scenarios = {
+        "as is": [],
+        "build now": [Override(args.seat, build_now=True)],
+        "hold cash": [Override(args.seat, {"BUILD_CASH_RESERVE": args.hold_cash})],
+    }
+    results = WhatIf(snapshot, scenarios, args.continuations, processes=args.processes).run()
+    for name, result in results.items():
+        print(name + ":")
+        print(result)
+
+
+if __name__ == '__main__':
+    main()
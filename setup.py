@@ -81,13 +81,14 @@ setup(
     extras_require={
         'dev': ['check-manifest'],
         'test': ['coverage'],
+        'ml': ['numpy'],
     },
 
     # If there are data files included in your packages that need to be
     # installed, specify them here.  If using Python 2.6 or less, then these
     # have to be included in MANIFEST.in as well.
     package_data={
-        'monopoly_ai_simulator': [],
+        'monopoly_ai_sim': ['*.csv', '*.bundle'],
     },
 
     # Although 'package_data' is the preferred approach, in some case you may